@@ -8,7 +8,7 @@ and availability tracking.
 
 Architecture:
 - FastAPI framework with async/await support
-- JSON file-based storage (backend/data/)
+- Pluggable storage engines: JSON files (backend/data/) or SQLite
 - JWT-based authentication
 - Modular route organization with controllers and services
 - CORS enabled for frontend integration
@@ -50,11 +50,20 @@ except ImportError:
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import uvicorn
 
 # Import all route modules
 from routes import auth, teams, members, meetings, aggregation
+from models.vote_model import TALLY_UPDATES
+from services.hashing_service import get_hashing_service
+from utils.concurrency import executor_stats, loop_monitor
+from utils.engine import snapshot_stats
+from utils.response_cache import response_cache
+from utils.singleflight import singleflight_stats
+from utils.auth import token_cache_stats
+from utils.metrics import CONTENT_TYPE, MetricsMiddleware, merge_families, registry, stats_families
+from utils.storage import cache_stats, commit_stats
 
 # Initialize FastAPI application
 app = FastAPI(
@@ -75,8 +84,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],  # see utils.pagination, utils.conditional
 )
 
+# Request latency by route for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Health Check Endpoint
 @app.get("/", tags=["Health"])
 async def root():
@@ -111,11 +124,88 @@ async def health_check():
             "status": "healthy",
             "data_directory": str(data_dir),
             "data_accessible": data_dir.exists(),
-            "environment": os.getenv("ENVIRONMENT", "development")
+            "environment": os.getenv("ENVIRONMENT", "development"),
+            "password_hashing": get_hashing_service().stats(),
+            "executors": executor_stats(),
+            "event_loop": loop_monitor.stats(),
+            "live_results": TALLY_UPDATES.stats(),
+            "response_cache": response_cache.stats(),
+            "singleflight": singleflight_stats(),
+            "request_snapshots": snapshot_stats()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Health check failed: {str(e)}")
 
+@registry.collector
+def subsystem_metrics():
+    """
+    Export the counters behind /health at scrape time.
+
+    Returns:
+        list: Metric families for the storage cache and group commit, the
+        thread pools, event loop, password hashing, token and response
+        caches, live results, request collapsing and request snapshots
+    """
+    families = []
+    families += stats_families(
+        "storage_cache", cache_stats(), "Parsed data file cache",
+        counters=("hits", "misses", "invalidations"), gauges=("entries",),
+    )
+    families += stats_families(
+        "storage_commit", commit_stats(), "Group commit",
+        counters=("writes", "flushes"),
+    )
+    for pool, stats in executor_stats().items():
+        families += stats_families(
+            "storage_pool", stats, "Storage thread pool",
+            counters=("submitted", "completed", "cancelled", "wait_seconds_total", "busy_seconds_total"),
+            gauges=("workers", "pending", "pending_max"),
+            labels=(("pool", pool),),
+        )
+    families += stats_families(
+        "event_loop", loop_monitor.stats(), "Event loop lag",
+        counters=("samples", "lag_seconds_total", "over_10ms", "over_100ms"),
+        gauges=("lag_seconds_last", "lag_seconds_max"),
+    )
+    families += stats_families(
+        "password_hash_pool", get_hashing_service().stats(), "Password hashing pool",
+        counters=("completed", "rejected", "cancelled"), gauges=("workers", "max_pending", "active", "pending", "pending_max"),
+    )
+    families += stats_families(
+        "auth_token_cache", token_cache_stats(), "Verified token cache",
+        counters=("hits", "misses", "evictions", "expired"), gauges=("entries",),
+    )
+    families += stats_families(
+        "response_cache", response_cache.stats(), "GET response cache",
+        counters=("hits", "misses", "invalidations", "evictions", "skipped"),
+        gauges=("entries", "bytes", "max_bytes"),
+    )
+    families += stats_families(
+        "live_results", TALLY_UPDATES.stats(), "Live vote result streams",
+        counters=("published", "delivered", "coalesced", "dropped"), gauges=("topics", "subscribers"),
+    )
+    for method, stats in singleflight_stats().items():
+        families += stats_families(
+            "singleflight", stats, "Collapsed computations",
+            counters=("leaders", "followers", "errors", "timeouts", "uncollapsed"), gauges=("in_flight",),
+            labels=(("method", method),),
+        )
+    families += stats_families(
+        "request_snapshot", snapshot_stats(), "Per-request read snapshots",
+        counters=("snapshots", "hits", "misses", "invalidations"),
+    )
+    return merge_families(families)
+
+@app.get("/metrics", tags=["Health"])
+async def metrics():
+    """
+    Prometheus scrape endpoint.
+
+    Returns:
+        Response: Every metric in the Prometheus text format (see utils.metrics)
+    """
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
 # Register API Routes
 # Each route module is mounted with its specific prefix and tags
 
@@ -131,7 +221,7 @@ app.include_router(members.router)
 # Meetings routes: /api/v1/meetings/*
 app.include_router(meetings.router)
 
-# Aggregation routes: /api/v1/aggregation/*
+# Aggregation routes: /api/v1/teams/{id}/availability/*
 app.include_router(aggregation.router)
 
 # Global Exception Handler
@@ -168,7 +258,17 @@ async def startup_event():
     data_dir = Path(__file__).parent / "data"
     data_dir.mkdir(exist_ok=True)
     print(f"📁 Data directory: {data_dir}")
-    
+    print(f"💾 Storage engine: {os.getenv('STORAGE_ENGINE', 'json')}")
+
+    # Report event-loop lag (see /health)
+    loop_monitor.start()
+
+    # Finish multi-file commits interrupted by a crash before anything reads the files
+    from utils.storage import recover_intents
+    recovered = recover_intents()
+    if recovered:
+        print(f"🩹 Recovered {recovered} interrupted commits")
+
     # Check environment configuration
     jwt_secret = os.getenv("JWT_SECRET", "dev-secret")
     if jwt_secret == "dev-secret":
@@ -184,6 +284,7 @@ async def shutdown_event():
     Performs cleanup tasks when the application shuts down.
     """
     print("🛑 Shutting down Global Team Manager Backend...")
+    await loop_monitor.stop()
     print("✅ Backend shutdown complete!")
 
 if __name__ == "__main__":
@@ -4,3 +4,37 @@ Aggregation controller.
 Defines functions to compute availability heatmap aggregation for a team within
 requested time window and timezone.
 """
+
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from services.aggregation_service import AggregationService
+from utils.concurrency import AsyncFacade
+from utils.errors import NotFoundError, OverloadedError, ValidationError
+from utils.metrics import CONTROLLER_SECONDS, timed_methods
+
+
+@timed_methods(CONTROLLER_SECONDS)
+class AggregationController:
+    """Aggregation controller handling HTTP requests."""
+
+    def __init__(self):
+        self.aggregation_service = AsyncFacade(AggregationService())
+
+    async def get_team_heatmap(self, team_id: str, timezone: Optional[str] = None) -> JSONResponse:
+        """Get a team's weekly availability heatmap in the viewer's timezone."""
+        try:
+            heatmap = await self.aggregation_service.team_heatmap(team_id, timezone)
+            return JSONResponse(status_code=200, content=heatmap)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except NotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except OverloadedError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
@@ -14,20 +14,23 @@ from fastapi.responses import JSONResponse
 
 from services.auth_service import AuthService
 from schemas.auth import LoginRequest, RegisterRequest, TokenResponse, ProfileResponse, UpdateProfileRequest
-from utils.errors import ValidationError, UnauthorizedError, ConflictError
+from utils.concurrency import AsyncFacade
+from utils.errors import ValidationError, UnauthorizedError, ConflictError, OverloadedError
+from utils.metrics import CONTROLLER_SECONDS, timed_methods
 
 
+@timed_methods(CONTROLLER_SECONDS)
 class AuthController:
     """Authentication controller handling HTTP requests."""
 
     def __init__(self):
-        self.auth_service = AuthService()
+        self.auth_service = AsyncFacade(AuthService())
 
     async def login(self, request: LoginRequest) -> JSONResponse:
         """Handle user login."""
         try:
-            user = self.auth_service.authenticate_user(email=request.email, name=request.name, password=request.password)
-            token = self.auth_service.generate_token(user['id'])
+            user = await self.auth_service.authenticate_user(email=request.email, name=request.name, password=request.password)
+            token = await self.auth_service.generate_token(user['id'])
             
             response_data = TokenResponse(
                 accessToken=token,
@@ -42,15 +45,17 @@ class AuthController:
             raise HTTPException(status_code=400, detail=str(e))
         except UnauthorizedError as e:
             raise HTTPException(status_code=401, detail=str(e))
+        except OverloadedError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
 
     async def register(self, request: RegisterRequest) -> JSONResponse:
         """Handle user registration."""
         try:
             user_data = request.dict()
-            user = self.auth_service.register_user(user_data)
+            user = await self.auth_service.register_user(user_data)
             
             # Generate token for immediate login
-            token = self.auth_service.generate_token(user['id'])
+            token = await self.auth_service.generate_token(user['id'])
             
             response_data = {
                 "user": ProfileResponse(
@@ -76,6 +81,8 @@ class AuthController:
             raise HTTPException(status_code=400, detail=str(e))
         except ConflictError as e:
             raise HTTPException(status_code=409, detail=str(e))
+        except OverloadedError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
 
     async def logout(self) -> JSONResponse:
         """Handle user logout."""
@@ -89,7 +96,7 @@ class AuthController:
     async def get_profile(self, user_id: str) -> JSONResponse:
         """Get user profile."""
         try:
-            user = self.auth_service.get_user_profile(user_id)
+            user = await self.auth_service.get_user_profile(user_id)
             if not user:
                 raise HTTPException(status_code=404, detail="User not found")
             
@@ -114,7 +121,7 @@ class AuthController:
         """Update user profile."""
         try:
             updates = request.dict(exclude_unset=True)
-            user = self.auth_service.update_user_profile(user_id, updates)
+            user = await self.auth_service.update_user_profile(user_id, updates)
             
             if not user:
                 raise HTTPException(status_code=404, detail="User not found")
@@ -141,7 +148,7 @@ class AuthController:
     async def verify_token(self, token: str) -> JSONResponse:
         """Verify JWT token."""
         try:
-            payload = self.auth_service.verify_token(token)
+            payload = await self.auth_service.verify_token(token)
             return JSONResponse(
                 status_code=200,
                 content={"valid": True, "payload": payload}
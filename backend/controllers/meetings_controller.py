@@ -6,50 +6,94 @@ Handles meeting CRUD operations, voting system, and meeting participants.
 
 from __future__ import annotations
 
-from typing import List
+import asyncio
+import json
+from typing import Any, List
 
 from fastapi import HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from models.meeting_model import MEETINGS
+from models.vote_model import TALLY_UPDATES, VOTES
 from services.meetings_service import MeetingsService
 from schemas.meetings import CreateMeetingRequest, UpdateMeetingRequest, MeetingResponse, ListMeetingsResponse, SubmitVoteRequest, VoteResponse, VoteResultsResponse
+from utils.concurrency import AsyncFacade
+from utils.conditional import Preconditions, validators
 from utils.errors import ValidationError, NotFoundError, ConflictError
+from utils.metrics import CONTROLLER_SECONDS, timed_methods
+from utils.pagination import NEXT_CURSOR_HEADER
+from utils.pubsub import TopicClosed
+from utils.response_cache import response_cache
 
 
+# Comment line sent on idle result streams so proxies keep the connection open
+STREAM_KEEPALIVE_SECONDS = 15.0
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+@timed_methods(CONTROLLER_SECONDS)
 class MeetingsController:
     """Meetings controller handling HTTP requests."""
 
     def __init__(self):
-        self.meetings_service = MeetingsService()
-
-    async def list_meetings(self) -> JSONResponse:
-        """List all meetings."""
+        self.meetings_service = AsyncFacade(MeetingsService())
+
+    async def list_meetings(self, preconditions: Preconditions | None = None, **filters) -> JSONResponse:
+        """List meetings; paging/filter keyword arguments go to the service."""
+        cache = validators((MEETINGS,), 'meetings', tuple(sorted(filters.items())))
+        if cache.matches(preconditions):
+            return cache.not_modified()
+        cached = response_cache.get(cache)
+        if cached is not None:
+            return cache.respond(cached, preconditions)
         try:
-            meetings = self.meetings_service.list_meetings()
-            # Return raw array for frontend expectations
-            return JSONResponse(status_code=200, content=meetings)
+            meetings, next_cursor = await self.meetings_service.list_meetings(**filters)
+            # Return raw array for frontend expectations; the next page is in a header
+            headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+            return cache.respond(response_cache.put(cache, JSONResponse(status_code=200, content=meetings, headers=headers)), preconditions)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
-    async def list_team_meetings(self, team_id: str) -> JSONResponse:
+    async def list_team_meetings(self, team_id: str, fields: str | None = None) -> JSONResponse:
         """List meetings for a team."""
         try:
-            meetings = self.meetings_service.list_team_meetings(team_id)
+            meetings = await self.meetings_service.list_team_meetings(team_id, fields)
             return JSONResponse(status_code=200, content=meetings)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except NotFoundError as e:
             raise HTTPException(status_code=404, detail=str(e))
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
-    async def get_meeting(self, meeting_id: str) -> JSONResponse:
+    async def get_meeting(
+        self,
+        meeting_id: str,
+        fields: str | None = None,
+        preconditions: Preconditions | None = None,
+    ) -> JSONResponse:
         """Get meeting by ID."""
+        cache = validators((MEETINGS,), 'meeting', meeting_id, fields)
+        if cache.matches(preconditions):
+            return cache.not_modified()
+        cached = response_cache.get(cache)
+        if cached is not None:
+            return cache.respond(cached, preconditions)
         try:
-            meeting = self.meetings_service.get_meeting(meeting_id)
+            meeting = await self.meetings_service.get_meeting(meeting_id, fields)
             if not meeting:
                 raise HTTPException(status_code=404, detail="Meeting not found")
             
-            response_data = MeetingResponse(**meeting)
-            return JSONResponse(status_code=200, content=response_data.dict())
+            # Sparse fieldsets are returned as projected, not padded out by the schema
+            content = meeting if fields is not None else MeetingResponse(**meeting).dict()
+            return cache.respond(response_cache.put(cache, JSONResponse(status_code=200, content=content)), preconditions)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
@@ -57,7 +101,7 @@ class MeetingsController:
         """Create a new meeting."""
         try:
             meeting_data = request.dict()
-            meeting = self.meetings_service.create_meeting(team_id, meeting_data, creator_id)
+            meeting = await self.meetings_service.create_meeting(team_id, meeting_data, creator_id)
             
             response_data = MeetingResponse(**meeting)
             return JSONResponse(status_code=201, content=response_data.dict())
@@ -72,7 +116,7 @@ class MeetingsController:
         """Update meeting."""
         try:
             updates = request.dict(exclude_unset=True)
-            meeting = self.meetings_service.update_meeting(meeting_id, updates)
+            meeting = await self.meetings_service.update_meeting(meeting_id, updates)
             
             if not meeting:
                 raise HTTPException(status_code=404, detail="Meeting not found")
@@ -89,7 +133,7 @@ class MeetingsController:
     async def delete_meeting(self, meeting_id: str) -> JSONResponse:
         """Delete meeting."""
         try:
-            success = self.meetings_service.delete_meeting(meeting_id)
+            success = await self.meetings_service.delete_meeting(meeting_id)
             if not success:
                 raise HTTPException(status_code=404, detail="Meeting not found")
             
@@ -100,7 +144,7 @@ class MeetingsController:
     async def get_meeting_members(self, meeting_id: str) -> JSONResponse:
         """Get meeting members."""
         try:
-            members = self.meetings_service.get_meeting_members(meeting_id)
+            members = await self.meetings_service.get_meeting_members(meeting_id)
             return JSONResponse(status_code=200, content=members)
         except NotFoundError as e:
             raise HTTPException(status_code=404, detail=str(e))
@@ -110,7 +154,7 @@ class MeetingsController:
     async def get_meeting_votes(self, meeting_id: str) -> JSONResponse:
         """Get meeting votes."""
         try:
-            votes = self.meetings_service.get_meeting_votes(meeting_id)
+            votes = await self.meetings_service.get_meeting_votes(meeting_id)
             response_data = [VoteResponse(**vote) for vote in votes]
             return JSONResponse(status_code=200, content=[v.dict() for v in response_data])
         except NotFoundError as e:
@@ -122,7 +166,7 @@ class MeetingsController:
         """Submit vote for meeting."""
         try:
             vote_data = request.dict()
-            vote = self.meetings_service.submit_vote(meeting_id, user_id, vote_data)
+            vote = await self.meetings_service.submit_vote(meeting_id, user_id, vote_data)
             
             response_data = VoteResponse(**vote)
             return JSONResponse(status_code=201, content=response_data.dict())
@@ -133,21 +177,69 @@ class MeetingsController:
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
-    async def get_vote_results(self, meeting_id: str) -> JSONResponse:
+    async def get_vote_results(self, meeting_id: str, preconditions: Preconditions | None = None) -> JSONResponse:
         """Get vote results for meeting."""
+        # Results depend on the votes and on the meeting's proposed slots
+        cache = validators((MEETINGS, VOTES), 'results', meeting_id)
+        if cache.matches(preconditions):
+            return cache.not_modified()
+        cached = response_cache.get(cache)
+        if cached is not None:
+            return cache.respond(cached, preconditions)
         try:
-            results = self.meetings_service.get_vote_results(meeting_id)
+            results = await self.meetings_service.get_vote_results(meeting_id)
             # Return raw dict (results)
-            return JSONResponse(status_code=200, content=results.get('results') if isinstance(results, dict) else results)
+            return cache.respond(response_cache.put(cache, JSONResponse(status_code=200, content=results.get('results') if isinstance(results, dict) else results)), preconditions)
         except NotFoundError as e:
             raise HTTPException(status_code=404, detail=str(e))
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    async def stream_vote_results(self, meeting_id: str) -> StreamingResponse:
+        """Stream vote results as Server-Sent Events.
+
+        Sends the current results as a `results` event, then a `delta` event
+        with the changed slots after each vote. Deltas a slow client has not
+        read yet are merged into one. Deleting the meeting sends a `closed`
+        event and ends the stream.
+        """
+        # Subscribe before reading so no vote falls between snapshot and deltas
+        subscription = TALLY_UPDATES.subscribe(meeting_id)
+        try:
+            results = await self.meetings_service.get_vote_results(meeting_id)
+        except NotFoundError as e:
+            subscription.close()
+            raise HTTPException(status_code=404, detail=str(e))
+        except Exception as e:
+            subscription.close()
+            raise HTTPException(status_code=500, detail=str(e))
+
+        async def events():
+            try:
+                yield _sse('results', results.get('results') if isinstance(results, dict) else results)
+                while True:
+                    try:
+                        delta = await asyncio.wait_for(subscription.get(), STREAM_KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"
+                        continue
+                    except TopicClosed:
+                        yield _sse('closed', {'meetingId': meeting_id, 'reason': 'deleted'})
+                        return
+                    yield _sse('delta', delta)
+            finally:
+                subscription.close()
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     async def get_meeting_participants(self, meeting_id: str) -> JSONResponse:
         """Get meeting participants with vote status."""
         try:
-            participants = self.meetings_service.get_meeting_participants(meeting_id)
+            participants = await self.meetings_service.get_meeting_participants(meeting_id)
             return JSONResponse(status_code=200, content={"participants": participants})
         except NotFoundError as e:
             raise HTTPException(status_code=404, detail=str(e))
@@ -11,35 +11,76 @@ from typing import List
 from fastapi import HTTPException
 from fastapi.responses import JSONResponse
 
+from models.team_model import TEAMS
+from models.user_model import MEMBERS
 from services.members_service import MembersService
+from schemas.common import AvailabilityMap
 from schemas.members import CreateMemberRequest, UpdateMemberRequest, MemberResponse, ListMembersResponse, UpdateAvailabilityRequest
+from utils.concurrency import AsyncFacade
+from utils.conditional import Preconditions, validators
 from utils.errors import ValidationError, NotFoundError, ConflictError
+from utils.metrics import CONTROLLER_SECONDS, timed_methods
+from utils.pagination import NEXT_CURSOR_HEADER
+from utils.response_cache import response_cache
 
 
+@timed_methods(CONTROLLER_SECONDS)
 class MembersController:
     """Members controller handling HTTP requests."""
 
     def __init__(self):
-        self.members_service = MembersService()
-
-    async def list_members(self) -> JSONResponse:
-        """List all members."""
+        self.members_service = AsyncFacade(MembersService())
+
+    async def list_members(
+        self,
+        availability_format: str = 'slots',
+        preconditions: Preconditions | None = None,
+        **filters,
+    ) -> JSONResponse:
+        """List members; paging/filter keyword arguments go to the service."""
+        # Members are enriched with team ids, so teams are a dependency too
+        cache = validators((MEMBERS, TEAMS), 'members', availability_format, tuple(sorted(filters.items())))
+        if cache.matches(preconditions):
+            return cache.not_modified()
+        cached = response_cache.get(cache)
+        if cached is not None:
+            return cache.respond(cached, preconditions)
         try:
-            members = self.members_service.list_members()
-            # Return raw array for frontend expectations
-            return JSONResponse(status_code=200, content=members)
+            members, next_cursor = await self.members_service.list_members(availability_format, **filters)
+            # Return raw array for frontend expectations; the next page is in a header
+            headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+            return cache.respond(response_cache.put(cache, JSONResponse(status_code=200, content=members, headers=headers)), preconditions)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except NotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
-    async def get_member(self, member_id: str) -> JSONResponse:
+    async def get_member(
+        self,
+        member_id: str,
+        availability_format: str = 'slots',
+        fields: str | None = None,
+        preconditions: Preconditions | None = None,
+    ) -> JSONResponse:
         """Get member by ID."""
+        cache = validators((MEMBERS,), 'member', member_id, availability_format, fields)
+        if cache.matches(preconditions):
+            return cache.not_modified()
+        cached = response_cache.get(cache)
+        if cached is not None:
+            return cache.respond(cached, preconditions)
         try:
-            member = self.members_service.get_member(member_id)
+            member = await self.members_service.get_member(member_id, availability_format, fields)
             if not member:
                 raise HTTPException(status_code=404, detail="Member not found")
             
-            response_data = MemberResponse(**member)
-            return JSONResponse(status_code=200, content=response_data.dict())
+            # Sparse fieldsets are returned as projected, not padded out by the schema
+            content = member if fields is not None else MemberResponse(**member).dict()
+            return cache.respond(response_cache.put(cache, JSONResponse(status_code=200, content=content)), preconditions)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
@@ -47,7 +88,7 @@ class MembersController:
         """Create a new member."""
         try:
             member_data = request.dict()
-            member = self.members_service.create_member(member_data)
+            member = await self.members_service.create_member(member_data)
             
             response_data = MemberResponse(**member)
             return JSONResponse(status_code=201, content=response_data.dict())
@@ -62,7 +103,7 @@ class MembersController:
         """Update member."""
         try:
             updates = request.dict(exclude_unset=True)
-            member = self.members_service.update_member(member_id, updates)
+            member = await self.members_service.update_member(member_id, updates)
             
             if not member:
                 raise HTTPException(status_code=404, detail="Member not found")
@@ -81,7 +122,7 @@ class MembersController:
     async def delete_member(self, member_id: str) -> JSONResponse:
         """Delete member."""
         try:
-            success = self.members_service.delete_member(member_id)
+            success = await self.members_service.delete_member(member_id)
             if not success:
                 raise HTTPException(status_code=404, detail="Member not found")
             
@@ -92,8 +133,10 @@ class MembersController:
     async def update_availability(self, member_id: str, request: UpdateAvailabilityRequest) -> JSONResponse:
         """Update member availability."""
         try:
-            availability = request.availability.dict()
-            member = self.members_service.update_availability(member_id, availability)
+            availability = request.availability
+            if isinstance(availability, AvailabilityMap):
+                availability = availability.root
+            member = await self.members_service.update_availability(member_id, availability)
             
             if not member:
                 raise HTTPException(status_code=404, detail="Member not found")
@@ -107,14 +150,16 @@ class MembersController:
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
-    async def get_availability(self, member_id: str) -> JSONResponse:
+    async def get_availability(self, member_id: str, availability_format: str = 'slots') -> JSONResponse:
         """Get member availability."""
         try:
-            availability = self.members_service.get_availability(member_id)
+            availability = await self.members_service.get_availability(member_id, availability_format)
             if availability is None:
                 raise HTTPException(status_code=404, detail="Member not found")
             # Return raw map
             return JSONResponse(status_code=200, content=availability)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except NotFoundError as e:
             raise HTTPException(status_code=404, detail=str(e))
         except Exception as e:
@@ -123,7 +168,7 @@ class MembersController:
     async def get_member_teams(self, member_id: str) -> JSONResponse:
         """Get teams a member belongs to."""
         try:
-            teams = self.members_service.get_member_teams(member_id)
+            teams = await self.members_service.get_member_teams(member_id)
             return JSONResponse(status_code=200, content=teams)
         except NotFoundError as e:
             raise HTTPException(status_code=404, detail=str(e))
@@ -11,35 +11,65 @@ from typing import List
 from fastapi import HTTPException
 from fastapi.responses import JSONResponse
 
+from models.team_model import TEAMS
 from services.teams_service import TeamsService
 from schemas.teams import CreateTeamRequest, UpdateTeamRequest, TeamResponse, ListTeamsResponse, TeamMembersResponse
+from utils.concurrency import AsyncFacade
+from utils.conditional import Preconditions, validators
 from utils.errors import ValidationError, NotFoundError, ConflictError
+from utils.metrics import CONTROLLER_SECONDS, timed_methods
+from utils.pagination import NEXT_CURSOR_HEADER
+from utils.response_cache import response_cache
 
 
+@timed_methods(CONTROLLER_SECONDS)
 class TeamsController:
     """Teams controller handling HTTP requests."""
 
     def __init__(self):
-        self.teams_service = TeamsService()
-
-    async def list_teams(self) -> JSONResponse:
-        """List all teams."""
+        self.teams_service = AsyncFacade(TeamsService())
+
+    async def list_teams(self, preconditions: Preconditions | None = None, **filters) -> JSONResponse:
+        """List teams; paging/filter keyword arguments go to the service."""
+        cache = validators((TEAMS,), 'teams', tuple(sorted(filters.items())))
+        if cache.matches(preconditions):
+            return cache.not_modified()
+        cached = response_cache.get(cache)
+        if cached is not None:
+            return cache.respond(cached, preconditions)
         try:
-            teams = self.teams_service.list_teams()
-            # Return raw array
-            return JSONResponse(status_code=200, content=teams)
+            teams, next_cursor = await self.teams_service.list_teams(**filters)
+            # Return raw array; the next page is in a header
+            headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+            return cache.respond(response_cache.put(cache, JSONResponse(status_code=200, content=teams, headers=headers)), preconditions)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
-    async def get_team(self, team_id: str) -> JSONResponse:
+    async def get_team(
+        self,
+        team_id: str,
+        fields: str | None = None,
+        preconditions: Preconditions | None = None,
+    ) -> JSONResponse:
         """Get team by ID."""
+        cache = validators((TEAMS,), 'team', team_id, fields)
+        if cache.matches(preconditions):
+            return cache.not_modified()
+        cached = response_cache.get(cache)
+        if cached is not None:
+            return cache.respond(cached, preconditions)
         try:
-            team = self.teams_service.get_team(team_id)
+            team = await self.teams_service.get_team(team_id, fields)
             if not team:
                 raise HTTPException(status_code=404, detail="Team not found")
             
-            response_data = TeamResponse(**team)
-            return JSONResponse(status_code=200, content=response_data.dict())
+            # Sparse fieldsets are returned as projected, not padded out by the schema
+            content = team if fields is not None else TeamResponse(**team).dict()
+            return cache.respond(response_cache.put(cache, JSONResponse(status_code=200, content=content)), preconditions)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
@@ -47,7 +77,7 @@ class TeamsController:
         """Create a new team."""
         try:
             team_data = request.dict()
-            team = self.teams_service.create_team(team_data, creator_id)
+            team = await self.teams_service.create_team(team_data, creator_id)
             
             response_data = TeamResponse(**team)
             return JSONResponse(status_code=201, content=response_data.dict())
@@ -62,7 +92,7 @@ class TeamsController:
         """Update team."""
         try:
             updates = request.dict(exclude_unset=True)
-            team = self.teams_service.update_team(team_id, updates, user_id)
+            team = await self.teams_service.update_team(team_id, updates, user_id)
             
             if not team:
                 raise HTTPException(status_code=404, detail="Team not found")
@@ -81,7 +111,7 @@ class TeamsController:
     async def delete_team(self, team_id: str, user_id: str) -> JSONResponse:
         """Delete team."""
         try:
-            success = self.teams_service.delete_team(team_id, user_id)
+            success = await self.teams_service.delete_team(team_id, user_id)
             if not success:
                 raise HTTPException(status_code=404, detail="Team not found")
             
@@ -94,7 +124,7 @@ class TeamsController:
     async def get_team_members(self, team_id: str) -> JSONResponse:
         """Get team members."""
         try:
-            members = self.teams_service.get_team_members(team_id)
+            members = await self.teams_service.get_team_members(team_id)
             # Return full member objects array
             return JSONResponse(status_code=200, content=members)
         except Exception as e:
@@ -103,7 +133,7 @@ class TeamsController:
     async def add_member(self, team_id: str, member_id: str, user_id: str) -> JSONResponse:
         """Add member to team."""
         try:
-            team = self.teams_service.add_member_to_team(team_id, member_id, user_id)
+            team = await self.teams_service.add_member_to_team(team_id, member_id, user_id)
             response_data = TeamResponse(**team)
             return JSONResponse(status_code=200, content=response_data.dict())
         except ValidationError as e:
@@ -120,7 +150,7 @@ class TeamsController:
     async def remove_member(self, team_id: str, member_id: str, user_id: str) -> JSONResponse:
         """Remove member from team."""
         try:
-            team = self.teams_service.remove_member_from_team(team_id, member_id, user_id)
+            team = await self.teams_service.remove_member_from_team(team_id, member_id, user_id)
             response_data = TeamResponse(**team)
             return JSONResponse(status_code=200, content=response_data.dict())
         except ValidationError as e:
@@ -3,44 +3,68 @@ Meeting model/data access.
 
 MVP: read/write meeting records in backend/data/meetings.json.
 Production: ORM model with meetings table.
+Storage goes through the active engine (utils.engine).
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from utils.storage import read_json, write_json, update_json
+from utils.engine import Collection, get_engine
+from utils.fields import Fields
 
 
 MEETINGS_FILE = 'meetings.json'
 
+# Fields of the API meeting shape, selectable with ?fields=
+MEETING_FIELDS = (
+    'id', 'title', 'description', 'creatorId', 'teamId', 'timeSlots', 'scheduledTime',
+    'votingStart', 'votingEnd', 'duration', 'timezone', 'status', 'createdAt',
+)
+
+
+def _with_stored_id(rec: Dict[str, Any], idx: int) -> Dict[str, Any]:
+    # Legacy records may carry their id as `_id`
+    if not rec.get('id') and rec.get('_id'):
+        rec['id'] = rec['_id']
+    return rec
+
+
+MEETINGS = Collection('meetings', MEETINGS_FILE, layout='list', indexes=('teamId', 'status'), normalize=_with_stored_id)
+
 
 class MeetingModel:
     @staticmethod
     def _load_storage() -> List[Dict[str, Any]]:
-        return list(read_json(MEETINGS_FILE, default_factory=list) or [])
+        return get_engine().all(MEETINGS)
 
     @staticmethod
     def _save_storage(records: List[Dict[str, Any]]) -> None:
-        write_json(MEETINGS_FILE, records)
+        get_engine().replace_all(MEETINGS, records)
 
     @staticmethod
-    def _to_api(rec: Dict[str, Any]) -> Dict[str, Any]:
-        return {
-            'id': rec.get('id') or rec.get('_id') or None,
-            'title': rec.get('title'),
-            'description': rec.get('description'),
-            'creatorId': rec.get('creatorId'),
-            'teamId': rec.get('teamId'),
-            'timeSlots': rec.get('timeSlots'),
-            'scheduledTime': rec.get('scheduledTime'),
-            'votingStart': rec.get('votingStart'),
-            'votingEnd': rec.get('votingEnd'),
-            'duration': rec.get('duration'),
-            'timezone': rec.get('timezone'),
-            'status': rec.get('status') or 'scheduled',
-            'createdAt': rec.get('createdAt'),
+    def _to_api(rec: Dict[str, Any], fields: Fields = None) -> Dict[str, Any]:
+        # fields: only these are built (see utils.fields); None builds all
+        def time_slots() -> Any:
+            slots = rec.get('timeSlots')
+            return list(slots) if isinstance(slots, list) else slots
+
+        builders = {
+            'id': lambda: rec.get('id') or rec.get('_id') or None,
+            'title': lambda: rec.get('title'),
+            'description': lambda: rec.get('description'),
+            'creatorId': lambda: rec.get('creatorId'),
+            'teamId': lambda: rec.get('teamId'),
+            'timeSlots': time_slots,
+            'scheduledTime': lambda: rec.get('scheduledTime'),
+            'votingStart': lambda: rec.get('votingStart'),
+            'votingEnd': lambda: rec.get('votingEnd'),
+            'duration': lambda: rec.get('duration'),
+            'timezone': lambda: rec.get('timezone'),
+            'status': lambda: rec.get('status') or 'scheduled',
+            'createdAt': lambda: rec.get('createdAt'),
         }
+        return {field: build() for field, build in builders.items() if fields is None or field in fields}
 
     @staticmethod
     def _from_api(payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -61,19 +85,31 @@ class MeetingModel:
         }
 
     @classmethod
-    def list_meetings(cls) -> List[Dict[str, Any]]:
-        return [cls._to_api(m) for m in cls._load_storage()]
+    def list_meetings(cls, fields: Fields = None, tx: Any = None) -> List[Dict[str, Any]]:
+        records = tx.all(MEETINGS) if tx is not None else cls._load_storage()
+        return [cls._to_api(m, fields) for m in records]
+
+    @classmethod
+    def page_meetings(
+        cls,
+        limit: int,
+        after: Optional[str] = None,
+        where: Optional[Dict[str, Any]] = None,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        fields: Fields = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        # Filters see stored records; only the page is projected
+        records, next_key = get_engine().page(MEETINGS, limit, after, where, predicate=predicate)
+        return [cls._to_api(m, fields) for m in records], next_key
 
     @classmethod
-    def list_meetings_by_team(cls, team_id: str) -> List[Dict[str, Any]]:
-        return [cls._to_api(m) for m in cls._load_storage() if m.get('teamId') == team_id]
+    def list_meetings_by_team(cls, team_id: str, fields: Fields = None) -> List[Dict[str, Any]]:
+        return [cls._to_api(m, fields) for m in get_engine().find(MEETINGS, 'teamId', team_id)]
 
     @classmethod
-    def get_meeting(cls, meeting_id: str) -> Optional[Dict[str, Any]]:
-        for m in cls._load_storage():
-            if (m.get('id') or m.get('_id')) == meeting_id:
-                return cls._to_api(m)
-        return None
+    def get_meeting(cls, meeting_id: str, tx: Any = None, fields: Fields = None) -> Optional[Dict[str, Any]]:
+        rec = (tx or get_engine()).get(MEETINGS, meeting_id)
+        return cls._to_api(rec, fields) if rec is not None else None
 
     @classmethod
     def create_meeting(cls, team_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -88,16 +124,12 @@ class MeetingModel:
         if not record.get('createdAt'):
             record['createdAt'] = datetime.utcnow().isoformat() + 'Z'
         
-        with update_json(MEETINGS_FILE, default_factory=list) as data:
-            data.append(record)
+        get_engine().put(MEETINGS, record)
         return cls._to_api(record)
 
     @classmethod
     def update_meeting(cls, meeting_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        storage = cls._load_storage()
-        for idx, rec in enumerate(storage):
-            if (rec.get('id') or rec.get('_id')) != meeting_id:
-                continue
+        def merge(rec: Dict[str, Any]) -> Dict[str, Any]:
             # Perform a partial update: only apply fields explicitly provided in updates
             # without overriding other existing fields.
             merged = dict(rec)
@@ -109,22 +141,11 @@ class MeetingModel:
             for key, value in updates.items():
                 if key in allowed_keys:
                     merged[key] = value
-            storage[idx] = merged
-            cls._save_storage(storage)
-            return cls._to_api(merged)
-        return None
+            return merged
 
-    @classmethod
-    def delete_meeting(cls, meeting_id: str) -> bool:
-        storage = cls._load_storage()
-        kept: List[Dict[str, Any]] = []
-        removed = False
-        for rec in storage:
-            if (rec.get('id') or rec.get('_id')) == meeting_id:
-                removed = True
-                continue
-            kept.append(rec)
-        if removed:
-            cls._save_storage(kept)
-        return removed
+        merged = get_engine().update(MEETINGS, meeting_id, merge)
+        return cls._to_api(merged) if merged is not None else None
 
+    @classmethod
+    def delete_meeting(cls, meeting_id: str, tx: Any = None) -> bool:
+        return (tx or get_engine()).delete(MEETINGS, meeting_id)
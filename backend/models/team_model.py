@@ -3,18 +3,28 @@ Team model/data access.
 
 MVP: read/write team records in backend/data/teams.json including member IDs.
 Production: ORM model with teams and team_members tables.
+Storage goes through the active engine (utils.engine).
 """
 
 from __future__ import annotations
 
 from typing import Any, Dict, List, Optional, Tuple
 
-from utils.storage import read_json, write_json, update_json
+from utils.engine import Collection, get_engine
+from utils.fields import Fields, pick
 from models.user_model import UserModel
 
 
 TEAMS_FILE = 'teams.json'
 
+# Fields of the API team shape, selectable with ?fields=
+TEAM_FIELDS = (
+    'id', 'name', 'description', 'timezone', 'members', 'admin',
+    'memberCount', 'meetingCount', 'createdAt',
+)
+
+TEAMS = Collection('teams', TEAMS_FILE, layout='map', indexes=('timezone',), unique=('name',))
+
 
 def _slugify(value: str) -> str:
     return ''.join(ch.lower() if ch.isalnum() else '-' for ch in (value or '').strip()).strip('-') or 'team'
@@ -23,27 +33,45 @@ def _slugify(value: str) -> str:
 class TeamModel:
     """Team data model for CRUD operations on teams.json."""
 
+    @staticmethod
+    def _to_api(team: Dict[str, Any], fields: Fields = None) -> Dict[str, Any]:
+        # Teams are stored in API shape. Shallow copies: stored records are
+        # shared and must not be mutated by callers
+        return pick(team, fields)
+
+    @classmethod
+    def list_teams(cls, tx: Any = None, fields: Fields = None) -> List[Dict[str, Any]]:
+        return [cls._to_api(team, fields) for team in (tx or get_engine()).all(TEAMS)]
+
+    @classmethod
+    def page_teams(
+        cls,
+        limit: int,
+        after: Optional[str] = None,
+        where: Optional[Dict[str, Any]] = None,
+        fields: Fields = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        teams, next_key = get_engine().page(TEAMS, limit, after, where)
+        return [cls._to_api(team, fields) for team in teams], next_key
 
     @classmethod
-    def list_teams(cls) -> List[Dict[str, Any]]:
-        storage = read_json(TEAMS_FILE, default_factory=dict)
-        return list(storage.values())
+    def get_team(cls, team_id: str, tx: Any = None, fields: Fields = None) -> Optional[Dict[str, Any]]:
+        team = (tx or get_engine()).get(TEAMS, team_id)
+        return cls._to_api(team, fields) if team is not None else None
 
     @classmethod
-    def get_team(cls, team_id: str) -> Optional[Dict[str, Any]]:
-        storage = read_json(TEAMS_FILE, default_factory=dict)
-        return storage.get(team_id)
+    def get_team_by_name(cls, name: str) -> Optional[Dict[str, Any]]:
+        # Case-insensitive probe of the unique name index
+        team = get_engine().lookup(TEAMS, 'name', name)
+        return dict(team) if team is not None else None
 
     @classmethod
     def get_team_members(cls, team_id: str) -> List[Dict[str, Any]]:
         team = cls.get_team(team_id)
         if not team:
             return []
-        members: List[Dict[str, Any]] = []
-        for mid in team.get('members', []):
-            user = UserModel.get_member(mid)
-            if user:
-                members.append(user)
+        # Ids of deleted members are skipped
+        members, _ = UserModel.get_members(team.get('members', []))
         return members
 
     @classmethod
@@ -72,46 +100,29 @@ class TeamModel:
             'createdAt': datetime.now().isoformat()
         }
         
-        # Load existing teams and add new team
-        existing_teams = read_json(TEAMS_FILE, default_factory=dict)
-        existing_teams[team_id] = team_data
+        # Save new team
+        get_engine().put(TEAMS, team_data)
         
-        # Save updated teams
-        write_json(TEAMS_FILE, existing_teams)
-        
-        return team_data
+        return dict(team_data)
 
     @classmethod
-    def update_team(cls, team_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        storage = read_json(TEAMS_FILE, default_factory=dict)
-        
-        if team_id not in storage:
-            return None
+    def update_team(cls, team_id: str, updates: Dict[str, Any], tx: Any = None) -> Optional[Dict[str, Any]]:
+        def apply(team: Dict[str, Any]) -> Dict[str, Any]:
+            team = dict(team)
+            # Update team data with provided updates
+            for key, value in updates.items():
+                if key in team:
+                    team[key] = value
             
-        team = storage[team_id]
-        
-        # Update team data with provided updates
-        for key, value in updates.items():
-            if key in team:
-                team[key] = value
-        
-        # Recalculate computed fields
-        if 'members' in updates:
-            team['memberCount'] = len(team['members'])
-            team['admin'] = team['members'][0] if team['members'] else None
-        
-        # Save updated data
-        write_json(TEAMS_FILE, storage)
-        
-        return team
+            # Recalculate computed fields
+            if 'members' in updates:
+                team['memberCount'] = len(team['members'])
+                team['admin'] = team['members'][0] if team['members'] else None
+            return team
+
+        team = (tx or get_engine()).update(TEAMS, team_id, apply)
+        return dict(team) if team is not None else None
 
     @classmethod
     def delete_team(cls, team_id: str) -> bool:
-        storage = read_json(TEAMS_FILE, default_factory=dict)
-        
-        if team_id in storage:
-            del storage[team_id]
-            write_json(TEAMS_FILE, storage)
-            return True
-        return False
-
+        return get_engine().delete(TEAMS, team_id)
@@ -3,17 +3,26 @@ User model/data access.
 
 MVP: read/write user records in backend/data/members.json.
 Production: ORM model with users table, password hashes, timezone, role.
+Storage goes through the active engine (utils.engine).
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from utils.storage import read_json, write_json, update_json
+from utils import availability as avail
+from utils.engine import Collection, get_engine, transaction
+from utils.fields import Fields
 
 
 MEMBERS_FILE = 'members.json'
 
+# Fields of the API member shape, selectable with ?fields=
+MEMBER_FIELDS = (
+    'id', 'name', 'email', 'timezone', 'role', 'status',
+    'availability', 'teams', 'avatar', 'createdAt',
+)
+
 
 def _slugify(value: str) -> str:
     return ''.join(ch.lower() if ch.isalnum() else '-' for ch in (value or '').strip()).strip('-') or 'user'
@@ -29,22 +38,23 @@ def _normalize_timezone(tz: str) -> str:
     return mapped or key
 
 
-def _availability_array_to_week_slots(arr: List[int]) -> Dict[str, bool]:
-    # Legacy storage uses 24-length vector. Map to Monday (day_0) hourly slots 0..23
-    if not isinstance(arr, list):
-        return {}
-    slots: Dict[str, bool] = {}
-    for idx, v in enumerate(arr[:24]):
-        if int(v) == 1:
-            slots[f'day_0_slot_{idx}'] = True
-    return slots
+def _with_stored_id(record: Dict[str, Any], idx: int) -> Dict[str, Any]:
+    # Migration: persist the id that legacy records without one were served under
+    # (slugified name + position), so ids stay stable when members are deleted
+    if not record.get('id'):
+        record['id'] = UserModel._to_api(record, idx)['id']
+    return record
 
 
-def _week_slots_to_availability_array(slots: Dict[str, Any]) -> Dict[str, bool]:
-    # Store the full availability object instead of converting to legacy array
-    if not isinstance(slots, dict):
-        return {}
-    return {k: bool(v) for k, v in slots.items()}
+MEMBERS = Collection(
+    'members',
+    MEMBERS_FILE,
+    layout='list',
+    indexes=('status', 'timezone'),
+    unique=('name', 'email'),  # case-insensitive, see utils.engine.fold_value
+    legacy_field='name',  # accidental object storage is keyed by name
+    normalize=_with_stored_id,
+)
 
 
 class UserModel:
@@ -52,47 +62,50 @@ class UserModel:
 
     @staticmethod
     def _load_storage() -> List[Dict[str, Any]]:
-        data = read_json(MEMBERS_FILE, default_factory=list)
-        if isinstance(data, dict):  # if someone stored an object accidentally
-            # Convert dict of name->record to list
-            data = [{"name": k, **(v or {})} for k, v in data.items()]
-        return list(data or [])
+        return get_engine().all(MEMBERS)
 
     @staticmethod
     def _save_storage(records: List[Dict[str, Any]]) -> None:
-        write_json(MEMBERS_FILE, records)
+        get_engine().replace_all(MEMBERS, records)
 
     @staticmethod
-    def _to_api(record: Dict[str, Any], idx: int) -> Dict[str, Any]:
-        name = (record.get('name') or '').strip() or f'User {idx+1}'
-        timezone = _normalize_timezone(record.get('timezone') or 'UTC')
-        availability = record.get('availability')
-        
-        # Handle both legacy array format and new dict format
-        if isinstance(availability, list):
-            api_availability = _availability_array_to_week_slots(availability)
-        else:
-            api_availability = availability or {}
-        
-        # Generate deterministic id from name and index fallback
-        generated_id = f"{_slugify(name)}-{idx+1}"
-        return {
-            'id': record.get('id') or generated_id,
-            'name': name,
-            'email': record.get('email') or None,
-            'timezone': timezone,
-            'role': record.get('role') or 'member',
-            'status': record.get('status') or 'offline',
-            'availability': api_availability,
-            'teams': record.get('teams') or [],
-            'avatar': record.get('avatar') or None,
-            'createdAt': record.get('createdAt') or None,
+    def _to_api(
+        record: Dict[str, Any],
+        idx: Optional[int] = None,
+        availability_format: str = 'slots',
+        fields: Fields = None,
+    ) -> Dict[str, Any]:
+        # idx is the storage position, only used for fallbacks on incomplete records.
+        # availability_format: 'slots' (day_D_slot_H map), 'base64' (compact wire
+        # form) or 'bits' (the 168-bit mask, for internal callers).
+        # fields: only these are built (see utils.fields); None builds all
+        position = idx + 1 if idx is not None else 1
+        name = (record.get('name') or '').strip() or f'User {position}'
+
+        def availability() -> Any:
+            # Stored as base64 bits; older records hold a slot map or legacy array
+            bits = avail.decode(record.get('availability'))
+            return bits if availability_format == 'bits' else avail.encode(bits, availability_format)
+
+        builders = {
+            # Generate deterministic id from name and index fallback
+            'id': lambda: record.get('id') or f"{_slugify(name)}-{position}",
+            'name': lambda: name,
+            'email': lambda: record.get('email') or None,
+            'timezone': lambda: _normalize_timezone(record.get('timezone') or 'UTC'),
+            'role': lambda: record.get('role') or 'member',
+            'status': lambda: record.get('status') or 'offline',
+            'availability': availability,
+            'teams': lambda: list(record.get('teams') or []),
+            'avatar': lambda: record.get('avatar') or None,
+            'createdAt': lambda: record.get('createdAt') or None,
         }
+        return {field: build() for field, build in builders.items() if fields is None or field in fields}
 
     @staticmethod
     def _from_api(payload: Dict[str, Any]) -> Dict[str, Any]:
-        availability_slots = payload.get('availability') or {}
-        # Store availability as-is instead of converting to legacy array
+        # Accepts a slot map, base64 string or mask; always stored as base64 bits
+        availability_bits = avail.decode(payload.get('availability'))
         return {
             'id': payload.get('id') or _slugify(payload.get('name') or 'user'),
             'name': payload.get('name'),
@@ -100,7 +113,7 @@ class UserModel:
             'timezone': _normalize_timezone(payload.get('timezone') or 'UTC'),
             'role': payload.get('role') or 'member',
             'status': payload.get('status') or 'offline',
-            'availability': availability_slots,  # Store as dict, not array
+            'availability': avail.to_base64(availability_bits),
             'teams': payload.get('teams') or [],
             'avatar': payload.get('avatar'),
             'createdAt': payload.get('createdAt'),
@@ -109,81 +122,115 @@ class UserModel:
 
     # Read operations (API shapes)
     @classmethod
-    def list_members(cls) -> List[Dict[str, Any]]:
+    def list_members(cls, availability_format: str = 'slots', fields: Fields = None) -> List[Dict[str, Any]]:
         storage = cls._load_storage()
-        return [cls._to_api(rec, i) for i, rec in enumerate(storage)]
+        return [cls._to_api(rec, i, availability_format, fields) for i, rec in enumerate(storage)]
 
     @classmethod
-    def get_member(cls, member_id: str) -> Optional[Dict[str, Any]]:
-        storage = cls._load_storage()
-        for i, rec in enumerate(storage):
-            api = cls._to_api(rec, i)
-            if api['id'] == member_id:
-                return api
-        return None
+    def page_members(
+        cls,
+        limit: int,
+        after: Optional[str] = None,
+        where: Optional[Dict[str, Any]] = None,
+        member_ids: Optional[Iterable[str]] = None,
+        availability_format: str = 'slots',
+        fields: Fields = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of members in id order, filtered on stored fields before
+        projection. Returns (members, id to resume after or None)."""
+        records, next_key = get_engine().page(MEMBERS, limit, after, where, member_ids)
+        return [cls._to_api(rec, availability_format=availability_format, fields=fields) for rec in records], next_key
+
+    @classmethod
+    def get_member(
+        cls,
+        member_id: str,
+        availability_format: str = 'slots',
+        tx: Any = None,
+        fields: Fields = None,
+    ) -> Optional[Dict[str, Any]]:
+        # Keyed lookup: every stored record has a persisted id
+        rec = (tx or get_engine()).get(MEMBERS, member_id)
+        return cls._to_api(rec, availability_format=availability_format, fields=fields) if rec is not None else None
+
+    @classmethod
+    def get_members(
+        cls,
+        member_ids: Iterable[str],
+        availability_format: str = 'slots',
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Resolve many ids in one storage pass.
+
+        Returns (members in the order of `member_ids`, ids that were not found).
+        """
+        member_ids = list(member_ids)
+        members: List[Dict[str, Any]] = []
+        missing: List[str] = []
+        for member_id, rec in zip(member_ids, get_engine().get_many(MEMBERS, member_ids)):
+            if rec is None:
+                missing.append(member_id)
+            else:
+                members.append(cls._to_api(rec, availability_format=availability_format))
+        return members, missing
 
     @classmethod
     def get_member_by_name(cls, name: str) -> Optional[Dict[str, Any]]:
-        storage = cls._load_storage()
-        for i, rec in enumerate(storage):
-            if (rec.get('name') or '').strip() == (name or '').strip():
-                return cls._to_api(rec, i)
-        return None
+        rec = get_engine().lookup(MEMBERS, 'name', name)
+        return cls._to_api(rec) if rec is not None else None
+
+    @classmethod
+    def get_member_by_email(cls, email: str) -> Optional[Dict[str, Any]]:
+        rec = get_engine().lookup(MEMBERS, 'email', email)
+        return cls._to_api(rec) if rec is not None else None
+
+    @classmethod
+    def get_password_hash(cls, member_id: str) -> Optional[str]:
+        rec = get_engine().get(MEMBERS, member_id)
+        return rec.get('password_hash') if rec is not None else None
 
     # Write operations (persist in storage format)
     @classmethod
     def create_member(cls, payload: Dict[str, Any]) -> Dict[str, Any]:
-        with update_json(MEMBERS_FILE, default_factory=list) as data:
-            record = cls._from_api(payload)
-            data.append(record)
+        record = cls._from_api(payload)
+        # Ids are slugs of the name; never let a new member overwrite an
+        # existing one. Probe and insert in one transaction so a concurrent
+        # registration cannot take the same id in between.
+        base_id, suffix = record['id'], 1
+        with transaction(MEMBERS) as tx:
+            while tx.get(MEMBERS, record['id']) is not None:
+                suffix += 1
+                record['id'] = f"{base_id}-{suffix}"
+            tx.put(MEMBERS, record)
         # Return API view
-        storage = cls._load_storage()
-        return cls._to_api(storage[-1], len(storage) - 1)
+        return cls._to_api(record)
 
     @classmethod
-    def update_member(cls, member_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        storage = cls._load_storage()
-        updated: Optional[Dict[str, Any]] = None
-        for idx, rec in enumerate(storage):
-            api = cls._to_api(rec, idx)
-            if api['id'] == member_id:
-                # merge updates (API level), then convert back to storage
-                merged_api = {**api, **updates}
-                new_storage_record = cls._from_api(merged_api)
-                # Preserve sensitive/critical fields that are not part of API surface
-                # Specifically ensure password_hash is never dropped unless explicitly provided
-                if new_storage_record.get('password_hash') is None and rec.get('password_hash') is not None:
-                    new_storage_record['password_hash'] = rec.get('password_hash')
-                # Preserve createdAt if not provided
-                if new_storage_record.get('createdAt') is None and rec.get('createdAt') is not None:
-                    new_storage_record['createdAt'] = rec.get('createdAt')
-                # Preserve avatar if not provided (profile updates may not send it)
-                if new_storage_record.get('avatar') is None and rec.get('avatar') is not None:
-                    new_storage_record['avatar'] = rec.get('avatar')
-
-                storage[idx] = new_storage_record
-                updated = cls._to_api(storage[idx], idx)
-                break
-        if updated is not None:
-            cls._save_storage(storage)
-        return updated
+    def update_member(cls, member_id: str, updates: Dict[str, Any], tx: Any = None) -> Optional[Dict[str, Any]]:
+        def merge(current: Dict[str, Any]) -> Dict[str, Any]:
+            # Keep availability as a mask so an untouched value is not re-parsed
+            api = cls._to_api(current, availability_format='bits')
+            # merge updates (API level), then convert back to storage
+            merged_api = {**api, **updates}
+            new_storage_record = cls._from_api(merged_api)
+            # Preserve sensitive/critical fields that are not part of API surface
+            # Specifically ensure password_hash is never dropped unless explicitly provided
+            if new_storage_record.get('password_hash') is None and current.get('password_hash') is not None:
+                new_storage_record['password_hash'] = current.get('password_hash')
+            # Preserve createdAt if not provided
+            if new_storage_record.get('createdAt') is None and current.get('createdAt') is not None:
+                new_storage_record['createdAt'] = current.get('createdAt')
+            # Preserve avatar if not provided (profile updates may not send it)
+            if new_storage_record.get('avatar') is None and current.get('avatar') is not None:
+                new_storage_record['avatar'] = current.get('avatar')
+            return new_storage_record
+
+        updated = (tx or get_engine()).update(MEMBERS, member_id, merge)
+        return cls._to_api(updated) if updated is not None else None
 
     @classmethod
-    def update_availability(cls, member_id: str, availability: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def update_availability(cls, member_id: str, availability: Any) -> Optional[Dict[str, Any]]:
         return cls.update_member(member_id, {'availability': availability})
 
     @classmethod
-    def delete_member(cls, member_id: str) -> bool:
-        storage = cls._load_storage()
-        kept: List[Dict[str, Any]] = []
-        removed = False
-        for idx, rec in enumerate(storage):
-            api = cls._to_api(rec, idx)
-            if api['id'] == member_id:
-                removed = True
-                continue
-            kept.append(rec)
-        if removed:
-            cls._save_storage(kept)
-        return removed
-
+    def delete_member(cls, member_id: str, tx: Any = None) -> bool:
+        return (tx or get_engine()).delete(MEMBERS, member_id)
@@ -1,28 +1,120 @@
 """
 Vote model/data access.
 
-MVP: read/write vote records in backend/data/votes.json.
+MVP: vote records live in backend/data/votes.json (compacted snapshot) plus
+backend/data/votes.log (append-only journal of upserts and tombstones).
 Production: ORM model with votes table.
+Storage goes through the active engine (utils.engine).
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Set
 
-from utils.storage import read_json, write_json, update_json
+from utils.engine import Collection, View, get_engine
+from utils.pubsub import Hub
+from utils.storage import LOCK_STRIPES
 
 
 VOTES_FILE = 'votes.json'
+VOTES_LOG = 'votes.log'
+
+PREFERENCE_RANK = {'low': 1, 'medium': 2, 'high': 3}
+
+
+class VoteTallies(View):
+    """Per-meeting vote tallies, maintained by the engine on every change.
+
+    meetingId -> {'voters': {userId}, 'slots': {timeSlot: {preference: n}}}.
+    Keeping preference counts (not just the max) lets a replaced or
+    retracted vote be subtracted exactly.
+    """
+
+    def __init__(self) -> None:
+        self.meetings: Dict[str, Dict[str, Any]] = {}
+
+    def apply(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        if old is not None:
+            self._add(old, -1)
+        if new is not None:
+            self._add(new, 1)
+
+    def _add(self, vote: Dict[str, Any], delta: int) -> None:
+        meeting_id = vote.get('meetingId')
+        tally = self.meetings.setdefault(meeting_id, {'voters': set(), 'slots': {}})
+        if delta > 0:
+            tally['voters'].add(vote.get('userId'))
+        else:
+            tally['voters'].discard(vote.get('userId'))
+        slot = vote.get('timeSlot')
+        if slot:
+            prefs = tally['slots'].setdefault(slot, {})
+            pref = vote.get('preference') or 'medium'
+            prefs[pref] = prefs.get(pref, 0) + delta
+            if prefs[pref] <= 0:
+                del prefs[pref]
+            if not prefs:
+                del tally['slots'][slot]
+        if not tally['voters'] and not tally['slots']:
+            del self.meetings[meeting_id]
+
+    def results(self, meeting_id: str) -> Dict[str, Dict[str, Any]]:
+        # { timeSlot: { votes: n, preference: highestPreference } }, O(slots)
+        tally = self.meetings.get(meeting_id)
+        if tally is None:
+            return {}
+        results: Dict[str, Dict[str, Any]] = {}
+        for slot, prefs in tally['slots'].items():
+            best = 'low'
+            for pref in prefs:
+                if PREFERENCE_RANK.get(pref, 0) > PREFERENCE_RANK.get(best, 0):
+                    best = pref
+            results[slot] = {'votes': sum(prefs.values()), 'preference': best}
+        return results
+
+    def voters(self, meeting_id: str) -> Set[str]:
+        tally = self.meetings.get(meeting_id)
+        return set(tally['voters']) if tally is not None else set()
+
+# One vote per user per meeting: upserts replace the user's previous vote
+VOTES = Collection(
+    'votes',
+    VOTES_FILE,
+    layout='journal',
+    journal=VOTES_LOG,
+    key=('meetingId', 'userId'),
+    indexes=('meetingId',),
+    views={'tallies': VoteTallies},
+)
+
+
+# Live tally changes per meeting id: {timeSlot: {votes, preference}} for the
+# slots that changed (votes 0 once a slot has none). Values are absolute, so
+# updates a slow subscriber has not read yet merge into one.
+TALLY_UPDATES = Hub('vote-tallies', merge=lambda older, newer: {**older, **newer})
+
+# meetingId -> results last published. Each meeting's publishes are
+# serialized by its lock stripe so its updates never go backwards, while
+# other meetings publish in parallel.
+_published_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+_published: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+
+def _published_lock(meeting_id: str) -> threading.Lock:
+    return _published_locks[zlib.crc32(str(meeting_id).encode('utf-8')) % LOCK_STRIPES]
 
 
 class VoteModel:
     @staticmethod
     def _load_storage() -> List[Dict[str, Any]]:
-        return list(read_json(VOTES_FILE, default_factory=list) or [])
+        return get_engine().all(VOTES)
 
-    @staticmethod
-    def _save_storage(records: List[Dict[str, Any]]) -> None:
-        write_json(VOTES_FILE, records)
+    @classmethod
+    def compact(cls) -> None:
+        """Fold the vote journal into votes.json (JSON engine only)."""
+        get_engine().compact(VOTES)
 
     @staticmethod
     def _to_api(rec: Dict[str, Any]) -> Dict[str, Any]:
@@ -48,10 +140,9 @@ class VoteModel:
 
     @classmethod
     def list_votes(cls, meeting_id: Optional[str] = None) -> List[Dict[str, Any]]:
-        votes = [cls._to_api(v) for v in cls._load_storage()]
         if meeting_id is None:
-            return votes
-        return [v for v in votes if v.get('meetingId') == meeting_id]
+            return [cls._to_api(v) for v in cls._load_storage()]
+        return [cls._to_api(v) for v in get_engine().find(VOTES, 'meetingId', meeting_id)]
 
     @classmethod
     def submit_vote(cls, meeting_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -65,28 +156,70 @@ class VoteModel:
         if not record.get('createdAt'):
             record['createdAt'] = datetime.utcnow().isoformat() + 'Z'
         
-        with update_json(VOTES_FILE, default_factory=list) as data:
-            data[:] = [v for v in data if not (
-                (v.get('meetingId') == record.get('meetingId')) and (v.get('userId') == record.get('userId'))
-            )]
-            data.append(record)
+        get_engine().put(VOTES, record)
+        cls._publish_tallies(meeting_id)
         return cls._to_api(record)
 
+    @classmethod
+    def delete_vote(cls, meeting_id: str, user_id: str) -> bool:
+        """Retract a user's vote (a tombstone in the JSON journal)."""
+        deleted = get_engine().delete(VOTES, (meeting_id, user_id))
+        if deleted:
+            cls._publish_tallies(meeting_id)
+        return deleted
+
+    @classmethod
+    def _publish_tallies(cls, meeting_id: str) -> None:
+        """Publish the meeting's changed slots to live subscribers.
+
+        One tally read per vote, shared by every subscriber; nothing is read
+        when nobody is watching.
+        """
+        with _published_lock(meeting_id):
+            if not TALLY_UPDATES.has_subscribers(meeting_id):
+                _published.pop(meeting_id, None)
+                return
+            # Read under the lock: each publish sees a state at least as new as the last
+            results = cls.aggregate_results(meeting_id)
+            previous = _published.get(meeting_id, {})
+            delta = {slot: tally for slot, tally in results.items() if previous.get(slot) != tally}
+            for slot in previous.keys() - results.keys():
+                delta[slot] = {'votes': 0, 'preference': 'low'}
+            _published[meeting_id] = results
+            if delta:
+                TALLY_UPDATES.publish(meeting_id, delta)
+
+    @classmethod
+    def close_tallies(cls, meeting_id: str) -> None:
+        """End the meeting's live updates once it is deleted."""
+        with _published_lock(meeting_id):
+            _published.pop(meeting_id, None)
+            TALLY_UPDATES.close_topic(meeting_id)
+
+    @classmethod
+    def delete_votes_for_meetings(cls, meeting_ids: Iterable[str], tx: Any = None) -> int:
+        """Remove every vote on the given meetings in one write; return how many."""
+        return (tx or get_engine()).delete_where(VOTES, 'meetingId', meeting_ids)
+
+    @classmethod
+    def delete_votes_for_meeting(cls, meeting_id: str, tx: Any = None) -> int:
+        return cls.delete_votes_for_meetings([meeting_id], tx=tx)
+
+    @classmethod
+    def voted_meeting_ids(cls, tx: Any = None) -> Set[str]:
+        """Ids of meetings that have at least one vote."""
+        if tx is not None:
+            # Views are not transactional; scan what the batch sees
+            return {vote.get('meetingId') for vote in tx.all(VOTES)}
+        return get_engine().read_view(VOTES, 'tallies', lambda tallies: set(tallies.meetings))
+
     @classmethod
     def aggregate_results(cls, meeting_id: str) -> Dict[str, Dict[str, Any]]:
-        # Return { timeSlot: { votes: n, preference: highestPreference } }
-        pref_rank = {'low': 1, 'medium': 2, 'high': 3}
-        results: Dict[str, Dict[str, Any]] = {}
-        for vote in cls._load_storage():
-            if vote.get('meetingId') != meeting_id:
-                continue
-            slot = vote.get('timeSlot')
-            pref = vote.get('preference') or 'medium'
-            if not slot:
-                continue
-            bucket = results.setdefault(slot, {'votes': 0, 'preference': 'low'})
-            bucket['votes'] += 1
-            if pref_rank.get(pref, 0) > pref_rank.get(bucket['preference'], 0):
-                bucket['preference'] = pref
-        return results
+        # Return { timeSlot: { votes: n, preference: highestPreference } } from the tallies
+        return get_engine().read_view(VOTES, 'tallies', lambda tallies: tallies.results(meeting_id))
+
+    @classmethod
+    def list_voters(cls, meeting_id: str) -> Set[str]:
+        """User ids that currently have a vote on the meeting."""
+        return get_engine().read_view(VOTES, 'tallies', lambda tallies: tallies.voters(meeting_id))
 
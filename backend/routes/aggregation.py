@@ -7,6 +7,18 @@ into time buckets, with optional tz conversion.
 
 from __future__ import annotations
 
-from fastapi import APIRouter
+from typing import Optional
 
-router = APIRouter(prefix="/api/v1/aggregation", tags=["Aggregation"])
+from fastapi import APIRouter, Depends
+
+from controllers.aggregation_controller import AggregationController
+from routes.dependencies import request_snapshot
+
+
+router = APIRouter(prefix="/api/v1/teams", tags=["Aggregation"], dependencies=[Depends(request_snapshot)])
+controller = AggregationController()
+
+
+@router.get("/{team_id}/availability/heatmap")
+async def get_team_heatmap(team_id: str, timezone: Optional[str] = None):
+    return await controller.get_team_heatmap(team_id, timezone)
@@ -0,0 +1,50 @@
+"""
+Shared route dependencies.
+"""
+
+from __future__ import annotations
+
+from typing import AsyncIterator, Optional
+
+from fastapi import Header, HTTPException
+
+from utils.auth import get_current_user
+from utils.conditional import Preconditions
+from utils.engine import read_snapshot
+
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """Extract the token from an `Authorization: Bearer <token>` header."""
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization.split(" ", 1)[1]
+    return None
+
+
+def require_user_id(authorization: str | None = Header(default=None)) -> str:
+    """Authenticated user id from the bearer token, or 401.
+
+    Verification is cached per token (see utils.auth), so repeated requests
+    with the same token cost a dictionary lookup.
+    """
+    user_id = get_current_user(bearer_token(authorization))
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return user_id
+
+
+def preconditions(
+    if_none_match: Optional[str] = Header(default=None),
+    if_modified_since: Optional[str] = Header(default=None),
+) -> Preconditions:
+    """Conditional GET headers, checked by controllers before any storage read."""
+    return Preconditions(if_none_match, if_modified_since)
+
+
+async def request_snapshot() -> AsyncIterator[None]:
+    """Memoize storage reads for the duration of the request (utils.engine.ReadSnapshot).
+
+    Async so the snapshot is set in the request's own context, which the
+    storage pools copy into their worker threads.
+    """
+    with read_snapshot():
+        yield
@@ -4,50 +4,58 @@ Meetings routes for /api/v1/meetings.
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Header, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
 
 from controllers.meetings_controller import MeetingsController
 from schemas.meetings import CreateMeetingRequest, UpdateMeetingRequest, SubmitVoteRequest
-from utils.auth import get_current_user
-
+from routes.dependencies import preconditions, request_snapshot, require_user_id
+from utils.conditional import Preconditions
+from utils.pagination import MAX_LIMIT
 
-router = APIRouter(prefix="/api/v1/meetings", tags=["Meetings"])
-controller = MeetingsController()
 
+router = APIRouter(prefix="/api/v1/meetings", tags=["Meetings"], dependencies=[Depends(request_snapshot)])
 
-def _require_user_id(authorization: str | None = Header(default=None)) -> str:
-    token = None
-    if authorization and authorization.lower().startswith("bearer "):
-        token = authorization.split(" ", 1)[1]
-    user_id = get_current_user(token)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-    return user_id
+# Sparse fieldsets: ?fields=id,title,status limits each meeting to those fields
+Fields = Query(None, description="Comma-separated fields to return (id is always included)")
+controller = MeetingsController()
 
 
 @router.get("")
-async def list_meetings():
-    return await controller.list_meetings()
+async def list_meetings(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    team_id: Optional[str] = Query(None, alias='teamId'),
+    status: Optional[str] = None,
+    start: Optional[str] = Query(None, alias='from'),
+    end: Optional[str] = Query(None, alias='to'),
+    fields: Optional[str] = Fields,
+    conditions: Preconditions = Depends(preconditions),
+):
+    return await controller.list_meetings(
+        conditions, limit=limit, cursor=cursor, team_id=team_id, status=status, start=start, end=end, fields=fields,
+    )
 
 
 # Deprecated in favor of /teams/{team_id}/meetings alias in teams routes
 
 
 @router.get("/{meeting_id}")
-async def get_meeting(meeting_id: str):
-    return await controller.get_meeting(meeting_id)
+async def get_meeting(meeting_id: str, fields: Optional[str] = Fields, conditions: Preconditions = Depends(preconditions)):
+    return await controller.get_meeting(meeting_id, fields, conditions)
 
 
 # Deprecated in favor of /teams/{team_id}/meetings alias in teams routes
 
 
 @router.put("/{meeting_id}")
-async def update_meeting(meeting_id: str, payload: UpdateMeetingRequest, user_id: str = Depends(_require_user_id)):
+async def update_meeting(meeting_id: str, payload: UpdateMeetingRequest, user_id: str = Depends(require_user_id)):
     return await controller.update_meeting(meeting_id, payload)
 
 
 @router.delete("/{meeting_id}")
-async def delete_meeting(meeting_id: str, user_id: str = Depends(_require_user_id)):
+async def delete_meeting(meeting_id: str, user_id: str = Depends(require_user_id)):
     return await controller.delete_meeting(meeting_id)
 
 
@@ -62,7 +70,7 @@ async def get_meeting_votes(meeting_id: str):
 
 
 @router.post("/{meeting_id}/votes")
-async def submit_vote(meeting_id: str, user_id: str = Depends(_require_user_id), payload: SubmitVoteRequest | None = None):
+async def submit_vote(meeting_id: str, user_id: str = Depends(require_user_id), payload: SubmitVoteRequest | None = None):
     payload = payload or SubmitVoteRequest(userId=user_id, timeSlot="", preference="medium")
     data = payload.dict()
     data['userId'] = user_id
@@ -70,6 +78,12 @@ async def submit_vote(meeting_id: str, user_id: str = Depends(_require_user_id),
 
 
 @router.get("/{meeting_id}/results")
-async def get_vote_results(meeting_id: str):
-    return await controller.get_vote_results(meeting_id)
+async def get_vote_results(meeting_id: str, conditions: Preconditions = Depends(preconditions)):
+    return await controller.get_vote_results(meeting_id, conditions)
+
+
+# Server-Sent Events: current results, then a delta per vote
+@router.get("/{meeting_id}/results/stream")
+async def stream_vote_results(meeting_id: str):
+    return await controller.stream_vote_results(meeting_id)
 
@@ -4,59 +4,78 @@ Members routes for /api/v1/members.
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Header, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
 
 from controllers.members_controller import MembersController
 from schemas.members import CreateMemberRequest, UpdateMemberRequest, UpdateAvailabilityRequest
-from utils.auth import get_current_user
+from routes.dependencies import preconditions, request_snapshot, require_user_id
+from utils.conditional import Preconditions
+from utils.pagination import MAX_LIMIT
 
 
-router = APIRouter(prefix="/api/v1/members", tags=["Members"])
+router = APIRouter(prefix="/api/v1/members", tags=["Members"], dependencies=[Depends(request_snapshot)])
 controller = MembersController()
 
 
-def _require_user_id(authorization: str | None = Header(default=None)) -> str:
-    token = None
-    if authorization and authorization.lower().startswith("bearer "):
-        token = authorization.split(" ", 1)[1]
-    user_id = get_current_user(token)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-    return user_id
+# Opt-in compact availability on the wire: ?availabilityFormat=base64
+AvailabilityFormat = Query('slots', alias='availabilityFormat')
+
+# Sparse fieldsets: ?fields=id,name,timezone,avatar skips everything else
+Fields = Query(None, description="Comma-separated fields to return (id is always included)")
 
 
+# Paging is opt-in: without limit/cursor/filters every member is returned
 @router.get("")
-async def list_members():
-    return await controller.list_members()
+async def list_members(
+    availability_format: str = AvailabilityFormat,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    timezone: Optional[str] = None,
+    team_id: Optional[str] = Query(None, alias='teamId'),
+    fields: Optional[str] = Fields,
+    conditions: Preconditions = Depends(preconditions),
+):
+    return await controller.list_members(
+        availability_format, conditions, limit=limit, cursor=cursor, status=status, timezone=timezone,
+        team_id=team_id, fields=fields,
+    )
 
 
 @router.get("/{member_id}")
-async def get_member(member_id: str):
-    return await controller.get_member(member_id)
+async def get_member(
+    member_id: str,
+    availability_format: str = AvailabilityFormat,
+    fields: Optional[str] = Fields,
+    conditions: Preconditions = Depends(preconditions),
+):
+    return await controller.get_member(member_id, availability_format, fields, conditions)
 
 
 @router.post("")
-async def create_member(payload: CreateMemberRequest, user_id: str = Depends(_require_user_id)):
+async def create_member(payload: CreateMemberRequest, user_id: str = Depends(require_user_id)):
     return await controller.create_member(payload)
 
 
 @router.put("/{member_id}")
-async def update_member(member_id: str, payload: UpdateMemberRequest, user_id: str = Depends(_require_user_id)):
+async def update_member(member_id: str, payload: UpdateMemberRequest, user_id: str = Depends(require_user_id)):
     return await controller.update_member(member_id, payload)
 
 
 @router.delete("/{member_id}")
-async def delete_member(member_id: str, user_id: str = Depends(_require_user_id)):
+async def delete_member(member_id: str, user_id: str = Depends(require_user_id)):
     return await controller.delete_member(member_id)
 
 
 @router.get("/{member_id}/availability")
-async def get_availability(member_id: str):
-    return await controller.get_availability(member_id)
+async def get_availability(member_id: str, availability_format: str = AvailabilityFormat):
+    return await controller.get_availability(member_id, availability_format)
 
 
 @router.put("/{member_id}/availability")
-async def update_availability(member_id: str, payload: UpdateAvailabilityRequest, user_id: str = Depends(_require_user_id)):
+async def update_availability(member_id: str, payload: UpdateAvailabilityRequest, user_id: str = Depends(require_user_id)):
     return await controller.update_availability(member_id, payload)
 
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -20,7 +20,8 @@ class UpdateMemberRequest(BaseModel):
 
 
 class UpdateAvailabilityRequest(BaseModel):
-    availability: AvailabilityMap
+    # Slot map, or the compact base64 bitset (see utils.availability)
+    availability: Union[AvailabilityMap, str]
 
 
 class MemberResponse(BaseModel):
@@ -30,7 +31,7 @@ class MemberResponse(BaseModel):
     timezone: str
     role: str
     status: str
-    availability: AvailabilityMap
+    availability: Union[AvailabilityMap, str]
     teams: List[str] = []
     avatar: Optional[str] = None
     createdAt: Optional[str] = None
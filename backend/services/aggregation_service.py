@@ -1,6 +1,165 @@
 """
 Aggregation service.
 
-Computes availability heatmap over a team: converts member availabilities (UTC)
-into requested tz buckets and counts overlapping slots.
+Computes availability heatmap over a team: converts member availabilities
+(stored in each member's local time) to UTC, re-buckets them into the
+requested timezone and counts overlapping slots.
+
+Each member's 168-bit availability mask (utils.availability) is rotated by
+the difference between their UTC offset and the viewer's, taken at each
+slot's date in the current week so a DST change lands on the right day.
+With NumPy the masks are unpacked into a dense members x 168 matrix;
+without it the set bits are walked directly. Both paths produce the same
+result.
 """
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.team_model import TeamModel
+from models.user_model import UserModel
+from utils.availability import FULL_WEEK, SLOT_BYTES, SLOT_KEYS, WEEK_SLOTS, iter_slots, overlap, rotate
+from utils.errors import NotFoundError, ValidationError
+from utils.singleflight import singleflight
+from utils.time import convert_from_utc, convert_to_utc, get_timezone_offset
+from utils.validation import validate_timezone
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - in requirements.txt; the fallback serves bare installs
+    np = None  # type: ignore
+
+
+_HOUR = timedelta(hours=1)
+
+
+def _week_instants(viewer_tz: str, now: Optional[datetime] = None) -> List[datetime]:
+    # UTC instant of each viewer slot in the current week (Monday 00:00 local
+    # onwards), so every slot is converted with the offsets of its own date
+    today = convert_from_utc(now or datetime.now(dt_timezone.utc), viewer_tz).replace(tzinfo=None)
+    monday = (today - timedelta(days=today.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    return [convert_to_utc(monday + timedelta(hours=slot), viewer_tz) for slot in range(WEEK_SLOTS)]
+
+
+def _offset(timezone_name: str, at: datetime) -> timedelta:
+    # Unknown timezones count as UTC
+    try:
+        return get_timezone_offset(timezone_name, at)
+    except Exception:
+        return timedelta(0)
+
+
+def _shift_segments(viewer_offsets: List[timedelta], member_tz: str, instants: List[datetime]) -> List[Tuple[int, int]]:
+    """Return (shift in hours, slot mask) runs moving a member's week into the viewer's.
+
+    Viewer slot i shows the member's local hour containing its start: with
+    offsets v and o at that instant that is hour i - ceil((v - o) / 1h), so
+    half-hour zones always round the same way. Offsets differ slot by slot
+    only in a week with a DST change; otherwise there is a single run.
+    """
+    first, last = _offset(member_tz, instants[0]), _offset(member_tz, instants[-1])
+    if first == last and min(viewer_offsets) == max(viewer_offsets):
+        # No DST change this week (zones do not change twice within one)
+        return [(-((first - viewer_offsets[0]) // _HOUR), FULL_WEEK)]
+    segments: List[Tuple[int, int]] = []
+    start = 0
+    previous = None
+    for slot, (viewer, at) in enumerate(zip(viewer_offsets, instants)):
+        shift = -((_offset(member_tz, at) - viewer) // _HOUR)
+        if previous is not None and shift != previous:
+            segments.append((previous, ((1 << slot) - 1) ^ ((1 << start) - 1)))
+            start = slot
+        previous = shift
+    segments.append((previous or 0, FULL_WEEK ^ ((1 << start) - 1)))
+    return segments
+
+
+def _shift(mask: int, segments: List[Tuple[int, int]]) -> int:
+    if len(segments) == 1:
+        return rotate(mask, segments[0][0])
+    shifted = 0
+    for hours, slots in segments:
+        shifted |= rotate(mask, hours) & slots
+    return shifted
+
+
+class AggregationService:
+    """Team availability aggregation service."""
+
+    # Run on the read pool when called through utils.concurrency.AsyncFacade
+    read_methods = ('team_heatmap',)
+
+    @singleflight()
+    def team_heatmap(self, team_id: str, timezone: Optional[str] = None) -> Dict[str, Any]:
+        """Aggregate a team's weekly availability into viewer-timezone hours.
+
+        `timezone` defaults to the team's timezone, then UTC. Returns the
+        per-slot counts and the ids of the members available in each slot,
+        plus `commonSlots`: the slots every member is available in (the AND
+        of their masks). Concurrent identical calls share one computation.
+        """
+        team = TeamModel.get_team(team_id)
+        if not team:
+            raise NotFoundError("Team not found")
+
+        viewer_tz = timezone or team.get('timezone') or 'UTC'
+        if not validate_timezone(viewer_tz):
+            raise ValidationError("Invalid timezone")
+
+        members, _ = UserModel.get_members(team.get('members', []), availability_format='bits')
+        member_ids = [m['id'] for m in members]
+
+        # Local hour h of a member at offset o is UTC hour h - o, which the
+        # viewer at offset v sees as h - o + v
+        instants = _week_instants(viewer_tz)
+        viewer_offsets = [_offset(viewer_tz, at) for at in instants]
+        segments: Dict[str, List[Tuple[int, int]]] = {}
+        masks = []
+        for m in members:
+            tz = m.get('timezone') or 'UTC'
+            if tz not in segments:
+                segments[tz] = _shift_segments(viewer_offsets, tz, instants)
+            masks.append(_shift(m['availability'], segments[tz]))
+
+        if np is not None:
+            counts, available = self._aggregate_numpy(masks, member_ids)
+        else:
+            counts, available = self._aggregate_python(masks, member_ids)
+
+        return {
+            'teamId': team_id,
+            'timezone': viewer_tz,
+            'memberCount': len(members),
+            'maxCount': max(counts) if counts else 0,
+            'commonSlots': [SLOT_KEYS[slot] for slot in iter_slots(overlap(*masks))],
+            'slots': [
+                {'key': key, 'count': count, 'members': ids}
+                for key, count, ids in zip(SLOT_KEYS, counts, available)
+            ],
+        }
+
+    @staticmethod
+    def _aggregate_numpy(masks: List[int], member_ids: List[str]):
+        if not masks:
+            return [0] * WEEK_SLOTS, [[] for _ in range(WEEK_SLOTS)]
+        # Unpack the masks into the members x 168 matrix, bit i -> column i
+        packed = np.frombuffer(b''.join(mask.to_bytes(SLOT_BYTES, 'little') for mask in masks), dtype=np.uint8)
+        matrix = np.unpackbits(packed.reshape(len(masks), SLOT_BYTES), axis=1, bitorder='little').astype(bool)
+        counts = matrix.sum(axis=0)
+        # Nonzero positions of the transpose come out grouped by slot, members in team order
+        _, members = np.nonzero(matrix.T)
+        ids = np.array(member_ids, dtype=object)[members].tolist()
+        bounds = np.cumsum(counts).tolist()
+        available = [ids[start:end] for start, end in zip([0] + bounds[:-1], bounds)]
+        return counts.tolist(), available
+
+    @staticmethod
+    def _aggregate_python(masks: List[int], member_ids: List[str]):
+        available: List[List[str]] = [[] for _ in range(WEEK_SLOTS)]
+        for member_id, mask in zip(member_ids, masks):
+            for slot in iter_slots(mask):
+                available[slot].append(member_id)
+        # Members were appended in team order, so each slot list keeps that order
+        return [len(ids) for ids in available], available
@@ -2,7 +2,9 @@
 Auth service.
 
 Handles registration, login (password hashing, token issuance), logout, profile,
-and token verification.
+and token verification. Registration and login are async: password hashing
+runs on the bounded pool of services.hashing_service and storage calls on
+the utils.concurrency pools, so neither blocks the event loop.
 """
 
 from __future__ import annotations
@@ -11,7 +13,9 @@ from datetime import timedelta
 from typing import Dict, Optional
 
 from models.user_model import UserModel
-from utils.auth import generate_jwt_token, hash_password, verify_password
+from services.hashing_service import get_hashing_service
+from utils.concurrency import run_blocking
+from utils.auth import generate_jwt_token, hash_password
 from utils.errors import ConflictError, UnauthorizedError, ValidationError
 from utils.time import get_current_timestamp, generate_default_avatar, get_default_availability
 from utils.validation import validate_email, validate_password_strength, validate_timezone, sanitize_input
@@ -22,8 +26,9 @@ class AuthService:
 
     def __init__(self):
         self.token_expiry = timedelta(hours=24)
+        self.hasher = get_hashing_service()
 
-    def register_user(self, user_data: Dict) -> Dict:
+    async def register_user(self, user_data: Dict) -> Dict:
         """Register a new user with validation and password hashing."""
         # Sanitize input
         data = sanitize_input(user_data)
@@ -50,18 +55,16 @@ class AuthService:
             raise ValidationError("Invalid timezone")
         
         # Check if user already exists
-        existing_user = UserModel.get_member_by_name(data['name'])
+        existing_user = await run_blocking('read', UserModel.get_member_by_name, data['name'])
         if existing_user:
             raise ConflictError("User with this name already exists")
         
-        # Check if email already exists (simple check by looking through all users)
-        all_users = UserModel.list_members()
-        for user in all_users:
-            if user.get('email') == data['email']:
-                raise ConflictError("User with this email already exists")
+        # Check if email already exists
+        if await run_blocking('read', UserModel.get_member_by_email, data['email']):
+            raise ConflictError("User with this email already exists")
         
         # Hash password
-        hashed_password = hash_password(data['password'])
+        hashed_password = await self.hasher.hash_password(data['password'])
         
         # Create user record
         user_payload = {
@@ -77,46 +80,29 @@ class AuthService:
             'password_hash': hashed_password  # Store hashed password
         }
         
-        user = UserModel.create_member(user_payload)
+        user = await run_blocking('write', UserModel.create_member, user_payload)
         return user
 
-    def authenticate_user(self, *, email: Optional[str] = None, name: Optional[str] = None, password: str) -> Dict:
+    async def authenticate_user(self, *, email: Optional[str] = None, name: Optional[str] = None, password: str) -> Dict:
         """Authenticate user with either email or name and a password."""
         if (email is None and name is None) or (email is not None and name is not None):
             raise ValidationError("Provide exactly one of email or name")
         if not password:
             raise ValidationError("Password is required")
 
-        # Find user by email or name
-        all_users = UserModel.list_members()
-        user = None
+        # Find user by email or name (indexed lookups)
         if email is not None:
-            for u in all_users:
-                if u.get('email') == email:
-                    user = u
-                    break
+            user = await run_blocking('read', UserModel.get_member_by_email, email)
         else:
-            for u in all_users:
-                if u.get('name') == name:
-                    user = u
-                    break
+            user = await run_blocking('read', UserModel.get_member_by_name, name)
 
         if not user:
             raise UnauthorizedError("Invalid credentials")
 
-        # Get stored password hash (we need to access the raw storage for this)
-        from utils.storage import read_json
-        members_data = read_json('members.json', default_factory=list)
-        stored_hash = None
-        for member in members_data:
-            if email is not None and member.get('email') == email:
-                stored_hash = member.get('password_hash')
-                break
-            if name is not None and member.get('name') == name:
-                stored_hash = member.get('password_hash')
-                break
-
-        if not stored_hash or not verify_password(password, stored_hash):
+        # Password hashes are not part of the API projection
+        stored_hash = await run_blocking('read', UserModel.get_password_hash, user['id'])
+
+        if not stored_hash or not await self.hasher.verify_password(password, stored_hash):
             raise UnauthorizedError("Invalid credentials")
 
         return user
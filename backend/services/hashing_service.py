@@ -0,0 +1,121 @@
+"""
+Password hashing service.
+
+PBKDF2 (utils.auth) is deliberately slow, so it must not run on the event
+loop. Hashes are computed on a small dedicated thread pool (hashlib releases
+the GIL while deriving keys) and awaited by the async auth handlers.
+
+The pool size is the concurrency limit, and at most `max_pending` requests
+may wait for a worker; beyond that callers get OverloadedError (503) at once
+instead of queueing, so a login storm cannot tie up the server.
+
+Configuration (environment):
+- PASSWORD_HASH_WORKERS: worker threads (default: CPU count, at most 4)
+- PASSWORD_HASH_MAX_PENDING: queued requests before rejecting (default 64)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from utils.auth import hash_password, verify_password
+from utils.config import env_int
+from utils.errors import OverloadedError
+from utils.metrics import registry
+
+PBKDF2_SECONDS = registry.histogram('password_hash_seconds', "PBKDF2 time per hash or verification", ('op',))
+PBKDF2_WAIT_SECONDS = registry.histogram('password_hash_wait_seconds', "Time hashing requests queue for a worker")
+
+
+class HashingService:
+    """Bounded async front end for password hashing and verification."""
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.workers = workers or env_int('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1))
+        self.max_pending = max_pending or env_int('PASSWORD_HASH_MAX_PENDING', 64)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='pbkdf2')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._stats: Dict[str, float] = {
+            'completed': 0,
+            'rejected': 0,
+            'cancelled': 0,
+            'pending_max': 0,
+            'wait_seconds_total': 0.0,
+            'hash_seconds_total': 0.0,
+        }
+
+    async def hash_password(self, password: str) -> str:
+        return await self._run('hash', hash_password, password)
+
+    async def verify_password(self, password: str, hashed: str) -> bool:
+        return await self._run('verify', verify_password, password, hashed)
+
+    async def _run(self, op: str, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats['rejected'] += 1
+                raise OverloadedError("Too many sign-in requests, please retry shortly")
+            self._pending += 1
+            self._stats['pending_max'] = max(self._stats['pending_max'], self._pending)
+        submitted = time.perf_counter()
+
+        def job() -> Any:
+            started = time.perf_counter()
+            with self._lock:
+                self._pending -= 1
+                self._active += 1
+                self._stats['wait_seconds_total'] += started - submitted
+            PBKDF2_WAIT_SECONDS.observe(started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                elapsed = time.perf_counter() - started
+                PBKDF2_SECONDS.observe(elapsed, (op,))
+                with self._lock:
+                    self._active -= 1
+                    self._stats['completed'] += 1
+                    self._stats['hash_seconds_total'] += elapsed
+
+        future = self._executor.submit(job)
+        # A caller cancelled while queued cancels the job, which then never runs
+        future.add_done_callback(self._release_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _release_cancelled(self, future: Future) -> None:
+        if future.cancelled():
+            with self._lock:
+                self._pending -= 1
+                self._stats['cancelled'] += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Return pool size and queue depth plus counters (completed, rejected,
+        cancelled, wait/hash seconds)."""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'active': self._active,
+                'pending': self._pending,
+                **self._stats,
+            }
+
+
+_hashing_service: Optional[HashingService] = None
+_hashing_lock = threading.Lock()
+
+
+def get_hashing_service() -> HashingService:
+    """Return the process-wide hashing service, creating it on first use."""
+    global _hashing_service
+    if _hashing_service is None:
+        with _hashing_lock:
+            if _hashing_service is None:
+                _hashing_service = HashingService()
+    return _hashing_service
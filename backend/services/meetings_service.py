@@ -6,13 +6,16 @@ Implements meeting CRUD, votes, and meeting participants retrieval.
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from models.meeting_model import MeetingModel
-from models.vote_model import VoteModel
+from models.meeting_model import MEETING_FIELDS, MEETINGS, MeetingModel
+from models.vote_model import VOTES, VoteModel
 from models.team_model import TeamModel
 from models.user_model import UserModel
+from utils.engine import transaction
 from utils.errors import ConflictError, NotFoundError, ValidationError
+from utils.fields import Fields, parse_fields
+from utils.pagination import encode_cursor, resolve_page
 from utils.validation import sanitize_input
 from utils.time import parse_iso_datetime, convert_to_utc
 from datetime import timezone
@@ -99,22 +102,88 @@ class MeetingsService:
         
         return MeetingModel.create_meeting(team_id, meeting_payload)
 
-    def get_meeting(self, meeting_id: str) -> Optional[Dict]:
-        """Get meeting by ID."""
-        return MeetingModel.get_meeting(meeting_id)
+    def get_meeting(self, meeting_id: str, fields: Optional[str] = None) -> Optional[Dict]:
+        """Get meeting by ID, optionally limited to comma-separated `fields`."""
+        return MeetingModel.get_meeting(meeting_id, fields=self._parse_fields(fields))
 
-    def list_meetings(self) -> List[Dict]:
-        """List all meetings."""
-        return MeetingModel.list_meetings()
+    def list_meetings(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        team_id: Optional[str] = None,
+        status: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        fields: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """List meetings, returning (meetings, next cursor).
 
-    def list_team_meetings(self, team_id: str) -> List[Dict]:
+        Paged by id when any paging or filter argument is given. `start`/`end`
+        (ISO 8601, inclusive) match the scheduled time, or the first proposed
+        slot for meetings not yet scheduled. `fields` limits each meeting to
+        those comma-separated fields.
+        """
+        projection = self._parse_fields(fields)
+        if limit is None and cursor is None and not (team_id or status or start or end):
+            return MeetingModel.list_meetings(projection), None
+        try:
+            limit, after = resolve_page(limit, cursor)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        where: Dict[str, Any] = {}
+        if team_id:
+            where['teamId'] = team_id
+        if status:
+            where['status'] = status
+        predicate = self._date_range(start, end) if (start or end) else None
+        meetings, next_key = MeetingModel.page_meetings(limit, after, where or None, predicate, projection)
+        return meetings, encode_cursor(next_key)
+
+    @staticmethod
+    def _parse_fields(fields: Optional[str]) -> Fields:
+        try:
+            return parse_fields(fields, MEETING_FIELDS)
+        except ValueError as e:
+            raise ValidationError(str(e))
+
+    @staticmethod
+    def _date_range(start: Optional[str], end: Optional[str]) -> Callable[[Dict], bool]:
+        """Predicate over stored meetings for an inclusive [start, end] range."""
+        bounds = []
+        for value in (start, end):
+            if not value:
+                bounds.append(None)
+                continue
+            try:
+                bounds.append(parse_iso_datetime(value))
+            except (TypeError, ValueError):
+                raise ValidationError(f"Invalid date: {value}")
+        lower, upper = bounds
+
+        def matches(meeting: Dict) -> bool:
+            when = meeting.get('scheduledTime')
+            if not when:
+                slots = meeting.get('timeSlots') or []
+                when = slots[0] if slots and isinstance(slots[0], str) else None
+            if not when:
+                return False
+            try:
+                moment = parse_iso_datetime(when)
+            except (TypeError, ValueError):
+                return False
+            return (lower is None or moment >= lower) and (upper is None or moment <= upper)
+
+        return matches
+
+    def list_team_meetings(self, team_id: str, fields: Optional[str] = None) -> List[Dict]:
         """List meetings for a specific team."""
+        projection = self._parse_fields(fields)
         # Validate team exists
         team = TeamModel.get_team(team_id)
         if not team:
             raise NotFoundError("Team not found")
         
-        return MeetingModel.list_meetings_by_team(team_id)
+        return MeetingModel.list_meetings_by_team(team_id, projection)
 
     def update_meeting(self, meeting_id: str, updates: Dict) -> Optional[Dict]:
         """Update meeting with validation."""
@@ -137,14 +206,30 @@ class MeetingsService:
         return MeetingModel.update_meeting(meeting_id, data)
 
     def delete_meeting(self, meeting_id: str) -> bool:
-        """Delete meeting by ID."""
-        # Also delete all votes for this meeting
-        votes = VoteModel.list_votes(meeting_id)
-        for vote in votes:
-            # Note: VoteModel doesn't have delete method, but we could add one
-            pass
-        
-        return MeetingModel.delete_meeting(meeting_id)
+        """Delete meeting by ID, together with all of its votes."""
+        # One commit: the meetings file is rewritten once and the votes
+        # journal gets one append of tombstones
+        with transaction(MEETINGS, VOTES) as tx:
+            deleted = MeetingModel.delete_meeting(meeting_id, tx=tx)
+            if deleted:
+                VoteModel.delete_votes_for_meeting(meeting_id, tx=tx)
+        if deleted:
+            # After the commit, so a stream never outlives a meeting that stays
+            VoteModel.close_tallies(meeting_id)
+        return deleted
+
+    def purge_orphan_votes(self) -> int:
+        """Delete votes whose meeting no longer exists; return how many.
+
+        A one-off migration (`python -m utils.engine purge-orphan-votes`) for
+        votes left by meetings deleted before votes cascaded. The read and
+        the delete share one transaction, so a meeting created meanwhile
+        cannot lose its first votes.
+        """
+        with transaction(MEETINGS, VOTES) as tx:
+            live = {meeting['id'] for meeting in MeetingModel.list_meetings(fields=frozenset({'id'}), tx=tx)}
+            orphans = VoteModel.voted_meeting_ids(tx=tx) - live
+            return VoteModel.delete_votes_for_meetings(orphans, tx=tx) if orphans else 0
 
     def get_meeting_members(self, meeting_id: str) -> List[Dict]:
         """Get all members who can participate in a meeting."""
@@ -6,11 +6,15 @@ Implements member CRUD, availability get/update, and team membership queries.
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from models.user_model import UserModel
-from models.team_model import TeamModel
+from models.user_model import MEMBER_FIELDS, MEMBERS, UserModel
+from models.team_model import TEAMS, TeamModel
+from utils import availability as avail
+from utils.engine import transaction
 from utils.errors import ConflictError, NotFoundError, ValidationError
+from utils.fields import Fields, parse_fields
+from utils.pagination import encode_cursor, resolve_page
 from utils.validation import validate_email, validate_timezone, sanitize_input
 
 
@@ -41,10 +45,8 @@ class MembersService:
         
         # Check if email already exists
         if 'email' in data and data['email']:
-            all_members = UserModel.list_members()
-            for member in all_members:
-                if member.get('email') == data['email']:
-                    raise ConflictError("Member with this email already exists")
+            if UserModel.get_member_by_email(data['email']):
+                raise ConflictError("Member with this email already exists")
         
         member_payload = {
             'name': data['name'],
@@ -59,19 +61,59 @@ class MembersService:
         
         return UserModel.create_member(member_payload)
 
-    def get_member(self, member_id: str) -> Optional[Dict]:
-        """Get member by ID."""
-        return UserModel.get_member(member_id)
+    def get_member(self, member_id: str, availability_format: str = 'slots', fields: Optional[str] = None) -> Optional[Dict]:
+        """Get member by ID, optionally limited to comma-separated `fields`."""
+        self._check_format(availability_format)
+        return UserModel.get_member(member_id, availability_format, fields=self._parse_fields(fields))
 
     def get_member_by_name(self, name: str) -> Optional[Dict]:
         """Get member by name."""
         return UserModel.get_member_by_name(name)
 
-    def list_members(self) -> List[Dict]:
-        """List all members."""
-        # Base members from storage
-        members = UserModel.list_members()
+    def list_members(
+        self,
+        availability_format: str = 'slots',
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        timezone: Optional[str] = None,
+        team_id: Optional[str] = None,
+        fields: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """List members, returning (members, next cursor).
 
+        Without paging or filter arguments this is every member in storage
+        order and no cursor. Otherwise one page in id order, filtered on the
+        stored records so only the page is projected. `fields` limits each
+        member to those comma-separated fields.
+        """
+        self._check_format(availability_format)
+        projection = self._parse_fields(fields)
+        if limit is None and cursor is None and not (status or timezone or team_id):
+            return self._with_team_ids(UserModel.list_members(availability_format, projection), projection), None
+
+        try:
+            limit, after = resolve_page(limit, cursor)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        where: Dict[str, Any] = {}
+        if status:
+            where['status'] = status
+        if timezone:
+            where['timezone'] = timezone
+        member_ids = None
+        if team_id:
+            team = TeamModel.get_team(team_id)
+            if not team:
+                raise NotFoundError("Team not found")
+            member_ids = [mid for mid in team.get('members', []) or [] if isinstance(mid, str)]
+        members, next_key = UserModel.page_members(limit, after, where or None, member_ids, availability_format, projection)
+        return self._with_team_ids(members, projection), encode_cursor(next_key)
+
+    def _with_team_ids(self, members: List[Dict], fields: Fields = None) -> List[Dict]:
+        """Add the ids of every team listing each member to its 'teams'."""
+        if fields is not None and 'teams' not in fields:
+            return members
         # Build a mapping of member_id -> [team_ids] from teams.json
         teams = TeamModel.list_teams()
         member_to_team_ids: Dict[str, List[str]] = {}
@@ -120,10 +162,9 @@ class MembersService:
                 raise ValidationError("Invalid email format")
             
             # Check if email is already used by another member
-            all_members = UserModel.list_members()
-            for m in all_members:
-                if m['id'] != member_id and m.get('email') == data['email']:
-                    raise ConflictError("Email already in use by another member")
+            owner = UserModel.get_member_by_email(data['email'])
+            if owner and owner['id'] != member_id:
+                raise ConflictError("Email already in use by another member")
         
         # Validate timezone if provided
         if 'timezone' in data and data['timezone']:
@@ -133,33 +174,50 @@ class MembersService:
         return UserModel.update_member(member_id, data)
 
     def delete_member(self, member_id: str) -> bool:
-        """Delete member by ID."""
-        # Remove member from all teams first
-        teams = TeamModel.list_teams()
-        for team in teams:
-            if member_id in team['members']:
-                updated_members = [mid for mid in team['members'] if mid != member_id]
-                TeamModel.update_team(team['id'], {'members': updated_members})
-        
-        return UserModel.delete_member(member_id)
+        """Delete member by ID, removing them from all teams in the same commit."""
+        with transaction(TEAMS, MEMBERS) as tx:
+            for team in TeamModel.list_teams(tx=tx):
+                if member_id in team['members']:
+                    updated_members = [mid for mid in team['members'] if mid != member_id]
+                    TeamModel.update_team(team['id'], {'members': updated_members}, tx=tx)
+            
+            return UserModel.delete_member(member_id, tx=tx)
 
-    def update_availability(self, member_id: str, availability: Dict) -> Optional[Dict]:
-        """Update member availability."""
+    def update_availability(self, member_id: str, availability: Union[Dict, str]) -> Optional[Dict]:
+        """Update member availability from a slot map or the base64 form."""
         # Validate member exists
         member = UserModel.get_member(member_id)
         if not member:
             raise NotFoundError("Member not found")
-        
-        return UserModel.update_availability(member_id, availability)
 
-    def get_availability(self, member_id: str) -> Optional[Dict]:
+        try:
+            bits = avail.decode(availability)
+        except ValueError as e:
+            raise ValidationError(str(e))
+
+        return UserModel.update_availability(member_id, bits)
+
+    def get_availability(self, member_id: str, availability_format: str = 'slots') -> Optional[Union[Dict, str]]:
         """Get member availability."""
-        member = UserModel.get_member(member_id)
+        self._check_format(availability_format)
+        member = UserModel.get_member(member_id, availability_format)
         if not member:
             raise NotFoundError("Member not found")
         
         return member.get('availability', {})
 
+    @staticmethod
+    def _check_format(availability_format: str) -> None:
+        if availability_format not in avail.WIRE_FORMATS:
+            raise ValidationError(f"availabilityFormat must be one of: {', '.join(avail.WIRE_FORMATS)}")
+
+    @staticmethod
+    def _parse_fields(fields: Optional[str]) -> Fields:
+        try:
+            return parse_fields(fields, MEMBER_FIELDS)
+        except ValueError as e:
+            raise ValidationError(str(e))
+
     def get_member_teams(self, member_id: str) -> List[Dict]:
         """Get all teams a member belongs to."""
         # Validate member exists
@@ -178,50 +236,60 @@ class MembersService:
 
     def add_member_to_team(self, member_id: str, team_id: str) -> Dict:
         """Add member to team."""
-        # Validate member exists
-        member = UserModel.get_member(member_id)
-        if not member:
-            raise NotFoundError("Member not found")
-        
-        # Validate team exists
-        team = TeamModel.get_team(team_id)
-        if not team:
-            raise NotFoundError("Team not found")
-        
-        # Check if member is already in team
-        if member_id in team['members']:
-            raise ConflictError("Member is already in this team")
-        
-        # Add member to team
-        updated_members = team['members'] + [member_id]
-        updated_team = TeamModel.update_team(team_id, {'members': updated_members})
-        
-        if not updated_team:
-            raise NotFoundError("Failed to update team")
+        # Team and member records change together (one write per file)
+        with transaction(TEAMS, MEMBERS) as tx:
+            # Validate member exists
+            member = UserModel.get_member(member_id, tx=tx)
+            if not member:
+                raise NotFoundError("Member not found")
+            
+            # Validate team exists
+            team = TeamModel.get_team(team_id, tx=tx)
+            if not team:
+                raise NotFoundError("Team not found")
+            
+            # Check if member is already in team
+            if member_id in team['members']:
+                raise ConflictError("Member is already in this team")
+            
+            # Add member to team
+            updated_members = team['members'] + [member_id]
+            updated_team = TeamModel.update_team(team_id, {'members': updated_members}, tx=tx)
+            
+            if not updated_team:
+                raise NotFoundError("Failed to update team")
+            
+            if team_id not in member['teams']:
+                UserModel.update_member(member_id, {'teams': member['teams'] + [team_id]}, tx=tx)
         
         return updated_team
 
     def remove_member_from_team(self, member_id: str, team_id: str) -> Dict:
         """Remove member from team."""
-        # Validate member exists
-        member = UserModel.get_member(member_id)
-        if not member:
-            raise NotFoundError("Member not found")
-        
-        # Validate team exists
-        team = TeamModel.get_team(team_id)
-        if not team:
-            raise NotFoundError("Team not found")
-        
-        # Check if member is in team
-        if member_id not in team['members']:
-            raise NotFoundError("Member is not in this team")
-        
-        # Remove member from team
-        updated_members = [mid for mid in team['members'] if mid != member_id]
-        updated_team = TeamModel.update_team(team_id, {'members': updated_members})
-        
-        if not updated_team:
-            raise NotFoundError("Failed to update team")
+        with transaction(TEAMS, MEMBERS) as tx:
+            # Validate member exists
+            member = UserModel.get_member(member_id, tx=tx)
+            if not member:
+                raise NotFoundError("Member not found")
+            
+            # Validate team exists
+            team = TeamModel.get_team(team_id, tx=tx)
+            if not team:
+                raise NotFoundError("Team not found")
+            
+            # Check if member is in team
+            if member_id not in team['members']:
+                raise NotFoundError("Member is not in this team")
+            
+            # Remove member from team
+            updated_members = [mid for mid in team['members'] if mid != member_id]
+            updated_team = TeamModel.update_team(team_id, {'members': updated_members}, tx=tx)
+            
+            if not updated_team:
+                raise NotFoundError("Failed to update team")
+            
+            if team_id in member['teams']:
+                remaining = [tid for tid in member['teams'] if tid != team_id]
+                UserModel.update_member(member_id, {'teams': remaining}, tx=tx)
         
         return updated_team
@@ -6,12 +6,15 @@ Implements team CRUD, membership management, and listing team meetings.
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from models.team_model import TeamModel
-from models.user_model import UserModel
+from models.team_model import TEAM_FIELDS, TEAMS, TeamModel
+from models.user_model import MEMBERS, UserModel
 from models.meeting_model import MeetingModel
+from utils.engine import transaction
 from utils.errors import ConflictError, NotFoundError, ValidationError
+from utils.fields import Fields, parse_fields
+from utils.pagination import encode_cursor, resolve_page
 from utils.validation import sanitize_input
 
 
@@ -26,10 +29,8 @@ class TeamsService:
             raise ValidationError("Team name is required")
         
         # Check if team already exists
-        existing_teams = TeamModel.list_teams()
-        for team in existing_teams:
-            if team['name'].lower() == data['name'].lower():
-                raise ConflictError("Team with this name already exists")
+        if TeamModel.get_team_by_name(data['name']):
+            raise ConflictError("Team with this name already exists")
         
         # Validate creator exists
         creator = UserModel.get_member(creator_id)
@@ -42,9 +43,9 @@ class TeamsService:
             members.append(creator_id)
         
         # Validate all member IDs exist
-        for member_id in members:
-            if not UserModel.get_member(member_id):
-                raise NotFoundError(f"Member {member_id} not found")
+        _, missing = UserModel.get_members(members)
+        if missing:
+            raise NotFoundError(f"Member {missing[0]} not found")
         
         team_payload = {
             'name': data['name'],
@@ -55,13 +56,35 @@ class TeamsService:
         
         return TeamModel.create_team(team_payload)
 
-    def get_team(self, team_id: str) -> Optional[Dict]:
-        """Get team by ID."""
-        return TeamModel.get_team(team_id)
-
-    def list_teams(self) -> List[Dict]:
-        """List all teams."""
-        return TeamModel.list_teams()
+    def get_team(self, team_id: str, fields: Optional[str] = None) -> Optional[Dict]:
+        """Get team by ID, optionally limited to comma-separated `fields`."""
+        return TeamModel.get_team(team_id, fields=self._parse_fields(fields))
+
+    def list_teams(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        timezone: Optional[str] = None,
+        fields: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """List teams, returning (teams, next cursor); paged by id when any
+        paging or filter argument is given."""
+        projection = self._parse_fields(fields)
+        if limit is None and cursor is None and not timezone:
+            return TeamModel.list_teams(fields=projection), None
+        try:
+            limit, after = resolve_page(limit, cursor)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        teams, next_key = TeamModel.page_teams(limit, after, {'timezone': timezone} if timezone else None, projection)
+        return teams, encode_cursor(next_key)
+
+    @staticmethod
+    def _parse_fields(fields: Optional[str]) -> Fields:
+        try:
+            return parse_fields(fields, TEAM_FIELDS)
+        except ValueError as e:
+            raise ValidationError(str(e))
 
     def update_team(self, team_id: str, updates: Dict, user_id: str) -> Optional[Dict]:
         """Update team with validation."""
@@ -84,9 +107,9 @@ class TeamsService:
         
         # Validate all member IDs exist if provided
         if 'members' in data:
-            for member_id in data['members']:
-                if not UserModel.get_member(member_id):
-                    raise NotFoundError(f"Member {member_id} not found")
+            _, missing = UserModel.get_members(data['members'])
+            if missing:
+                raise NotFoundError(f"Member {missing[0]} not found")
         
         return TeamModel.update_team(team_id, data)
 
@@ -105,54 +128,66 @@ class TeamsService:
 
     def add_member_to_team(self, team_id: str, member_id: str, user_id: str) -> Dict:
         """Add member to team."""
-        # Validate team exists
-        team = TeamModel.get_team(team_id)
-        if not team:
-            raise NotFoundError("Team not found")
-        
-        # Check if user is team admin
-        if team.get('admin') != user_id:
-            raise PermissionError("Only team admin can add members")
-        
-        # Validate member exists
-        member = UserModel.get_member(member_id)
-        if not member:
-            raise NotFoundError("Member not found")
-        
-        # Check if member is already in team
-        if member_id in team['members']:
-            raise ConflictError("Member is already in this team")
-        
-        # Add member to team
-        updated_members = team['members'] + [member_id]
-        updated_team = TeamModel.update_team(team_id, {'members': updated_members})
-        
-        if not updated_team:
-            raise NotFoundError("Failed to update team")
+        # Team and member records change together (one write per file)
+        with transaction(TEAMS, MEMBERS) as tx:
+            # Validate team exists
+            team = TeamModel.get_team(team_id, tx=tx)
+            if not team:
+                raise NotFoundError("Team not found")
+            
+            # Check if user is team admin
+            if team.get('admin') != user_id:
+                raise PermissionError("Only team admin can add members")
+            
+            # Validate member exists
+            member = UserModel.get_member(member_id, tx=tx)
+            if not member:
+                raise NotFoundError("Member not found")
+            
+            # Check if member is already in team
+            if member_id in team['members']:
+                raise ConflictError("Member is already in this team")
+            
+            # Add member to team
+            updated_members = team['members'] + [member_id]
+            updated_team = TeamModel.update_team(team_id, {'members': updated_members}, tx=tx)
+            
+            if not updated_team:
+                raise NotFoundError("Failed to update team")
+            
+            if team_id not in member['teams']:
+                UserModel.update_member(member_id, {'teams': member['teams'] + [team_id]}, tx=tx)
         
         return updated_team
 
     def remove_member_from_team(self, team_id: str, member_id: str, user_id: str) -> Dict:
         """Remove member from team."""
-        # Validate team exists
-        team = TeamModel.get_team(team_id)
-        if not team:
-            raise NotFoundError("Team not found")
-        
-        # Check if user is team admin
-        if team.get('admin') != user_id:
-            raise PermissionError("Only team admin can remove members")
-        
-        # Check if member is in team
-        if member_id not in team['members']:
-            raise NotFoundError("Member is not in this team")
-        
-        # Remove member from team
-        updated_members = [mid for mid in team['members'] if mid != member_id]
-        updated_team = TeamModel.update_team(team_id, {'members': updated_members})
-        
-        if not updated_team:
-            raise NotFoundError("Failed to update team")
+        with transaction(TEAMS, MEMBERS) as tx:
+            # Validate team exists
+            team = TeamModel.get_team(team_id, tx=tx)
+            if not team:
+                raise NotFoundError("Team not found")
+            
+            # Check if user is team admin
+            if team.get('admin') != user_id:
+                raise PermissionError("Only team admin can remove members")
+            
+            # Check if member is in team
+            if member_id not in team['members']:
+                raise NotFoundError("Member is not in this team")
+            
+            # Remove member from team
+            updated_members = [mid for mid in team['members'] if mid != member_id]
+            updated_team = TeamModel.update_team(team_id, {'members': updated_members}, tx=tx)
+            
+            if not updated_team:
+                raise NotFoundError("Failed to update team")
+            
+            # The member record may already be gone or never have listed the team
+            member = UserModel.get_member(member_id, tx=tx)
+            if member and team_id in member['teams']:
+                remaining = [tid for tid in member['teams'] if tid != team_id]
+                UserModel.update_member(member_id, {'teams': remaining}, tx=tx)
         
         return updated_team
 
@@ -166,8 +201,8 @@ class TeamsService:
         if not team:
             return None
         
-        # Get full member details
-        members = TeamModel.get_team_members(team_id)
+        # Get full member details in one batch
+        members, _ = UserModel.get_members(team.get('members', []))
         team['members'] = members
         
         return team
@@ -0,0 +1,81 @@
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+from services.aggregation_service import AggregationService, _offset, _shift, _shift_segments, _week_instants
+from utils.availability import FULL_WEEK, SLOT_KEYS, WEEK_SLOTS, from_slots, iter_slots
+
+# A Wednesday in the week of the US DST change (Sunday 2026-11-01)
+NOW = datetime(2026, 10, 28, 12, tzinfo=timezone.utc)
+
+
+def _segments(viewer_tz, member_tz, now=NOW):
+    instants = _week_instants(viewer_tz, now)
+    return _shift_segments([_offset(viewer_tz, at) for at in instants], member_tz, instants)
+
+
+def _heat(viewer_tz, member_tz, slots, now=NOW):
+    mask = _shift(from_slots({key: True for key in slots}), _segments(viewer_tz, member_tz, now))
+    return [SLOT_KEYS[slot] for slot in iter_slots(mask)]
+
+
+def test_half_hour_zones_round_the_same_way():
+    # Each viewer hour shows the member hour containing its start
+    assert _heat('Asia/Kolkata', 'UTC', ['day_0_slot_4']) == ['day_0_slot_10']  # 10:00 IST = 04:30 UTC
+    assert _heat('Asia/Kabul', 'UTC', ['day_0_slot_4']) == ['day_0_slot_9']  # +4:30: 09:00 = 04:30 UTC
+    assert _heat('UTC', 'Asia/Kolkata', ['day_0_slot_10']) == ['day_0_slot_5']  # 05:00 UTC = 10:30 IST
+
+
+def test_offset_follows_each_slots_date():
+    # New York is UTC-4 until Sunday 06:00 UTC and UTC-5 afterwards
+    assert [shift for shift, _ in _segments('UTC', 'America/New_York')] == [4, 5]
+    assert _heat('UTC', 'America/New_York', ['day_0_slot_9', 'day_6_slot_9']) == ['day_0_slot_13', 'day_6_slot_14']
+    # A week without a change is a single rotation
+    assert len(_segments('UTC', 'America/New_York', datetime(2026, 10, 14, tzinfo=timezone.utc))) == 1
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def aggregate(request):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+        return AggregationService._aggregate_numpy
+    return AggregationService._aggregate_python
+
+
+def test_aggregate_counts_and_members(aggregate):
+    masks = [from_slots({'day_0_slot_9': True, 'day_0_slot_10': True}), from_slots({'day_0_slot_10': True}), 0]
+    counts, available = aggregate(masks, ['a', 'b', 'c'])
+    assert len(counts) == len(available) == WEEK_SLOTS
+    assert counts[9:11] == [1, 2] and sum(counts) == 3
+    # Members keep team order within a slot
+    assert available[9:11] == [['a'], ['a', 'b']]
+
+
+def test_aggregate_empty_team(aggregate):
+    counts, available = aggregate([], [])
+    assert counts == [0] * WEEK_SLOTS
+    assert available == [[] for _ in range(WEEK_SLOTS)]
+
+
+def test_numpy_and_python_paths_agree():
+    pytest.importorskip('numpy')
+    rng = random.Random(7)
+    masks = [rng.getrandbits(WEEK_SLOTS) for _ in range(200)] + [0, FULL_WEEK]
+    member_ids = [f"m{n}" for n in range(len(masks))]
+    assert AggregationService._aggregate_numpy(masks, member_ids) == AggregationService._aggregate_python(masks, member_ids)
+
+
+def test_heatmap_lists_slots_common_to_every_member(monkeypatch):
+    from services import aggregation_service
+
+    members = [
+        {'id': 'a', 'timezone': 'UTC', 'availability': from_slots({'day_0_slot_9': True, 'day_0_slot_10': True})},
+        {'id': 'b', 'timezone': 'UTC', 'availability': from_slots({'day_0_slot_10': True, 'day_0_slot_11': True})},
+    ]
+    monkeypatch.setattr(aggregation_service.TeamModel, 'get_team', lambda team_id: {'id': team_id, 'members': ['a', 'b']})
+    monkeypatch.setattr(aggregation_service.UserModel, 'get_members', lambda ids, availability_format: (members, []))
+
+    heatmap = AggregationService().team_heatmap('t1', 'UTC')
+    assert heatmap['commonSlots'] == ['day_0_slot_10']
+    assert [slot['key'] for slot in heatmap['slots'] if slot['count'] == heatmap['memberCount']] == heatmap['commonSlots']
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+import pytest
+
+from utils import auth
+
+
+@pytest.fixture(autouse=True)
+def key_ring():
+    auth.set_key_ring(auth.KeyRing(b'first-secret'))
+    yield
+    auth.set_key_ring(None)
+
+
+def _token(user_id='u1'):
+    return auth.generate_jwt_token(user_id, timedelta(hours=1))
+
+
+def test_old_token_verifies_while_its_key_is_in_the_ring():
+    old = _token()
+    assert auth.get_current_user(old) == 'u1'
+
+    auth.rotate_secret('second-secret')
+    new = _token('u2')
+    assert auth.get_current_user(old) == 'u1'
+    assert auth.get_current_user(new) == 'u2'
+    assert auth.verify_jwt_token(old)['sub'] == 'u1'
+
+
+def test_old_token_fails_once_its_key_is_dropped():
+    old = _token()
+    auth.rotate_secret('second-secret')
+    new = _token('u2')
+    # Retire the first secret: only the current key remains
+    auth.set_key_ring(auth.KeyRing(b'second-secret'))
+    with pytest.raises(ValueError):
+        auth.verify_jwt_token(old)
+    assert auth.get_current_user(old) is None
+    assert auth.get_current_user(new) == 'u2'
+
+
+def test_cached_verification_does_not_outlive_its_key():
+    old = _token()
+    assert auth.get_current_user(old) == 'u1'
+    assert auth.get_current_user(old) == 'u1'
+    assert auth.token_cache_stats()['hits'] >= 1
+
+    auth.set_key_ring(auth.KeyRing(b'second-secret'))
+    assert auth.token_cache_stats()['entries'] == 0
+    assert auth.get_current_user(old) is None
+
+
+def test_token_cache_is_a_bounded_lru():
+    cache = auth._TokenCache(2)
+    cache.put('a', 'ua', 2**40)
+    cache.put('b', 'ub', 2**40)
+    assert cache.get('a') == 'ua'  # 'b' is now least recently used
+    cache.put('c', 'uc', 2**40)
+    assert cache.get('b') is None
+    assert cache.get('a') == 'ua' and cache.get('c') == 'uc'
+    assert cache.stats()['evictions'] == 1
@@ -0,0 +1,14 @@
+from utils.availability import decode, encode, from_slots, overlap
+
+
+def test_slot_map_lists_only_set_slots():
+    bits = from_slots({'day_0_slot_9': True, 'day_6_slot_23': True, 'day_1_slot_0': False})
+    assert encode(bits, 'slots') == {'day_0_slot_9': True, 'day_6_slot_23': True}
+    assert encode(0, 'slots') == {}
+    assert decode(encode(bits, 'slots')) == bits
+
+
+def test_overlap_is_the_and_of_all_masks():
+    assert overlap(0b1110, 0b0111, 0b0110) == 0b0110
+    assert overlap(0b1010) == 0b1010
+    assert overlap() == 0
@@ -0,0 +1,33 @@
+import asyncio
+import threading
+
+from services.hashing_service import HashingService
+from utils.concurrency import _Pool
+
+
+async def _cancel_queued(run, release):
+    # The first call occupies the only worker; the second stays queued and is cancelled
+    busy = asyncio.ensure_future(run(release.wait))
+    queued = asyncio.ensure_future(run(lambda: None))
+    await asyncio.sleep(0.05)
+    queued.cancel()
+    await asyncio.gather(queued, return_exceptions=True)
+    release.set()
+    await busy
+
+
+def test_cancelled_hash_request_leaves_the_queue():
+    service = HashingService(workers=1, max_pending=4)
+    asyncio.run(_cancel_queued(lambda fn: service._run('hash', fn), threading.Event()))
+    stats = service.stats()
+    assert stats['pending'] == 0
+    assert stats['cancelled'] == 1
+
+
+def test_cancelled_pool_call_leaves_the_queue():
+    pool = _Pool('test', 1)
+    asyncio.run(_cancel_queued(pool.run, threading.Event()))
+    stats = pool.snapshot()
+    assert stats['pending'] == 0
+    assert stats['cancelled'] == 1
+    assert stats['completed'] == 1
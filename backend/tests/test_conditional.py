@@ -0,0 +1,17 @@
+from fastapi import Response
+
+from utils.conditional import Preconditions, Validators
+
+CURRENT = Validators('"abc"', 1_700_000_000)
+
+
+def test_star_waits_for_the_lookup():
+    star = Preconditions(if_none_match='*')
+    assert not CURRENT.matches(star)
+    assert CURRENT.respond(Response(status_code=200), star).status_code == 304
+
+
+def test_own_tag_matches_before_the_lookup():
+    assert CURRENT.matches(Preconditions(if_none_match='W/"abc", "old"'))
+    fresh = Response(status_code=200)
+    assert CURRENT.respond(fresh, Preconditions(if_none_match='"old"')) is fresh
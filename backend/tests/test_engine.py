@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+
+from utils import storage
+from utils.engine import Collection, JsonEngine, SqliteEngine
+from utils.errors import ConflictError
+
+PEOPLE = Collection('people', 'people.json', layout='list', unique=('email',))
+GROUPS = Collection('groups', 'groups.json', layout='map', unique=('name',))
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def engine(request, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'DATA_DIR', str(tmp_path))
+    if request.param == 'json':
+        return JsonEngine()
+    return SqliteEngine(str(tmp_path / 'app.db'))
+
+
+@pytest.mark.parametrize('coll, field', [(PEOPLE, 'email'), (GROUPS, 'name')])
+def test_concurrent_duplicates_are_rejected(engine, coll, field):
+    # Every writer passed its own lookup; only one may land
+    start = threading.Barrier(8)
+    conflicts = []
+
+    def writer(n):
+        start.wait()
+        try:
+            engine.put(coll, {'id': f"r{n}", field: ('same', 'SAME', ' Same ')[n % 3]})
+        except ConflictError:
+            conflicts.append(n)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert len(engine.all(coll)) == 1
+    assert len(conflicts) == 7
+
+
+def test_update_cannot_take_another_records_value(engine):
+    engine.put(PEOPLE, {'id': 'a', 'email': 'a@example.com'})
+    engine.put(PEOPLE, {'id': 'b', 'email': 'b@example.com'})
+    with pytest.raises(ConflictError):
+        engine.update(PEOPLE, 'b', lambda rec: {**rec, 'email': 'A@example.com'})
+    assert engine.get(PEOPLE, 'b')['email'] == 'b@example.com'
+    # Rewriting a record with its own value is not a conflict
+    engine.put(PEOPLE, {'id': 'a', 'email': 'A@Example.com', 'name': 'A'})
+    assert engine.lookup(PEOPLE, 'email', 'a@example.com')['name'] == 'A'
+
+
+def test_sqlite_upgrades_plain_unique_column_index(tmp_path):
+    path = str(tmp_path / 'app.db')
+    legacy = SqliteEngine(path)
+    legacy.put(PEOPLE, {'id': 'a', 'email': 'a@example.com'})
+    conn = legacy._conn()
+    conn.execute("DROP INDEX people_u_email")
+    conn.execute("CREATE INDEX people_u_email ON people (u_email)")
+
+    engine = SqliteEngine(path)
+    engine.put(PEOPLE, {'id': 'b', 'email': 'b@example.com'})
+    with pytest.raises(ConflictError):
+        engine.put(PEOPLE, {'id': 'c', 'email': 'A@EXAMPLE.COM'})
+
+
+def test_sqlite_warns_when_legacy_duplicates_block_the_unique_index(tmp_path, caplog):
+    path = str(tmp_path / 'app.db')
+    legacy = SqliteEngine(path)
+    legacy.put(PEOPLE, {'id': 'a', 'email': 'a@example.com'})
+    conn = legacy._conn()
+    conn.execute("DROP INDEX people_u_email")
+    conn.execute("CREATE INDEX people_u_email ON people (u_email)")
+    conn.execute("INSERT INTO people (f_id, u_email, doc) VALUES ('b', 'a@example.com', '{\"id\":\"b\"}')")
+
+    with caplog.at_level('WARNING', logger='utils.engine'):
+        engine = SqliteEngine(path)
+        engine.put(PEOPLE, {'id': 'c', 'email': 'c@example.com'})
+    assert 'people.u_email has duplicate values' in caplog.text
+    # Lookups still use the (plain) index
+    assert engine.lookup(PEOPLE, 'email', 'C@example.com')['id'] == 'c'
+
+
+BALLOTS = Collection('ballots', 'ballots.json', layout='journal', journal='ballots.log', key=('meetingId', 'userId'))
+
+
+def _ballot(user, slot):
+    return {'meetingId': 'm1', 'userId': user, 'slot': slot}
+
+
+def test_journal_revote_replaces_earlier_vote(engine):
+    engine.put(BALLOTS, _ballot('a', 'mon'))
+    engine.put(BALLOTS, _ballot('b', 'mon'))
+    engine.put(BALLOTS, _ballot('a', 'tue'))
+    # Last writer wins, and an upsert moves the record to the end
+    assert engine.all(BALLOTS) == [_ballot('b', 'mon'), _ballot('a', 'tue')]
+    assert engine.get(BALLOTS, ('m1', 'a')) == _ballot('a', 'tue')
+
+
+def test_journal_tombstone_hides_vote(engine):
+    engine.put(BALLOTS, _ballot('a', 'mon'))
+    engine.put(BALLOTS, _ballot('b', 'mon'))
+    assert engine.delete(BALLOTS, ('m1', 'a'))
+    assert engine.get(BALLOTS, ('m1', 'a')) is None
+    assert engine.all(BALLOTS) == [_ballot('b', 'mon')]
+    assert not engine.delete(BALLOTS, ('m1', 'a'))
+
+
+def test_journal_compaction_keeps_visible_state(engine, tmp_path):
+    for n in range(5):
+        engine.put(BALLOTS, _ballot(f"u{n}", 'mon'))
+    engine.put(BALLOTS, _ballot('u1', 'tue'))
+    engine.delete(BALLOTS, ('m1', 'u3'))
+    before = engine.all(BALLOTS)
+
+    engine.compact(BALLOTS)
+
+    assert engine.all(BALLOTS) == before
+    assert engine.get(BALLOTS, ('m1', 'u3')) is None
+    if isinstance(engine, JsonEngine):
+        assert storage.read_jsonl('ballots.log') == []
+        # A fresh engine rebuilds the same state from the snapshot alone
+        assert JsonEngine().all(BALLOTS) == before
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from utils import engine, storage
+from utils.engine import JsonEngine
+from utils.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from utils.response_cache import response_cache
+
+BASE = '/api/v1/members'
+IDS = ['ada', 'bob', 'cy', 'dee', 'eve']
+
+
+def _member(member_id):
+    return {
+        'id': member_id, 'name': member_id.title(), 'email': f"{member_id}@example.com",
+        'timezone': 'UTC', 'role': 'member', 'status': 'online', 'availability': {},
+    }
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'DATA_DIR', str(tmp_path))
+    # Stored out of id order, so paging has to sort
+    (tmp_path / 'members.json').write_text(json.dumps([_member(m) for m in reversed(IDS)]))
+    (tmp_path / 'teams.json').write_text('{}')
+    engine.set_engine(JsonEngine())
+    response_cache.clear()
+    from app import app
+    yield TestClient(app)
+    response_cache.clear()
+    engine.set_engine(None)
+
+
+def test_cursor_walks_every_member_once(client):
+    seen, pages, cursor = [], 0, None
+    while True:
+        params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+        response = client.get(BASE, params=params)
+        assert response.status_code == 200
+        seen += [member['id'] for member in response.json()]
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+    assert seen == IDS
+    assert pages == 3
+
+
+def test_cursor_resumes_after_its_key(client):
+    response = client.get(BASE, params={'limit': 2, 'cursor': encode_cursor('bob')})
+    assert [member['id'] for member in response.json()] == ['cy', 'dee']
+    assert response.headers[NEXT_CURSOR_HEADER] == encode_cursor('dee')
+
+
+@pytest.mark.parametrize('cursor', ['not a cursor!', encode_cursor({'id': 'bob'})[:-2], 'e30'])
+def test_bad_cursor_is_a_400(client, cursor):
+    response = client.get(BASE, params={'cursor': cursor})
+    assert response.status_code == 400
+    assert 'cursor' in response.json()['detail']
+
+
+def test_fields_limit_listed_members(client):
+    response = client.get(BASE, params={'fields': 'name, timezone'})
+    assert response.status_code == 200
+    assert response.json()[0] == {'id': 'eve', 'name': 'Eve', 'timezone': 'UTC'}
+
+
+@pytest.mark.parametrize('path', [BASE, f"{BASE}/ada"])
+def test_unknown_fields_are_a_400(client, path):
+    response = client.get(path, params={'fields': 'name,password,secret'})
+    assert response.status_code == 400
+    assert response.json()['detail'] == 'Unknown fields: password, secret'
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from models.vote_model import TALLY_UPDATES, VoteModel
+from services.meetings_service import MeetingsService
+from utils import engine, storage
+from utils.engine import JsonEngine
+from utils.pubsub import Hub, TopicClosed
+
+
+async def _drain(subscription):
+    # Everything queued so far, without waiting for more
+    await asyncio.sleep(0)
+    messages = []
+    while subscription._pending:
+        messages.append(await subscription.get())
+    return messages
+
+
+def test_full_queue_drops_the_oldest_message():
+    async def scenario():
+        hub = Hub('test', max_pending=2)
+        subscription = hub.subscribe('topic')
+        for n in range(5):
+            hub.publish('topic', n)
+        return hub, await _drain(subscription)
+
+    hub, messages = asyncio.run(scenario())
+    assert messages == [3, 4]
+    assert hub.stats()['dropped'] == 3
+    assert hub.stats()['delivered'] == 2
+
+
+def test_unread_updates_merge_into_one():
+    async def scenario():
+        hub = Hub('test', merge=lambda older, newer: {**older, **newer})
+        slow = hub.subscribe('topic')
+        hub.publish('topic', {'mon': 1})
+        hub.publish('topic', {'tue': 1})
+        hub.publish('topic', {'mon': 2})
+        first = await _drain(slow)
+        hub.publish('topic', {'wed': 1})
+        return hub, first, await _drain(slow)
+
+    hub, first, later = asyncio.run(scenario())
+    assert first == [{'mon': 2, 'tue': 1}]
+    assert later == [{'wed': 1}]
+    assert hub.stats()['coalesced'] == 2
+
+
+def test_publish_from_another_thread_reaches_only_its_topic():
+    async def scenario():
+        hub = Hub('test')
+        watched, other = hub.subscribe('a'), hub.subscribe('b')
+        thread = threading.Thread(target=lambda: [hub.publish('a', n) for n in range(3)])
+        thread.start()
+        received = [await asyncio.wait_for(watched.get(), 1) for _ in range(3)]
+        thread.join()
+        return received, await _drain(other)
+
+    assert asyncio.run(scenario()) == ([0, 1, 2], [])
+
+
+def test_closed_topic_ends_after_pending_messages():
+    async def scenario():
+        hub = Hub('test')
+        subscription = hub.subscribe('topic')
+        hub.publish('topic', 'last')
+        assert hub.close_topic('topic') == 1
+        assert not hub.has_subscribers('topic')
+        # Publishing to a closed topic reaches nobody
+        assert hub.publish('topic', 'late') == 0
+        received = await asyncio.wait_for(subscription.get(), 1)
+        with pytest.raises(TopicClosed):
+            await asyncio.wait_for(subscription.get(), 1)
+        subscription.close()
+        return received
+
+    assert asyncio.run(scenario()) == 'last'
+
+
+@pytest.fixture
+def meeting(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'DATA_DIR', str(tmp_path))
+    (tmp_path / 'meetings.json').write_text(json.dumps([{'id': 'm1', 'title': 'M', 'teamId': 't1', 'timeSlots': []}]))
+    engine.set_engine(JsonEngine())
+    yield 'm1'
+    engine.set_engine(None)
+
+
+def test_deleting_a_meeting_closes_its_tally_stream(meeting):
+    vote = {'userId': 'u1', 'timeSlot': '2030-01-01T10:00:00Z', 'preference': 'high'}
+
+    async def scenario():
+        subscription = TALLY_UPDATES.subscribe(meeting)
+        bystander = TALLY_UPDATES.subscribe('other-meeting')
+        await asyncio.to_thread(VoteModel.submit_vote, meeting, vote)
+        assert await asyncio.to_thread(MeetingsService().delete_meeting, meeting)
+        # The vote's delta is still delivered, then the stream ends
+        delta = await asyncio.wait_for(subscription.get(), 1)
+        assert delta == {vote['timeSlot']: {'votes': 1, 'preference': 'high'}}
+        with pytest.raises(TopicClosed):
+            await asyncio.wait_for(subscription.get(), 1)
+        assert TALLY_UPDATES.has_subscribers('other-meeting')
+        bystander.close()
+
+    asyncio.run(scenario())
+    assert not TALLY_UPDATES.has_subscribers(meeting)
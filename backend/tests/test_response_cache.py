@@ -0,0 +1,69 @@
+import pytest
+from fastapi.responses import JSONResponse
+
+from utils import engine, storage
+from utils.conditional import Validators, validators
+from utils.engine import Collection, JsonEngine
+from utils.response_cache import _ENTRY_OVERHEAD, ResponseCache
+
+NOTES = Collection('notes', 'notes.json', layout='list')
+
+
+@pytest.fixture
+def notes(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'DATA_DIR', str(tmp_path))
+    store = JsonEngine()
+    engine.set_engine(store)
+    yield store
+    engine.set_engine(None)
+
+
+def test_write_invalidates_cached_response(notes):
+    cache = ResponseCache(1 << 20)
+    notes.put(NOTES, {'id': 'a', 'text': 'first'})
+    before = validators((NOTES,), 'notes')
+    cache.put(before, JSONResponse(notes.all(NOTES)))
+    assert cache.get(validators((NOTES,), 'notes')).body == b'[{"id":"a","text":"first"}]'
+
+    notes.put(NOTES, {'id': 'a', 'text': 'second'})
+    after = validators((NOTES,), 'notes')
+    assert after.generation != before.generation
+    assert cache.get(after) is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['invalidations'], stats['entries'], stats['bytes']) == (1, 1, 0, 0)
+
+
+def test_generation_alone_invalidates():
+    # Same ETag (e.g. a rewrite within the mtime resolution), newer counter
+    cache = ResponseCache(1 << 20)
+    cache.put(Validators('"t"', None, ('notes',), (1,)), JSONResponse([1]))
+    assert cache.get(Validators('"t"', None, ('notes',), (1,))) is not None
+    assert cache.get(Validators('"t"', None, ('notes',), (2,))) is None
+
+
+def _entry(n):
+    return Validators(f'"{n}"', None, ('note', n), (0,)), JSONResponse({'body': 'x' * 200})
+
+
+def test_evicts_least_recently_used_over_the_byte_limit():
+    size = len(_entry(0)[1].body) + _ENTRY_OVERHEAD + sum(map(len, ('content-type', 'application/json', 'etag', '"0"')))
+    cache = ResponseCache(4 * size)
+    for n in range(4):
+        cache.put(*_entry(n))
+    assert cache.stats()['entries'] == 4
+    cache.get(_entry(0)[0])  # now the most recently used
+
+    cache.put(*_entry(4))
+
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['bytes'] <= stats['max_bytes']
+    assert cache.get(_entry(1)[0]) is None
+    assert all(cache.get(_entry(n)[0]) is not None for n in (0, 2, 3, 4))
+
+
+def test_oversized_response_is_not_cached():
+    cache = ResponseCache(1000)
+    cache.put(Validators('"big"', None, ('big',), (0,)), JSONResponse('x' * 300))
+    assert cache.stats()['skipped'] == 1
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from routes.dependencies import request_snapshot
+from utils import engine, storage
+from utils.concurrency import AsyncFacade
+from utils.engine import Collection, JsonEngine, get_engine
+
+NOTES = Collection('notes', 'notes.json', layout='list')
+
+
+class _NotesService:
+    def get_note(self, key):
+        return get_engine().get(NOTES, key)
+
+    def edit_note(self, key, text):
+        get_engine().put(NOTES, {'id': key, 'text': text})
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'DATA_DIR', str(tmp_path))
+    store = JsonEngine()
+    store.put(NOTES, {'id': 'a', 'text': 'first'})
+    engine.set_engine(store)
+    yield store
+    engine.set_engine(None)
+
+
+@pytest.fixture
+def client(store):
+    notes = AsyncFacade(_NotesService())
+    router = APIRouter(dependencies=[Depends(request_snapshot)])
+
+    @router.get('/notes/{key}')
+    async def read_twice(key: str):
+        # Reads run on the storage pool, like the controllers'
+        first = await notes.get_note(key)
+        store.put(NOTES, {'id': key, 'text': 'changed by another request'})
+        second = await notes.get_note(key)
+        return {'first': first['text'], 'second': second['text']}
+
+    @router.put('/notes/{key}')
+    async def edit_then_read(key: str):
+        await notes.get_note(key)
+        await notes.edit_note(key, 'own write')
+        return (await notes.get_note(key))['text']
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_reads_within_a_request_share_one_snapshot(client):
+    assert client.get('/notes/a').json() == {'first': 'first', 'second': 'first'}
+    # The next request starts a new snapshot
+    assert client.get('/notes/a').json()['first'] == 'changed by another request'
+
+
+def test_request_sees_its_own_writes(client):
+    assert client.put('/notes/a').json() == 'own write'
+
+
+def test_snapshot_is_reset_after_the_request(store):
+    async def scenario():
+        dependency = request_snapshot()
+        await dependency.__anext__()
+        inside = get_engine()
+        with pytest.raises(StopAsyncIteration):
+            await dependency.__anext__()
+        return inside, get_engine()
+
+    inside, after = asyncio.run(scenario())
+    assert inside is not store
+    assert after is store
+    assert engine._snapshot.get() is None
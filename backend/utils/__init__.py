@@ -2,5 +2,6 @@
 Utils package.
 
 Shared helpers for auth (JWT, password hashing), validation, timezones,
-file I/O with locks, pagination, and error handling.
+weekly availability bitsets, file I/O with locks, storage engines,
+pagination, and error handling.
 """
@@ -2,20 +2,33 @@
 Auth utilities.
 
 JWT encode/decode helpers and password hashing/verification.
+
+Signing keys live in a key ring loaded once from the environment: JWT_SECRET
+signs new tokens and JWT_PREVIOUS_SECRETS (comma-separated) still verify
+tokens issued before a rotation. Tokens name their key with a `kid` header.
+
+Verified tokens are remembered in a bounded LRU (token -> sub, exp), so a
+repeated bearer token skips signature and JSON work; entries are dropped once
+expired and the whole cache is cleared whenever the key ring changes.
 """
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 import hashlib
 import hmac
 import os
+import threading
+import time
 
 import base64
 import json
 
+from utils.config import env_int
+
 
 # Lightweight JWT (HS256) implementation to avoid extra dependencies.
 # For production, consider using `pyjwt`.
@@ -38,23 +51,133 @@ def _sign(message: bytes, secret: bytes) -> bytes:
     return hmac.new(secret, message, hashlib.sha256).digest()
 
 
+class KeyRing:
+    """HS256 signing keys: `current` signs, every key verifies.
+
+    Keys are addressed by a short fingerprint (`kid`), so a rotation only
+    needs the old secret kept in `previous` until its tokens have expired.
+    """
+
+    def __init__(self, current: bytes, previous: Iterable[bytes] = ()) -> None:
+        self.current = current
+        self.current_kid = self.kid_of(current)
+        self.keys: Dict[str, bytes] = {self.kid_of(key): key for key in previous}
+        self.keys[self.current_kid] = current
+
+    @staticmethod
+    def kid_of(key: bytes) -> str:
+        return hashlib.sha256(key).hexdigest()[:16]
+
+    @classmethod
+    def from_env(cls) -> "KeyRing":
+        current = os.environ.get("JWT_SECRET", "dev-secret").encode("utf-8")
+        previous = [s.strip().encode("utf-8") for s in os.environ.get("JWT_PREVIOUS_SECRETS", "").split(",") if s.strip()]
+        return cls(current, previous)
+
+    def candidates(self, kid: Optional[str]) -> Iterable[bytes]:
+        # Tokens issued before key ids existed carry no kid: try every key
+        if kid is None:
+            return self.keys.values()
+        key = self.keys.get(kid)
+        return (key,) if key is not None else ()
+
+
+class _TokenCache:
+    """Bounded LRU of verified tokens: token -> (sub, exp)."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._stats: Dict[str, int] = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+
+    def get(self, token: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            if time.time() >= entry[1]:
+                del self._entries[token]
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(token)
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def put(self, token: str, sub: str, exp: int) -> None:
+        with self._lock:
+            self._entries[token] = (sub, exp)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, 'entries': len(self._entries)}
+
+
+_key_ring: Optional[KeyRing] = None
+_key_ring_lock = threading.Lock()
+# 0 turns the cache off
+_token_cache = _TokenCache(env_int("JWT_CACHE_SIZE", 4096, minimum=0))
+
+
+def get_key_ring() -> KeyRing:
+    """Return the active key ring, loading it from the environment on first use."""
+    global _key_ring
+    if _key_ring is None:
+        with _key_ring_lock:
+            if _key_ring is None:
+                _key_ring = KeyRing.from_env()
+    return _key_ring
+
+
+def set_key_ring(ring: Optional[KeyRing]) -> None:
+    """Install `ring` (None reloads from the environment on next use) and
+    forget every cached verification."""
+    global _key_ring
+    with _key_ring_lock:
+        _key_ring = ring
+        _token_cache.clear()
+
+
+def rotate_secret(new_secret: str) -> KeyRing:
+    """Sign with `new_secret` from now on, keeping the current keys for verification."""
+    ring = get_key_ring()
+    rotated = KeyRing(new_secret.encode("utf-8"), ring.keys.values())
+    set_key_ring(rotated)
+    return rotated
+
+
+def token_cache_stats() -> Dict[str, int]:
+    """Return verified-token cache counters (hits, misses, evictions, expired, entries)."""
+    return _token_cache.stats()
+
+
 def generate_jwt_token(user_id: str, expires_delta: timedelta) -> str:
     """Generate a compact JWT string signed with HS256.
 
-    Payload includes `sub` and `exp` (as Unix timestamp seconds).
-    Secret is read from `JWT_SECRET` env var, defaulting to a dev secret.
+    Payload includes `sub` and `exp` (as Unix timestamp seconds); the header
+    names the signing key (`kid`) of the key ring.
     """
 
+    ring = get_key_ring()
     now = datetime.now(timezone.utc)
     exp = now + expires_delta
-    header = {"alg": "HS256", "typ": "JWT"}
+    header = {"alg": "HS256", "typ": "JWT", "kid": ring.current_kid}
     payload = {"sub": str(user_id), "exp": int(exp.timestamp())}
-    secret = os.environ.get("JWT_SECRET", "dev-secret").encode("utf-8")
 
     part1 = _b64url_encode(_json_dumps(header))
     part2 = _b64url_encode(_json_dumps(payload))
     signing_input = f"{part1}.{part2}".encode("ascii")
-    signature = _b64url_encode(_sign(signing_input, secret))
+    signature = _b64url_encode(_sign(signing_input, ring.current))
     return f"{part1}.{part2}.{signature}"
 
 
@@ -67,10 +190,15 @@ def verify_jwt_token(token: str) -> Dict[str, Any]:
     if not isinstance(token, str) or token.count(".") != 2:
         raise ValueError("Invalid token format")
     part1, part2, signature = token.split(".")
-    secret = os.environ.get("JWT_SECRET", "dev-secret").encode("utf-8")
+    try:
+        kid = json.loads(_b64url_decode(part1).decode("utf-8")).get("kid")
+    except Exception:
+        raise ValueError("Invalid token header")
     signing_input = f"{part1}.{part2}".encode("ascii")
-    expected_sig = _b64url_encode(_sign(signing_input, secret))
-    if not hmac.compare_digest(signature, expected_sig):
+    if not any(
+        hmac.compare_digest(signature, _b64url_encode(_sign(signing_input, key)))
+        for key in get_key_ring().candidates(kid)
+    ):
         raise ValueError("Invalid token signature")
 
     payload_bytes = _b64url_decode(part2)
@@ -119,9 +247,14 @@ def get_current_user(token: Optional[str]) -> Optional[str]:
         if os.environ.get("ALLOW_PUBLIC_MUTATIONS", "false").lower() == "true":
             return "dev-user"
         return None
+    sub = _token_cache.get(token)
+    if sub is not None:
+        return sub
     try:
         payload = verify_jwt_token(token)
-        return str(payload.get("sub"))
     except Exception:
         return None
+    sub = str(payload.get("sub"))
+    _token_cache.put(token, sub, int(payload["exp"]))
+    return sub
 
@@ -0,0 +1,118 @@
+"""
+Availability utilities.
+
+Weekly availability is a 168-bit integer: bit `day * 24 + hour` is the slot
+the API calls `day_{day}_slot_{hour}` (day 0 = Monday, local time of the
+member). That integer is the internal form; on disk it is stored as the 21
+little-endian bytes, base64 encoded (28 characters). The `day_D_slot_H` map
+is produced only at the API boundary, and clients may opt into the base64
+form on the wire instead.
+
+Overlap between members is a bitwise AND of their masks.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+from typing import Any, Dict, Iterator
+
+DAYS = 7
+HOURS = 24
+WEEK_SLOTS = DAYS * HOURS
+SLOT_BYTES = WEEK_SLOTS // 8
+FULL_WEEK = (1 << WEEK_SLOTS) - 1
+
+# Slot keys in week order, so SLOT_KEYS[i] is bit i
+SLOT_KEYS = tuple(f"day_{day}_slot_{hour}" for day in range(DAYS) for hour in range(HOURS))
+_SLOT_INDEX = {key: idx for idx, key in enumerate(SLOT_KEYS)}
+
+# Wire formats accepted by the members endpoints (?availabilityFormat=)
+WIRE_FORMATS = ('slots', 'base64')
+
+
+def from_slots(slots: Dict[str, Any]) -> int:
+    """Build a mask from a `day_D_slot_H` map; unknown keys are ignored."""
+    bits = 0
+    for key, value in slots.items():
+        idx = _SLOT_INDEX.get(key)
+        if value and idx is not None:
+            bits |= 1 << idx
+    return bits
+
+
+def to_slots(bits: int) -> Dict[str, bool]:
+    """Return the `day_D_slot_H` map for `bits`; only set slots are listed."""
+    return {SLOT_KEYS[idx]: True for idx in iter_slots(bits & FULL_WEEK)}
+
+
+def to_base64(bits: int) -> str:
+    return base64.b64encode((bits & FULL_WEEK).to_bytes(SLOT_BYTES, 'little')).decode('ascii')
+
+
+def from_base64(value: str) -> int:
+    """Decode the base64 form; raises ValueError if it is not 21 bytes."""
+    try:
+        raw = base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid base64 availability")
+    if len(raw) != SLOT_BYTES:
+        raise ValueError(f"Availability must encode {SLOT_BYTES} bytes")
+    return int.from_bytes(raw, 'little')
+
+
+def decode(value: Any) -> int:
+    """Return the mask for any stored or submitted availability value.
+
+    Accepts the mask itself, the base64 form, a `day_D_slot_H` map, or the
+    legacy 24-entry list (Monday hours). Empty values decode to 0.
+    """
+    if not value:
+        return 0
+    if isinstance(value, int):
+        return value & FULL_WEEK
+    if isinstance(value, str):
+        return from_base64(value)
+    if isinstance(value, dict):
+        return from_slots(value)
+    if isinstance(value, list):
+        # Legacy storage uses a 24-length vector for Monday (day_0) hourly slots
+        bits = 0
+        for idx, v in enumerate(value[:HOURS]):
+            if int(v) == 1:
+                bits |= 1 << idx
+        return bits
+    raise ValueError("Unsupported availability value")
+
+
+def encode(bits: int, wire_format: str = 'base64') -> Any:
+    """Encode a mask as the base64 string (storage/compact wire) or slot map."""
+    if wire_format == 'slots':
+        return to_slots(bits)
+    if wire_format == 'base64':
+        return to_base64(bits)
+    raise ValueError(f"Unknown availability format: {wire_format}")
+
+
+def iter_slots(bits: int) -> Iterator[int]:
+    """Yield the positions of set bits in ascending order."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def rotate(bits: int, hours: int) -> int:
+    """Move every slot `hours` later in the week, wrapping Sunday into Monday."""
+    hours %= WEEK_SLOTS
+    if not hours:
+        return bits
+    return ((bits << hours) | (bits >> (WEEK_SLOTS - hours))) & FULL_WEEK
+
+
+def overlap(*masks: int) -> int:
+    """Slots available in every mask."""
+    result = FULL_WEEK
+    for mask in masks:
+        result &= mask
+    return result if masks else 0
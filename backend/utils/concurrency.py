@@ -0,0 +1,224 @@
+"""
+Concurrency utilities.
+
+Services are synchronous (file reads, fsyncs, SQLite), while controllers are
+async. Blocking service calls run on dedicated, sized thread pools instead of
+the event loop:
+
+- 'read' pool for lookups and listings (STORAGE_READ_WORKERS, default 8)
+- 'write' pool for everything else (STORAGE_WRITE_WORKERS, default 4)
+
+Writes that wait on a file lock or an fsync therefore cannot occupy the
+threads reads need. `AsyncFacade` wraps a service so each public method
+becomes awaitable and is routed to the right pool by name.
+
+`LoopLagMonitor` measures event-loop lag: how late a periodic timer fires.
+Sustained lag means something is still blocking the loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from utils.config import env_int
+from utils.metrics import registry
+
+# Service methods with these prefixes only read storage
+READ_PREFIXES = ('get_', 'list_', 'aggregate_', 'verify_')
+
+POOL_WAIT_SECONDS = registry.histogram('storage_pool_wait_seconds', "Time service calls queue for a pool thread", ('pool',))
+SERVICE_SECONDS = registry.histogram(
+    'service_call_duration_seconds', "Service call latency through AsyncFacade, queueing included", ('service', 'method')
+)
+
+
+class _Pool:
+    """A named thread pool with queue-depth and timing counters."""
+
+    def __init__(self, name: str, workers: int) -> None:
+        self.name = name
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"storage-{name}")
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.stats: Dict[str, float] = {
+            'submitted': 0,
+            'completed': 0,
+            'cancelled': 0,
+            'pending_max': 0,
+            'wait_seconds_total': 0.0,
+            'busy_seconds_total': 0.0,
+        }
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self.lock:
+            self.pending += 1
+            self.stats['submitted'] += 1
+            self.stats['pending_max'] = max(self.stats['pending_max'], self.pending)
+        submitted = time.perf_counter()
+        # Carry context variables (request-scoped state) into the worker thread
+        context = contextvars.copy_context()
+
+        def job() -> Any:
+            started = time.perf_counter()
+            POOL_WAIT_SECONDS.observe(started - submitted, (self.name,))
+            try:
+                return context.run(fn, *args, **kwargs)
+            finally:
+                finished = time.perf_counter()
+                with self.lock:
+                    self.pending -= 1
+                    self.stats['completed'] += 1
+                    self.stats['wait_seconds_total'] += started - submitted
+                    self.stats['busy_seconds_total'] += finished - started
+
+        future = self.executor.submit(job)
+        # A caller cancelled while queued cancels the job, which then never runs
+        future.add_done_callback(self._release_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _release_cancelled(self, future: Future) -> None:
+        if future.cancelled():
+            with self.lock:
+                self.pending -= 1
+                self.stats['cancelled'] += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self.lock:
+            return {'workers': self.workers, 'pending': self.pending, **self.stats}
+
+
+_pools: Dict[str, _Pool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(name: str) -> _Pool:
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                defaults = {'read': 8, 'write': 4}
+                if name not in defaults:
+                    raise ValueError(f"Unknown pool: {name}")
+                workers = env_int(f"STORAGE_{name.upper()}_WORKERS", defaults[name])
+                pool = _pools[name] = _Pool(name, workers)
+    return pool
+
+
+async def run_blocking(pool: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run `fn(*args, **kwargs)` on the 'read' or 'write' pool and await it."""
+    return await _pool(pool).run(fn, *args, **kwargs)
+
+
+def executor_stats() -> Dict[str, Dict[str, float]]:
+    """Return per-pool counters: workers, pending (queued + running), pending_max,
+    submitted, completed, cancelled and wait/busy seconds."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.snapshot() for pool in pools}
+
+
+class AsyncFacade:
+    """Awaitable view of a synchronous service.
+
+    `facade.method(...)` returns a coroutine that runs the service method on
+    the read pool (names starting with READ_PREFIXES, or listed in the
+    service's `read_methods`) or the write pool. Methods that are already
+    coroutines, and non-callable attributes, are passed through. Concurrent
+    identical calls to `@singleflight` methods share one pool job.
+    """
+
+    def __init__(self, service: Any) -> None:
+        self._service = service
+        self._read_methods = frozenset(getattr(service, 'read_methods', ()))
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._service, name)
+        if name.startswith('_') or not callable(attr) or inspect.iscoroutinefunction(attr):
+            return attr
+        pool = 'read' if name.startswith(READ_PREFIXES) or name in self._read_methods else 'write'
+        # utils.singleflight methods: followers wait here, not in a pool thread
+        group = getattr(attr, 'singleflight', None)
+        labels = (type(self._service).__name__, name)
+
+        @functools.wraps(attr)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                if group is not None:
+                    return await group.do_async(
+                        group.key(args, kwargs), lambda: run_blocking(pool, attr, *args, **kwargs)
+                    )
+                return await run_blocking(pool, attr, *args, **kwargs)
+            finally:
+                SERVICE_SECONDS.observe(time.perf_counter() - started, labels)
+
+        # Cache the wrapper; __getattr__ is only consulted on misses
+        setattr(self, name, call)
+        return call
+
+
+class LoopLagMonitor:
+    """Samples event-loop lag by checking how late a periodic sleep wakes up."""
+
+    def __init__(self, interval: float = 0.1) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, float] = {
+            'samples': 0,
+            'lag_seconds_last': 0.0,
+            'lag_seconds_max': 0.0,
+            'lag_seconds_total': 0.0,
+            'over_10ms': 0,
+            'over_100ms': 0,
+        }
+
+    def start(self) -> None:
+        """Start sampling on the running loop (call from a coroutine, e.g. startup)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - expected))
+
+    def record(self, lag: float) -> None:
+        with self._lock:
+            self._stats['samples'] += 1
+            self._stats['lag_seconds_last'] = lag
+            self._stats['lag_seconds_total'] += lag
+            if lag > self._stats['lag_seconds_max']:
+                self._stats['lag_seconds_max'] = lag
+            if lag > 0.01:
+                self._stats['over_10ms'] += 1
+            if lag > 0.1:
+                self._stats['over_100ms'] += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Return lag counters: samples, last/max/total lag in seconds, samples over 10ms/100ms."""
+        with self._lock:
+            return dict(self._stats, interval_seconds=self.interval)
+
+
+loop_monitor = LoopLagMonitor()
@@ -0,0 +1,119 @@
+"""
+Conditional GET support.
+
+Polled read endpoints send strong `ETag` and `Last-Modified` validators
+derived from the versions of the collections they are built from (see
+utils.engine.Version) and from the request's own parameters. A request
+whose `If-None-Match` (or, without one, `If-Modified-Since`) still matches
+is answered with 304 before the service layer runs, so an unchanged poll
+costs a stat per collection instead of a read, projection and serialization.
+`If-None-Match: *` is the exception: it is only answered with 304 once the
+lookup has found the resource, so a missing one still gets its 404.
+
+Versions are taken before the service reads anything: if the data changes
+in between, the response is newer than its validators and the next poll
+simply gets a 200.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple
+
+from fastapi import Response
+
+from utils.engine import Collection, get_engine
+
+
+class Preconditions(NamedTuple):
+    """Conditional request headers (see routes.dependencies.preconditions)."""
+
+    if_none_match: Optional[str] = None
+    if_modified_since: Optional[str] = None
+
+
+class Validators:
+    """ETag and Last-Modified for one representation of a resource.
+
+    `variant` names the representation and `generation` holds the
+    in-process change counters of its collections; together they key the
+    response cache (utils.response_cache).
+    """
+
+    def __init__(
+        self,
+        etag: str,
+        last_modified: Optional[float],
+        variant: Tuple[Any, ...] = (),
+        generation: Tuple[int, ...] = (),
+    ) -> None:
+        self.etag = etag
+        # HTTP dates have one-second resolution
+        self.last_modified = int(last_modified) if last_modified is not None else None
+        self.variant = variant
+        self.generation = generation
+
+    def headers(self) -> Dict[str, str]:
+        headers = {'ETag': self.etag}
+        if self.last_modified is not None:
+            headers['Last-Modified'] = formatdate(self.last_modified, usegmt=True)
+        return headers
+
+    def matches(self, preconditions: Optional[Preconditions], exists: bool = False) -> bool:
+        """True if the client's copy is current (answer 304).
+
+        `If-None-Match: *` matches any current representation, so it only
+        counts once the resource is known to exist (`exists`); checked before
+        the lookup, only the client's own tags can match (see `respond`).
+        """
+        if preconditions is None:
+            return False
+        if preconditions.if_none_match is not None:
+            # If-None-Match uses weak comparison and takes precedence (RFC 9110 13.2.2)
+            tags = [tag.strip() for tag in preconditions.if_none_match.split(',')]
+            return (exists and '*' in tags) or any(tag.removeprefix('W/') == self.etag for tag in tags)
+        if preconditions.if_modified_since and self.last_modified is not None:
+            try:
+                since = parsedate_to_datetime(preconditions.if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return since.tzinfo is not None and self.last_modified <= since.timestamp()
+        return False
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers())
+
+    def respond(self, response: Response, preconditions: Optional[Preconditions]) -> Response:
+        """Return the found resource's `response`, or 304 if the preconditions
+        match now that it exists (`If-None-Match: *`)."""
+        if self.matches(preconditions, exists=True):
+            return self.not_modified()
+        return response
+
+    def apply(self, response: Response) -> Response:
+        """Add the validators to a 200 response and return it."""
+        response.headers.update(self.headers())
+        return response
+
+
+def validators(collections: Sequence[Collection], *variant: Any) -> Validators:
+    """Validators for a representation built from `collections`.
+
+    `variant` identifies the representation, route name first, then resource
+    id and query parameters. It must be hashable and repr-stable; it is
+    hashed into the ETag with the versions.
+    """
+    engine = get_engine()
+    versions = [engine.version(coll) for coll in collections]
+    digest = hashlib.blake2b(
+        repr(([(coll.name, version.tag) for coll, version in zip(collections, versions)], variant)).encode('utf-8'),
+        digest_size=16,
+    ).hexdigest()
+    modified = [version.modified for version in versions if version.modified is not None]
+    return Validators(
+        f'"{digest}"',
+        max(modified) if len(modified) == len(versions) else None,
+        variant,
+        tuple(version.counter for version in versions),
+    )
@@ -0,0 +1,20 @@
+"""
+Configuration helpers.
+
+Tunables are read from the environment (see .env.development) once, at
+import or first use. A malformed value falls back to the default instead of
+failing the import of whatever module reads it.
+"""
+
+from __future__ import annotations
+
+import os
+
+
+def env_int(name: str, default: int, minimum: int = 1) -> int:
+    """Return the integer environment variable `name`, at least `minimum`;
+    `default` if it is unset or not an integer."""
+    try:
+        return max(minimum, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
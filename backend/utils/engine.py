@@ -0,0 +1,1727 @@
+"""
+Storage engines.
+
+Record-level persistence used by the model classes. Each model declares a
+`Collection` (file name, on-disk layout, key and indexed fields) and calls
+the active engine instead of reading/writing whole JSON files itself.
+
+- JsonEngine: MVP layout in backend/data/*.json (see utils.storage)
+- SqliteEngine: one indexed table per collection in a stdlib sqlite3 database
+
+Select with STORAGE_ENGINE=json|sqlite (default json). The SQLite database
+path comes from DATABASE_URL (sqlite:///relative/or/absolute/path) and
+defaults to backend/data/app.db.
+
+Fields declared `unique` get case-normalized lookup indexes (see fold_value)
+so uniqueness checks and logins are probes rather than scans, and writes
+that would duplicate one raise ConflictError. Collections
+can also declare views: derived state (e.g. vote tallies) that engines keep
+in step with each change and rebuild from storage when they cannot.
+
+`version(coll)` reports a collection's change state without reading it
+(file stat stamps, or a version row in SQLite), for HTTP validators and
+in-memory caches.
+
+Changes spanning collections go through `transaction(*collections)`, which
+yields a batch with the same record methods; they commit together (one
+write per JSON file, see utils.storage.unit_of_work) or not at all.
+
+Within `read_snapshot()` (one per HTTP request, see
+routes.dependencies.request_snapshot) repeated reads of the same records
+are served from memory; see ReadSnapshot.
+
+Import existing JSON data into SQLite once with:
+    python -m utils.engine import
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import sqlite3
+import threading
+from bisect import bisect_right
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from utils.storage import (
+    DATA_DIR,
+    append_jsonl,
+    data_path,
+    file_lock,
+    generation,
+    mutate_json,
+    read_json,
+    read_jsonl,
+    reset_jsonl,
+    unit_of_work,
+    write_json,
+)
+from utils.errors import ConflictError
+
+logger = logging.getLogger(__name__)
+
+
+Record = Dict[str, Any]
+Key = Any  # str for single-field keys, tuple for composite keys
+Change = Tuple[Optional[Record], Optional[Record]]  # (old, new) as seen by views
+
+
+class Version(NamedTuple):
+    """Change state of a collection.
+
+    tag: differs whenever the collection changed; equal in every process
+    counter: increases with every change seen by this process
+    modified: last modification time (epoch seconds), if known
+    """
+
+    tag: Tuple[Any, ...]
+    counter: int
+    modified: Optional[float]
+
+# Fold a journal into its snapshot once it holds this many entries
+JOURNAL_COMPACT_THRESHOLD = 500
+
+# Stable stand-in for a missing snapshot so journal replay stays incremental
+_NO_RECORDS: Tuple[Record, ...] = ()
+
+
+def fold_value(value: Any) -> Any:
+    """Normalize a unique-index value: strings are stripped and casefolded."""
+    if isinstance(value, str):
+        return value.strip().casefold() or None
+    return value
+
+
+def unique_conflict(coll: 'Collection', field: str) -> ConflictError:
+    """Error for a write that would duplicate a unique field's value."""
+    return ConflictError(f"A {coll.name} record with this {field} already exists")
+
+
+class Collection:
+    """Declarative description of a stored record collection.
+
+    layout:
+        'list'    - JSON array of records (members, meetings)
+        'map'     - JSON object of key -> record (teams)
+        'journal' - JSON array snapshot plus an append-only JSON-lines log;
+                    upserts move a record to the end (votes)
+    key: field name(s) forming the primary key.
+    indexes: fields that get secondary indexes in engines that support them.
+    unique: fields with a case-normalized unique index, probed by
+        StorageEngine.lookup. Writes that would give two records the same
+        folded value raise ConflictError; callers still check with lookup
+        first for a friendlier message, the engine check closes the race.
+    normalize: optional (record, position) -> record hook that fills in a
+        missing key; applied when importing into another engine and when the
+        JSON engine migrates records it cannot index.
+    views: name -> View factory; read with StorageEngine.read_view.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        filename: str,
+        layout: str = 'list',
+        key: Tuple[str, ...] = ('id',),
+        indexes: Tuple[str, ...] = (),
+        unique: Tuple[str, ...] = (),
+        journal: Optional[str] = None,
+        legacy_field: Optional[str] = None,
+        normalize: Optional[Callable[[Record, int], Record]] = None,
+        views: Optional[Dict[str, Callable[[], 'View']]] = None,
+    ) -> None:
+        if layout not in ('list', 'map', 'journal'):
+            raise ValueError(f"Unknown collection layout: {layout}")
+        if layout == 'journal' and not journal:
+            raise ValueError("Journal collections need a journal filename")
+        if layout == 'journal' and unique:
+            raise ValueError("Journal collections do not support unique indexes")
+        self.name = name
+        self.filename = filename
+        self.layout = layout
+        self.key = tuple(key)
+        self.indexes = tuple(indexes)
+        self.unique = tuple(unique)
+        self.journal = journal
+        # Field filled from the object key when a list collection was stored as an object
+        self.legacy_field = legacy_field or self.key[0]
+        self.normalize = normalize
+        self.views = dict(views or {})
+        COLLECTIONS[name] = self
+
+    def key_of(self, record: Record) -> Key:
+        if len(self.key) == 1:
+            return record.get(self.key[0])
+        return tuple(record.get(field) for field in self.key)
+
+
+COLLECTIONS: Dict[str, Collection] = {}
+
+
+class View:
+    """Derived state maintained incrementally from a collection's changes.
+
+    A fresh instance is built by applying (None, record) for every stored
+    record; after that the engine applies (old, new) for each change, where
+    old is None for an insert and new is None for a delete. Engines
+    serialize calls, so implementations need no locking of their own.
+    """
+
+    def apply(self, old: Optional[Record], new: Optional[Record]) -> None:
+        raise NotImplementedError
+
+
+def _build_views(coll: Collection, records: Iterable[Record], extra: Optional[Dict[Any, View]] = None) -> Dict[Any, View]:
+    views: Dict[Any, View] = {name: factory() for name, factory in coll.views.items()}
+    views.update(extra or {})
+    for rec in records:
+        for view in views.values():
+            view.apply(None, rec)
+    return views
+
+
+class StorageEngine:
+    """Interface implemented by every storage engine.
+
+    Records returned by read methods may be shared with other callers and
+    must be treated as read-only.
+    """
+
+    def all(self, coll: Collection) -> List[Record]:
+        """Return every record in storage order."""
+        raise NotImplementedError
+
+    def get(self, coll: Collection, key: Key) -> Optional[Record]:
+        """Return the record with primary key `key`, or None."""
+        raise NotImplementedError
+
+    def get_many(self, coll: Collection, keys: Iterable[Key]) -> List[Optional[Record]]:
+        """Return the record (or None) for each key, in the order given."""
+        return [self.get(coll, key) for key in keys]
+
+    def find(self, coll: Collection, field: str, value: Any) -> List[Record]:
+        """Return records whose `field` equals `value`, in storage order."""
+        raise NotImplementedError
+
+    def lookup(self, coll: Collection, field: str, value: Any) -> Optional[Record]:
+        """Return the record whose unique `field` matches `value` after
+        fold_value normalization, or None."""
+        raise NotImplementedError
+
+    def version(self, coll: Collection) -> Version:
+        """Return the collection's change state without reading its records."""
+        raise NotImplementedError
+
+    def put(self, coll: Collection, record: Record) -> None:
+        """Insert `record`, replacing any record with the same key.
+
+        Raises ConflictError if another record holds one of its unique values.
+        """
+        raise NotImplementedError
+
+    def update(self, coll: Collection, key: Key, fn: Callable[[Record], Record]) -> Optional[Record]:
+        """Atomically replace the record at `key` with `fn(record)`.
+
+        Returns the new record, or None if no record has that key.
+        """
+        raise NotImplementedError
+
+    def delete(self, coll: Collection, key: Key) -> bool:
+        """Remove the record with primary key `key`; return whether it existed."""
+        raise NotImplementedError
+
+    def delete_where(self, coll: Collection, field: str, values: Iterable[Any]) -> int:
+        """Remove every record whose `field` is one of `values`; return how many.
+
+        Engines override this to remove them in a single write.
+        """
+        removed = 0
+        for value in dict.fromkeys(values):
+            for rec in self.find(coll, field, value):
+                removed += self.delete(coll, coll.key_of(rec))
+        return removed
+
+    def page(
+        self,
+        coll: Collection,
+        limit: int,
+        after: Optional[Key] = None,
+        where: Optional[Dict[str, Any]] = None,
+        keys: Optional[Iterable[Key]] = None,
+        predicate: Optional[Callable[[Record], bool]] = None,
+    ) -> Tuple[List[Record], Optional[Key]]:
+        """Return up to `limit` matching records in primary-key order, starting
+        after key `after`, and the key to resume from (None on the last page).
+
+        Records match when every `where` field equals its value, their key is
+        in `keys` (if given) and `predicate` accepts them. Candidates come
+        from `keys`, else an indexed `where` field, else the key order, and
+        are only read until the page is full.
+        """
+        where = dict(where or {})
+        if keys is not None:
+            wanted = sorted({key for key in keys if after is None or key > after})
+            candidates: Iterable[Record] = (rec for rec in self.get_many(coll, wanted) if rec is not None)
+        else:
+            indexed = next((field for field in where if field in coll.indexes), None)
+            if indexed is not None:
+                found = [rec for rec in self.find(coll, indexed, where.pop(indexed)) if coll.key_of(rec) is not None]
+                candidates = sorted(
+                    (rec for rec in found if after is None or coll.key_of(rec) > after),
+                    key=coll.key_of,
+                )
+            else:
+                candidates = self._ordered(coll, after)
+        records: List[Record] = []
+        for rec in candidates:
+            if all(rec.get(field) == value for field, value in where.items()) and (predicate is None or predicate(rec)):
+                records.append(rec)
+                # One extra record tells whether another page exists
+                if len(records) > limit:
+                    return records[:limit], coll.key_of(records[limit - 1])
+        return records, None
+
+    def _ordered(self, coll: Collection, after: Optional[Key]) -> Iterable[Record]:
+        # Records with a key greater than `after`, in key order
+        records = [rec for rec in self.all(coll) if coll.key_of(rec) is not None]
+        return sorted(
+            (rec for rec in records if after is None or coll.key_of(rec) > after),
+            key=coll.key_of,
+        )
+
+    def replace_all(self, coll: Collection, records: List[Record]) -> None:
+        """Replace the whole collection with `records`."""
+        raise NotImplementedError
+
+    def compact(self, coll: Collection) -> None:
+        """Reclaim space held by superseded records (no-op by default)."""
+        return None
+
+    def read_view(self, coll: Collection, name: str, fn: Callable[[View], Any]) -> Any:
+        """Return `fn(view)` for the up-to-date view `name` of `coll`.
+
+        `fn` runs while the view cannot change, so it should copy out what it
+        needs rather than keep references to the view's state.
+        """
+        raise NotImplementedError
+
+    def transaction(self, *collections: Collection):
+        """Context manager yielding a batch over `collections`.
+
+        The batch offers all, get, get_many, find, put, update, delete and
+        delete_where; its reads see its own pending writes. Everything is
+        committed when the block exits, or discarded if it raises. Other
+        writers to these collections wait until then, so do not write them
+        through the engine itself inside the block.
+        """
+        raise NotImplementedError
+
+
+# ---------------------------------------------------------------------------
+# JSON files
+# ---------------------------------------------------------------------------
+
+
+def _hashable(value: Any) -> Any:
+    # Index bucket for a field value; lists/objects are bucketed by their JSON
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return json.dumps(value, sort_keys=True)
+
+
+class _FieldIndex(View):
+    """Secondary index of a journal collection: field value -> keys.
+
+    Keys are kept in an insertion-ordered dict so each bucket lists records
+    in the same order as the replayed state (an upsert moves to the end).
+    """
+
+    def __init__(self, coll: Collection, field: str) -> None:
+        self.coll = coll
+        self.field = field
+        self.buckets: Dict[Any, Dict[Key, None]] = {}
+
+    def apply(self, old: Optional[Record], new: Optional[Record]) -> None:
+        if old is not None:
+            value = _hashable(old.get(self.field))
+            bucket = self.buckets.get(value)
+            if bucket is not None:
+                bucket.pop(self.coll.key_of(old), None)
+                if not bucket:
+                    del self.buckets[value]
+        if new is not None:
+            self.buckets.setdefault(_hashable(new.get(self.field)), {})[self.coll.key_of(new)] = None
+
+
+class JsonEngine(StorageEngine):
+    """Engine over the MVP JSON files in backend/data/."""
+
+    def __init__(self) -> None:
+        # Journal replay memo: name -> (snapshot, journal, entries applied, state, views)
+        self._journal_lock = threading.Lock()
+        self._journal_state: Dict[str, Tuple[Any, Any, int, Dict[Key, Record], Dict[Any, View]]] = {}
+        # Views of list/map collections: name -> (document, views), rebuilt when the document changes
+        self._doc_views: Dict[str, Tuple[Any, Dict[str, View]]] = {}
+        # Primary-key index memo for list collections: name -> (document, key -> position)
+        self._index_lock = threading.Lock()
+        self._key_indexes: Dict[str, Tuple[Sequence[Record], Dict[Key, int]]] = {}
+        # Unique index memo: (name, field) -> (document, folded value -> key)
+        self._unique_indexes: Dict[Tuple[str, str], Tuple[Any, Dict[Any, Key]]] = {}
+        # Secondary index memo for list/map collections:
+        # (name, field) -> (document, records, value -> positions). Journal
+        # collections keep theirs as views, maintained during replay.
+        self._field_indexes: Dict[Tuple[str, str], Tuple[Any, Sequence[Record], Dict[Any, List[int]]]] = {}
+        # Key order memo for paging list/map collections: name -> (document, sorted keys, key -> record)
+        self._key_orders: Dict[str, Tuple[Any, List[Key], Dict[Key, Record]]] = {}
+
+    # Layout helpers
+
+    @staticmethod
+    def _empty(coll: Collection) -> Callable[[], Any]:
+        return dict if coll.layout == 'map' else list
+
+    def _records(self, coll: Collection) -> List[Record]:
+        if coll.layout == 'journal':
+            return list(self._journal_records(coll).values())
+        if coll.layout == 'map':
+            return list((read_json(coll.filename, default_factory=dict) or {}).values())
+        return list(self._list_doc(coll))
+
+    def _list_doc(self, coll: Collection) -> Sequence[Record]:
+        data = read_json(coll.filename, default_factory=list)
+        if isinstance(data, dict):  # if someone stored an object accidentally
+            return [{coll.legacy_field: k, **(v or {})} for k, v in data.items()]
+        return data or _NO_RECORDS
+
+    def _key_index(self, coll: Collection) -> Tuple[Sequence[Record], Dict[Key, int]]:
+        """Return (records, key -> position) for a list collection.
+
+        The index is rebuilt lazily whenever the cached document changes.
+        Records without a key are first migrated through the collection's
+        normalize hook and persisted, so every record is reachable by key.
+        """
+        records = self._list_doc(coll)
+        with self._index_lock:
+            memo = self._key_indexes.get(coll.name)
+            if memo is not None and memo[0] is records:
+                return memo
+        if coll.normalize is not None and any(coll.key_of(rec) is None for rec in records):
+            self._migrate_keys(coll)
+            records = self._list_doc(coll)
+        index: Dict[Key, int] = {}
+        for pos, rec in enumerate(records):
+            # First record wins, as a linear scan would
+            index.setdefault(coll.key_of(rec), pos)
+        with self._index_lock:
+            self._key_indexes[coll.name] = (records, index)
+        return records, index
+
+    def _migrate_keys(self, coll: Collection) -> None:
+        def apply(data: Any) -> None:
+            if not isinstance(data, list):
+                return
+            for idx, rec in enumerate(data):
+                if coll.key_of(rec) is None:
+                    data[idx] = coll.normalize(dict(rec), idx)
+
+        mutate_json(coll.filename, apply, default_factory=list)
+
+    def _unique_index(self, coll: Collection, field: str) -> Dict[Any, Key]:
+        """Return folded value -> key for a unique field of `coll`.
+
+        Memoized on the cached document; a write replaces that document, so
+        the index is rebuilt on the first probe after it.
+        """
+        if coll.layout == 'map':
+            doc: Any = read_json(coll.filename, default_factory=dict) or {}
+            records: Iterable[Record] = doc.values()
+        else:
+            doc = records = self._list_doc(coll)
+        memo_key = (coll.name, field)
+        with self._index_lock:
+            memo = self._unique_indexes.get(memo_key)
+            if memo is not None and memo[0] is doc:
+                return memo[1]
+        index: Dict[Any, Key] = {}
+        for rec in records:
+            folded = fold_value(rec.get(field))
+            if folded is not None:
+                index.setdefault(folded, coll.key_of(rec))
+        with self._index_lock:
+            self._unique_indexes[memo_key] = (doc, index)
+        return index
+
+    def _field_index(self, coll: Collection, field: str) -> Tuple[Sequence[Record], Dict[Any, List[int]]]:
+        """Return (records, value -> positions) for an indexed field of a
+        list or map collection, rebuilt when the cached document changes."""
+        doc: Any = (read_json(coll.filename, default_factory=dict) or {}) if coll.layout == 'map' else self._list_doc(coll)
+        memo_key = (coll.name, field)
+        with self._index_lock:
+            memo = self._field_indexes.get(memo_key)
+            if memo is not None and memo[0] is doc:
+                return memo[1], memo[2]
+        records = list(doc.values()) if coll.layout == 'map' else doc
+        index: Dict[Any, List[int]] = {}
+        for pos, rec in enumerate(records):
+            index.setdefault(_hashable(rec.get(field)), []).append(pos)
+        with self._index_lock:
+            self._field_indexes[memo_key] = (doc, records, index)
+        return records, index
+
+    def _key_order(self, coll: Collection) -> Tuple[List[Key], Dict[Key, Record]]:
+        """Return (sorted keys, key -> record) for a list or map collection,
+        rebuilt when the cached document changes."""
+        doc: Any = (read_json(coll.filename, default_factory=dict) or {}) if coll.layout == 'map' else self._key_index(coll)[0]
+        with self._index_lock:
+            memo = self._key_orders.get(coll.name)
+            if memo is not None and memo[0] is doc:
+                return memo[1], memo[2]
+        by_key: Dict[Key, Record] = {}
+        for rec in (doc.values() if coll.layout == 'map' else doc):
+            key = coll.key_of(rec)
+            if key is not None:
+                by_key.setdefault(key, rec)
+        ordered = sorted(by_key)
+        with self._index_lock:
+            self._key_orders[coll.name] = (doc, ordered, by_key)
+        return ordered, by_key
+
+    def _journal_views(self, coll: Collection, records: Iterable[Record]) -> Dict[Any, View]:
+        # Declared views plus one ('index', field) view per indexed field
+        indexes = {('index', field): _FieldIndex(coll, field) for field in coll.indexes}
+        return _build_views(coll, records, indexes)
+
+    def _journal_records(self, coll: Collection) -> Dict[Key, Record]:
+        """Rebuild last-writer-wins state from snapshot + journal.
+
+        Only journal entries appended since the previous call are replayed
+        while the snapshot and journal are otherwise unchanged. The journal
+        is read before the snapshot: compaction writes the snapshot before
+        resetting the journal, so this order never misses entries, and
+        replaying entries already folded into the snapshot is idempotent.
+
+        Views are updated with each replayed entry, so writes from other
+        processes reach them too; a new snapshot or journal rebuilds them.
+        """
+        journal = read_jsonl(coll.journal)
+        snapshot = read_json(coll.filename, default_factory=list) or _NO_RECORDS
+        with self._journal_lock:
+            cached = self._journal_state.get(coll.name)
+            if cached is not None and cached[0] is snapshot and cached[1] is journal:
+                # State is private to the engine; callers only take snapshots of it
+                _, _, applied, state, views = cached
+                if applied == len(journal):
+                    return state
+            else:
+                applied = 0
+                state = {}
+                for rec in snapshot:
+                    key = coll.key_of(rec)
+                    state.pop(key, None)
+                    state[key] = rec
+                views = None
+            entries = journal[applied:]
+            if views is None:
+                # Full rebuild: replay first, then build views from the final state
+                self._replay(coll, state, entries, {})
+                views = self._journal_views(coll, state.values())
+            else:
+                self._replay(coll, state, entries, views)
+            self._journal_state[coll.name] = (snapshot, journal, len(journal), state, views)
+            return state
+
+    @staticmethod
+    def _replay(coll: Collection, state: Dict[Key, Record], entries: List[Record], views: Dict[Any, View]) -> None:
+        for entry in entries:
+            # Last writer wins per key; an upsert moves the record to the end
+            key = coll.key_of(entry)
+            old = state.pop(key, None)
+            new = entry['record'] if entry.get('op') == 'put' else None
+            if new is not None:
+                state[key] = new
+            if old is not None or new is not None:
+                for view in views.values():
+                    view.apply(old, new)
+
+    @staticmethod
+    def _stripe(coll: Collection, key: Key):
+        # Journal writers lock the stripe of their first key field (e.g. meetingId),
+        # so writes for different keys append in parallel while compaction excludes all
+        return file_lock(coll.journal, stripe_key=key[0] if isinstance(key, tuple) else key)
+
+    @staticmethod
+    def _entry(coll: Collection, op: str, key: Key, record: Optional[Record] = None) -> Record:
+        values = key if isinstance(key, tuple) else (key,)
+        entry: Record = {'op': op, **dict(zip(coll.key, values))}
+        if record is not None:
+            entry['record'] = record
+        return entry
+
+    def _append(self, coll: Collection, op: str, key: Key, record: Optional[Record] = None) -> None:
+        append_jsonl(coll.journal, self._entry(coll, op, key, record))
+
+    def _maybe_compact(self, coll: Collection) -> None:
+        if len(read_jsonl(coll.journal)) >= JOURNAL_COMPACT_THRESHOLD:
+            with file_lock(coll.journal):
+                # Another writer may have compacted while we waited
+                if len(read_jsonl(coll.journal)) >= JOURNAL_COMPACT_THRESHOLD:
+                    self._fold(coll)
+
+    def _fold(self, coll: Collection) -> None:
+        # Caller holds the journal's exclusive lock
+        write_json(coll.filename, self._records(coll))
+        reset_jsonl(coll.journal)
+
+    # In-place changes to a private list/map document (mutate_json or a transaction)
+
+    @staticmethod
+    def _check_unique(coll: Collection, data: Any, record: Record, previous: Optional[Record]) -> None:
+        # Runs under the document's write lock, so no other writer can slip in
+        changed = [
+            f for f in coll.unique
+            if fold_value(record.get(f)) is not None
+            and (previous is None or fold_value(previous.get(f)) != fold_value(record.get(f)))
+        ]
+        if not changed:
+            return
+        key = coll.key_of(record)
+        for rec in (data.values() if coll.layout == 'map' else data):
+            for field in changed:
+                if fold_value(rec.get(field)) == fold_value(record.get(field)) and coll.key_of(rec) != key:
+                    raise unique_conflict(coll, field)
+
+    @staticmethod
+    def _doc_put(coll: Collection, data: Any, record: Record) -> None:
+        key = coll.key_of(record)
+        if coll.layout == 'map':
+            JsonEngine._check_unique(coll, data, record, data.get(key))
+            data[key] = record
+            return
+        for idx, rec in enumerate(data):
+            if coll.key_of(rec) == key:
+                JsonEngine._check_unique(coll, data, record, rec)
+                data[idx] = record
+                return
+        JsonEngine._check_unique(coll, data, record, None)
+        data.append(record)
+
+    @staticmethod
+    def _doc_update(coll: Collection, data: Any, key: Key, fn: Callable[[Record], Record]) -> Optional[Record]:
+        if coll.layout == 'map':
+            if key not in data:
+                return None
+            # Copy first: `fn` may change the record in place
+            previous = dict(data[key])
+            updated = fn(data[key])
+            JsonEngine._check_unique(coll, data, updated, previous)
+            data[key] = updated
+            return updated
+        for idx, rec in enumerate(data):
+            if coll.key_of(rec) == key:
+                previous = dict(rec)
+                updated = fn(rec)
+                JsonEngine._check_unique(coll, data, updated, previous)
+                data[idx] = updated
+                return updated
+        return None
+
+    @staticmethod
+    def _doc_delete(coll: Collection, data: Any, key: Key) -> bool:
+        if coll.layout == 'map':
+            return data.pop(key, None) is not None
+        kept = [rec for rec in data if coll.key_of(rec) != key]
+        removed = len(kept) != len(data)
+        data[:] = kept
+        return removed
+
+    @staticmethod
+    def _doc_delete_where(coll: Collection, data: Any, field: str, values: Iterable[Any]) -> int:
+        wanted = {_hashable(value) for value in values}
+        if coll.layout == 'map':
+            doomed = [key for key, rec in data.items() if _hashable(rec.get(field)) in wanted]
+            for key in doomed:
+                del data[key]
+            return len(doomed)
+        kept = [rec for rec in data if _hashable(rec.get(field)) not in wanted]
+        removed = len(data) - len(kept)
+        data[:] = kept
+        return removed
+
+    # StorageEngine
+
+    def all(self, coll: Collection) -> List[Record]:
+        return self._records(coll)
+
+    def get(self, coll: Collection, key: Key) -> Optional[Record]:
+        if coll.layout == 'journal':
+            return self._journal_records(coll).get(key)
+        if coll.layout == 'map':
+            return (read_json(coll.filename, default_factory=dict) or {}).get(key)
+        records, index = self._key_index(coll)
+        pos = index.get(key)
+        return records[pos] if pos is not None else None
+
+    def get_many(self, coll: Collection, keys: Iterable[Key]) -> List[Optional[Record]]:
+        # One document read and one index for the whole batch
+        if coll.layout == 'journal':
+            state = self._journal_records(coll)
+            return [state.get(key) for key in keys]
+        if coll.layout == 'map':
+            doc = read_json(coll.filename, default_factory=dict) or {}
+            return [doc.get(key) for key in keys]
+        records, index = self._key_index(coll)
+        return [records[index[key]] if key in index else None for key in keys]
+
+    def find(self, coll: Collection, field: str, value: Any) -> List[Record]:
+        if field not in coll.indexes:
+            return [rec for rec in self._records(coll) if rec.get(field) == value]
+        if coll.layout == 'journal':
+            self._journal_records(coll)
+            with self._journal_lock:
+                _, _, _, state, views = self._journal_state[coll.name]
+                return [state[key] for key in views[('index', field)].buckets.get(_hashable(value), ())]
+        records, index = self._field_index(coll, field)
+        return [records[pos] for pos in index.get(_hashable(value), ())]
+
+    def lookup(self, coll: Collection, field: str, value: Any) -> Optional[Record]:
+        if field not in coll.unique:
+            raise ValueError(f"{coll.name}.{field} has no unique index")
+        folded = fold_value(value)
+        if folded is None:
+            return None
+        key = self._unique_index(coll, field).get(folded)
+        rec = self.get(coll, key) if key is not None else None
+        # The index may predate a concurrent write; confirm against the record
+        return rec if rec is not None and fold_value(rec.get(field)) == folded else None
+
+    def version(self, coll: Collection) -> Version:
+        # One stat per file: the snapshot plus, for journals, the journal
+        files = [coll.filename, coll.journal] if coll.layout == 'journal' else [coll.filename]
+        generations = [generation(name) for name in files]
+        stamps = [gen.stamp for gen in generations]
+        modified = max((stamp[1] for stamp in stamps if stamp is not None), default=None)
+        return Version(
+            tuple(stamps),
+            sum(gen.counter for gen in generations),
+            modified / 1e9 if modified is not None else None,
+        )
+
+    def put(self, coll: Collection, record: Record) -> None:
+        key = coll.key_of(record)
+        if coll.layout == 'journal':
+            with self._stripe(coll, key):
+                self._append(coll, 'put', key, record)
+            self._maybe_compact(coll)
+            return
+
+        mutate_json(coll.filename, lambda data: self._doc_put(coll, data, record), default_factory=self._empty(coll))
+
+    def update(self, coll: Collection, key: Key, fn: Callable[[Record], Record]) -> Optional[Record]:
+        if coll.layout == 'journal':
+            with self._stripe(coll, key):
+                current = self.get(coll, key)
+                if current is None:
+                    return None
+                updated = fn(dict(current))
+                self._append(coll, 'put', key, updated)
+            self._maybe_compact(coll)
+            return updated
+        if self.get(coll, key) is None:
+            return None
+        return mutate_json(coll.filename, lambda data: self._doc_update(coll, data, key, fn), default_factory=self._empty(coll))
+
+    def delete(self, coll: Collection, key: Key) -> bool:
+        if coll.layout == 'journal':
+            with self._stripe(coll, key):
+                if self.get(coll, key) is None:
+                    return False
+                self._append(coll, 'del', key)
+            self._maybe_compact(coll)
+            return True
+        if self.get(coll, key) is None:
+            return False
+        return mutate_json(coll.filename, lambda data: self._doc_delete(coll, data, key), default_factory=self._empty(coll))
+
+    def delete_where(self, coll: Collection, field: str, values: Iterable[Any]) -> int:
+        values = list(dict.fromkeys(values))
+        if coll.layout == 'journal':
+            # Exclusive lock: no stripe writer can add a matching record meanwhile
+            with file_lock(coll.journal):
+                keys = [coll.key_of(rec) for value in values for rec in self.find(coll, field, value)]
+                # All tombstones go out in one append and fsync
+                append_jsonl(coll.journal, *(self._entry(coll, 'del', key) for key in keys))
+            self._maybe_compact(coll)
+            return len(keys)
+        if not any(self.find(coll, field, value) for value in values):
+            return 0
+        return mutate_json(
+            coll.filename,
+            lambda data: self._doc_delete_where(coll, data, field, values),
+            default_factory=self._empty(coll),
+        )
+
+    def _ordered(self, coll: Collection, after: Optional[Key]) -> Iterable[Record]:
+        if coll.layout == 'journal':
+            return super()._ordered(coll, after)
+        ordered, by_key = self._key_order(coll)
+        start = bisect_right(ordered, after) if after is not None else 0
+        return (by_key[ordered[pos]] for pos in range(start, len(ordered)))
+
+    def replace_all(self, coll: Collection, records: List[Record]) -> None:
+        if coll.layout == 'map':
+            write_json(coll.filename, {coll.key_of(rec): rec for rec in records})
+            return
+        if coll.layout == 'journal':
+            with file_lock(coll.journal):
+                write_json(coll.filename, list(records))
+                reset_jsonl(coll.journal)
+            return
+        write_json(coll.filename, list(records))
+
+    def compact(self, coll: Collection) -> None:
+        """Fold the journal into the snapshot and start a fresh journal.
+
+        Replaying a journal over a snapshot that already contains it is
+        idempotent, so a crash between the two steps loses nothing.
+        """
+        if coll.layout != 'journal':
+            return
+        with file_lock(coll.journal):
+            self._fold(coll)
+
+    def read_view(self, coll: Collection, name: str, fn: Callable[[View], Any]) -> Any:
+        if coll.layout == 'journal':
+            self._journal_records(coll)
+            with self._journal_lock:
+                return fn(self._journal_state[coll.name][4][name])
+        doc = read_json(coll.filename, default_factory=self._empty(coll))
+        with self._index_lock:
+            memo = self._doc_views.get(coll.name)
+            if memo is None or memo[0] is not doc:
+                memo = self._doc_views[coll.name] = (doc, _build_views(coll, self._records(coll)))
+            return fn(memo[1][name])
+
+    @contextmanager
+    def transaction(self, *collections: Collection):
+        for coll in collections:
+            if coll.layout == 'list':
+                # Migrate records without a key now; the files are locked below
+                self._key_index(coll)
+        files = [coll.journal if coll.layout == 'journal' else coll.filename for coll in collections]
+        # The journal's exclusive lock also keeps compaction off the snapshot
+        with unit_of_work(*files) as uow:
+            yield _JsonBatch(self, uow, collections)
+        for coll in collections:
+            if coll.layout == 'journal':
+                self._maybe_compact(coll)
+
+
+class _JsonBatch:
+    """Pending writes of a JsonEngine transaction.
+
+    List and map documents are private copies held by the unit of work;
+    journal writes are kept in an overlay (key -> record, None when
+    deleted) over the engine's replayed state and appended at commit.
+    """
+
+    def __init__(self, engine: JsonEngine, uow: Any, collections: Sequence[Collection]) -> None:
+        self._engine = engine
+        self._uow = uow
+        self._names = {coll.name for coll in collections}
+        self._overlays: Dict[str, Dict[Key, Optional[Record]]] = {}
+
+    def _doc(self, coll: Collection) -> Any:
+        if coll.name not in self._names:
+            raise ValueError(f"{coll.name} is not part of this transaction")
+        return self._uow.load(coll.filename, JsonEngine._empty(coll))
+
+    def _overlay(self, coll: Collection) -> Dict[Key, Optional[Record]]:
+        if coll.name not in self._names:
+            raise ValueError(f"{coll.name} is not part of this transaction")
+        return self._overlays.setdefault(coll.name, {})
+
+    def _journal_put(self, coll: Collection, key: Key, record: Optional[Record]) -> None:
+        overlay = self._overlay(coll)
+        overlay.pop(key, None)
+        overlay[key] = record
+        op = 'put' if record is not None else 'del'
+        self._uow.append(coll.journal, JsonEngine._entry(coll, op, key, record))
+
+    def all(self, coll: Collection) -> List[Record]:
+        if coll.layout == 'journal':
+            overlay = self._overlay(coll)
+            state = self._engine._journal_records(coll)
+            merged = [rec for key, rec in state.items() if key not in overlay]
+            return merged + [rec for rec in overlay.values() if rec is not None]
+        data = self._doc(coll)
+        return list(data.values()) if coll.layout == 'map' else list(data)
+
+    def get(self, coll: Collection, key: Key) -> Optional[Record]:
+        if coll.layout == 'journal':
+            overlay = self._overlay(coll)
+            return overlay[key] if key in overlay else self._engine.get(coll, key)
+        data = self._doc(coll)
+        if coll.layout == 'map':
+            return data.get(key)
+        return next((rec for rec in data if coll.key_of(rec) == key), None)
+
+    def get_many(self, coll: Collection, keys: Iterable[Key]) -> List[Optional[Record]]:
+        if coll.layout == 'list':
+            by_key: Dict[Key, Record] = {}
+            for rec in self._doc(coll):
+                by_key.setdefault(coll.key_of(rec), rec)
+            return [by_key.get(key) for key in keys]
+        return [self.get(coll, key) for key in keys]
+
+    def find(self, coll: Collection, field: str, value: Any) -> List[Record]:
+        if coll.layout == 'journal':
+            overlay = self._overlay(coll)
+            found = [rec for rec in self._engine.find(coll, field, value) if coll.key_of(rec) not in overlay]
+            return found + [rec for rec in overlay.values() if rec is not None and rec.get(field) == value]
+        return [rec for rec in self.all(coll) if rec.get(field) == value]
+
+    def put(self, coll: Collection, record: Record) -> None:
+        if coll.layout == 'journal':
+            self._journal_put(coll, coll.key_of(record), record)
+            return
+        data = self._doc(coll)
+        JsonEngine._doc_put(coll, data, record)
+        self._uow.stage(coll.filename, data)
+
+    def update(self, coll: Collection, key: Key, fn: Callable[[Record], Record]) -> Optional[Record]:
+        if coll.layout == 'journal':
+            current = self.get(coll, key)
+            if current is None:
+                return None
+            updated = fn(dict(current))
+            self._journal_put(coll, key, updated)
+            return updated
+        data = self._doc(coll)
+        updated = JsonEngine._doc_update(coll, data, key, fn)
+        if updated is not None:
+            self._uow.stage(coll.filename, data)
+        return updated
+
+    def delete(self, coll: Collection, key: Key) -> bool:
+        if coll.layout == 'journal':
+            if self.get(coll, key) is None:
+                return False
+            self._journal_put(coll, key, None)
+            return True
+        data = self._doc(coll)
+        removed = JsonEngine._doc_delete(coll, data, key)
+        if removed:
+            self._uow.stage(coll.filename, data)
+        return removed
+
+    def delete_where(self, coll: Collection, field: str, values: Iterable[Any]) -> int:
+        values = list(dict.fromkeys(values))
+        if coll.layout == 'journal':
+            keys = [coll.key_of(rec) for value in values for rec in self.find(coll, field, value)]
+            for key in keys:
+                self._journal_put(coll, key, None)
+            return len(keys)
+        data = self._doc(coll)
+        removed = JsonEngine._doc_delete_where(coll, data, field, values)
+        if removed:
+            self._uow.stage(coll.filename, data)
+        return removed
+
+
+# ---------------------------------------------------------------------------
+# SQLite
+# ---------------------------------------------------------------------------
+
+
+class SqliteEngine(StorageEngine):
+    """Engine storing each collection in an indexed sqlite3 table.
+
+    Tables hold the record as a JSON document plus one column per key or
+    indexed field and one folded, UNIQUE-indexed `u_` column per unique field; `seq`
+    preserves insertion order. Columns added to a collection later are
+    created and backfilled from the stored documents on first use. Connections are
+    per-thread and run in WAL mode. All statements are parameterized so
+    sqlite3's statement cache reuses the prepared forms.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._ready: set = set()
+        # Views: name -> (collection version, views). Writes with views bump the
+        # version in _versions; our own writes advance the views in place and
+        # any other version (another process, replace_all) triggers a rebuild.
+        self._views_lock = threading.Lock()
+        self._views: Dict[str, Tuple[int, Dict[str, View]]] = {}
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, isolation_level=None, cached_statements=256)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=5000')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _ident(value: str) -> str:
+        # Table/column names are interpolated into SQL, so only allow plain identifiers
+        if not value or not value.replace('_', '').isalnum():
+            raise ValueError(f"Invalid identifier: {value}")
+        return value
+
+    @classmethod
+    def _column(cls, field: str) -> str:
+        return f"f_{cls._ident(field)}"
+
+    @classmethod
+    def _unique_column(cls, field: str) -> str:
+        return f"u_{cls._ident(field)}"
+
+    def _fields(self, coll: Collection) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(coll.key + coll.indexes))
+
+    def _columns(self, coll: Collection) -> List[str]:
+        return (
+            [self._column(f) for f in self._fields(coll)]
+            + [self._unique_column(f) for f in coll.unique]
+        )
+
+    def _table(self, coll: Collection) -> str:
+        if coll.name not in self._ready:
+            with self._schema_lock:
+                if coll.name not in self._ready:
+                    self._create(coll)
+                    self._ready.add(coll.name)
+        return coll.name
+
+    def _create(self, coll: Collection) -> None:
+        conn = self._conn()
+        name = self._ident(coll.name)
+        wanted = self._columns(coll)
+        columns = ', '.join(f"{column} TEXT" for column in wanted)
+        key_columns = ', '.join(self._column(f) for f in coll.key)
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} ("
+            f"seq INTEGER PRIMARY KEY AUTOINCREMENT, {columns}, doc TEXT NOT NULL)"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS _versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({name})")}
+        missing = [column for column in wanted if column not in existing]
+        if missing:
+            self._add_columns(conn, coll, missing)
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {name}_pk ON {name} ({key_columns})")
+        unique_columns = {self._unique_column(f) for f in coll.unique}
+        # index name -> 1 if UNIQUE; tables from before unique enforcement have plain u_ indexes
+        indexes = {row[1]: row[2] for row in conn.execute(f"PRAGMA index_list({name})")}
+        for column in wanted:
+            if column in (self._column(f) for f in coll.key):
+                continue
+            if column in unique_columns:
+                self._create_unique_index(conn, name, column, indexes.get(f"{name}_{column}"))
+            else:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name}_{column} ON {name} ({column})")
+
+    @staticmethod
+    def _create_unique_index(conn: sqlite3.Connection, name: str, column: str, existing: Optional[int]) -> None:
+        index = f"{name}_{column}"
+        if existing == 1:
+            return
+        if existing is not None:
+            conn.execute(f"DROP INDEX {index}")
+        try:
+            conn.execute(f"CREATE UNIQUE INDEX {index} ON {name} ({column})")
+        except sqlite3.IntegrityError:
+            # Duplicates written before enforcement: keep lookups fast and leave the cleanup to an operator
+            logger.warning(
+                "%s.%s has duplicate values; uniqueness is not enforced until they are resolved", name, column
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {name} ({column})")
+
+    def _conflict(self, coll: Collection, error: sqlite3.IntegrityError) -> BaseException:
+        # sqlite names the violated columns: "UNIQUE constraint failed: members.u_email"
+        for field in coll.unique:
+            if f"{coll.name}.{self._unique_column(field)}" in str(error):
+                return unique_conflict(coll, field)
+        return error
+
+    def _add_columns(self, conn: sqlite3.Connection, coll: Collection, missing: List[str]) -> None:
+        # Tables created before a field was indexed: add the columns and backfill from the documents
+        name = self._ident(coll.name)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for column in missing:
+                conn.execute(f"ALTER TABLE {name} ADD COLUMN {column} TEXT")
+            assignments = ', '.join(f"{column} = ?" for column in self._columns(coll))
+            rows = conn.execute(f"SELECT seq, doc FROM {name}").fetchall()
+            for seq, doc in rows:
+                values = self._row(coll, json.loads(doc))[:-1]
+                conn.execute(f"UPDATE {name} SET {assignments} WHERE seq = ?", values + [seq])
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    @staticmethod
+    def _value(value: Any) -> Optional[str]:
+        if value is None or isinstance(value, str):
+            return value
+        return json.dumps(value, sort_keys=True)
+
+    def _row(self, coll: Collection, record: Record) -> List[Optional[str]]:
+        values = [self._value(record.get(f)) for f in self._fields(coll)]
+        values.extend(self._value(fold_value(record.get(f))) for f in coll.unique)
+        values.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+        return values
+
+    def _key_clause(self, coll: Collection, key: Key) -> Tuple[str, List[Optional[str]]]:
+        values = key if isinstance(key, tuple) else (key,)
+        clause = ' AND '.join(f"{self._column(f)} IS ?" for f in coll.key)
+        return clause, [self._value(v) for v in values]
+
+    def _insert(self, conn: sqlite3.Connection, coll: Collection, record: Record) -> None:
+        table = self._table(coll)
+        columns = self._columns(coll) + ['doc']
+        placeholders = ', '.join('?' for _ in columns)
+        try:
+            conn.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", self._row(coll, record))
+        except sqlite3.IntegrityError as e:
+            raise self._conflict(coll, e) from e
+
+    def _rewrite(self, conn: sqlite3.Connection, coll: Collection, key: Key, record: Record) -> int:
+        table = self._table(coll)
+        assignments = ', '.join(f"{column} = ?" for column in self._columns(coll))
+        clause, params = self._key_clause(coll, key)
+        try:
+            cursor = conn.execute(
+                f"UPDATE {table} SET {assignments}, doc = ? WHERE {clause}",
+                self._row(coll, record) + params,
+            )
+        except sqlite3.IntegrityError as e:
+            raise self._conflict(coll, e) from e
+        return cursor.rowcount
+
+    def all(self, coll: Collection) -> List[Record]:
+        table = self._table(coll)
+        rows = self._conn().execute(f"SELECT doc FROM {table} ORDER BY seq").fetchall()
+        return [json.loads(doc) for (doc,) in rows]
+
+    def get(self, coll: Collection, key: Key) -> Optional[Record]:
+        return self._select(self._conn(), coll, key)
+
+    def get_many(self, coll: Collection, keys: Iterable[Key]) -> List[Optional[Record]]:
+        keys = list(keys)
+        if len(coll.key) != 1:
+            return super().get_many(coll, keys)
+        table = self._table(coll)
+        column = self._column(coll.key[0])
+        found: Dict[Any, Record] = {}
+        unique = list(dict.fromkeys(keys))
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            placeholders = ', '.join('?' for _ in chunk)
+            rows = self._conn().execute(
+                f"SELECT doc FROM {table} WHERE {column} IN ({placeholders})",
+                [self._value(key) for key in chunk],
+            ).fetchall()
+            for (doc,) in rows:
+                rec = json.loads(doc)
+                found[coll.key_of(rec)] = rec
+        return [found.get(key) for key in keys]
+
+    def find(self, coll: Collection, field: str, value: Any) -> List[Record]:
+        if field not in self._fields(coll):
+            return [rec for rec in self.all(coll) if rec.get(field) == value]
+        table = self._table(coll)
+        rows = self._conn().execute(
+            f"SELECT doc FROM {table} WHERE {self._column(field)} IS ? ORDER BY seq",
+            (self._value(value),),
+        ).fetchall()
+        return [json.loads(doc) for (doc,) in rows]
+
+    def lookup(self, coll: Collection, field: str, value: Any) -> Optional[Record]:
+        if field not in coll.unique:
+            raise ValueError(f"{coll.name}.{field} has no unique index")
+        folded = fold_value(value)
+        if folded is None:
+            return None
+        table = self._table(coll)
+        row = self._conn().execute(
+            f"SELECT doc FROM {table} WHERE {self._unique_column(field)} = ? ORDER BY seq LIMIT 1",
+            (self._value(folded),),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def version(self, coll: Collection) -> Version:
+        self._table(coll)
+        version = self._version(self._conn(), coll)
+        # The database (and its WAL) changes as a whole; their mtime bounds the collection's
+        mtimes = []
+        for path in (self.path, self.path + '-wal'):
+            try:
+                mtimes.append(os.stat(path).st_mtime)
+            except FileNotFoundError:
+                pass
+        return Version((version,), version, max(mtimes, default=None))
+
+    def _ordered(self, coll: Collection, after: Optional[Key]) -> Iterable[Record]:
+        if len(coll.key) != 1:
+            return super()._ordered(coll, after)
+        table = self._table(coll)
+        column = self._column(coll.key[0])
+
+        def rows() -> Iterable[Record]:
+            # Walk the primary-key index in chunks, so a page reads about what it returns
+            last = self._value(after)
+            while True:
+                if last is None:
+                    batch = self._conn().execute(
+                        f"SELECT doc, {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY {column} LIMIT 256"
+                    ).fetchall()
+                else:
+                    batch = self._conn().execute(
+                        f"SELECT doc, {column} FROM {table} WHERE {column} > ? ORDER BY {column} LIMIT 256",
+                        (last,),
+                    ).fetchall()
+                for doc, _ in batch:
+                    yield json.loads(doc)
+                if len(batch) < 256:
+                    return
+                last = batch[-1][1]
+
+        return rows()
+
+    def _select(self, conn: sqlite3.Connection, coll: Collection, key: Key) -> Optional[Record]:
+        clause, params = self._key_clause(coll, key)
+        row = conn.execute(f"SELECT doc FROM {self._table(coll)} WHERE {clause}", params).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @staticmethod
+    def _version(conn: sqlite3.Connection, coll: Collection) -> int:
+        row = conn.execute("SELECT version FROM _versions WHERE name = ?", (coll.name,)).fetchone()
+        return row[0] if row else 0
+
+    def _bump(self, conn: sqlite3.Connection, coll: Collection) -> int:
+        # Inside the write transaction; every change bumps the version (see version())
+        conn.execute(
+            "INSERT INTO _versions (name, version) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+            (coll.name,),
+        )
+        return self._version(conn, coll)
+
+    def _advance(self, coll: Collection, version: int, changes: List[Tuple[Optional[Record], Optional[Record]]]) -> None:
+        # After commit: apply our own (old, new) changes if the views are exactly one version behind
+        if not coll.views:
+            return
+        with self._views_lock:
+            memo = self._views.get(coll.name)
+            if memo is not None and memo[0] == version - 1:
+                for old, new in changes:
+                    for view in memo[1].values():
+                        view.apply(old, new)
+                self._views[coll.name] = (version, memo[1])
+
+    def _write(self, coll: Collection, op: Callable[[sqlite3.Connection], Tuple[Any, List[Change]]]) -> Any:
+        # One write transaction around op(conn) -> (result, changes); views advance after commit
+        conn = self._conn()
+        self._table(coll)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result, changes = op(conn)
+            version = self._bump(conn, coll) if changes else 0
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        if changes:
+            self._advance(coll, version, changes)
+        return result
+
+    # Statements run inside an open write transaction; each returns its
+    # result and the (old, new) changes made
+
+    def _put_rows(self, conn: sqlite3.Connection, coll: Collection, record: Record) -> Tuple[None, List[Change]]:
+        key = coll.key_of(record)
+        old = self._select(conn, coll, key) if coll.views else None
+        if coll.layout == 'journal':
+            # Upserts move the record to the end, as in the JSON journal
+            table = self._table(coll)
+            clause, params = self._key_clause(coll, key)
+            conn.execute(f"DELETE FROM {table} WHERE {clause}", params)
+            self._insert(conn, coll, record)
+        elif not self._rewrite(conn, coll, key, record):
+            self._insert(conn, coll, record)
+        return None, [(old, record)]
+
+    def _update_rows(
+        self, conn: sqlite3.Connection, coll: Collection, key: Key, fn: Callable[[Record], Record]
+    ) -> Tuple[Optional[Record], List[Change]]:
+        current = self._select(conn, coll, key)
+        if current is None:
+            return None, []
+        # fn may modify its argument; views need the record as it was stored
+        updated = fn(json.loads(json.dumps(current)) if coll.views else current)
+        if coll.layout == 'journal':
+            table = self._table(coll)
+            clause, params = self._key_clause(coll, key)
+            conn.execute(f"DELETE FROM {table} WHERE {clause}", params)
+            self._insert(conn, coll, updated)
+        else:
+            self._rewrite(conn, coll, key, updated)
+        return updated, [(current, updated)]
+
+    def _delete_rows(self, conn: sqlite3.Connection, coll: Collection, key: Key) -> Tuple[bool, List[Change]]:
+        table = self._table(coll)
+        clause, params = self._key_clause(coll, key)
+        old = self._select(conn, coll, key) if coll.views else None
+        removed = conn.execute(f"DELETE FROM {table} WHERE {clause}", params).rowcount > 0
+        return removed, [(old, None)] if removed else []
+
+    def _delete_where_rows(
+        self, conn: sqlite3.Connection, coll: Collection, field: str, values: List[Any]
+    ) -> Tuple[int, List[Change]]:
+        table = self._table(coll)
+        column = self._column(field)
+        olds: List[Record] = []
+        removed = 0
+        for start in range(0, len(values), 500):
+            chunk = [self._value(value) for value in values[start:start + 500]]
+            placeholders = ', '.join('?' for _ in chunk)
+            if coll.views:
+                rows = conn.execute(f"SELECT doc FROM {table} WHERE {column} IN ({placeholders})", chunk)
+                olds.extend(json.loads(doc) for (doc,) in rows)
+            removed += conn.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", chunk).rowcount
+        return removed, [(old, None) for old in olds] if removed else []
+
+    def put(self, coll: Collection, record: Record) -> None:
+        self._write(coll, lambda conn: self._put_rows(conn, coll, record))
+
+    def update(self, coll: Collection, key: Key, fn: Callable[[Record], Record]) -> Optional[Record]:
+        return self._write(coll, lambda conn: self._update_rows(conn, coll, key, fn))
+
+    def delete(self, coll: Collection, key: Key) -> bool:
+        return self._write(coll, lambda conn: self._delete_rows(conn, coll, key))
+
+    def delete_where(self, coll: Collection, field: str, values: Iterable[Any]) -> int:
+        values = list(dict.fromkeys(values))
+        if field not in self._fields(coll):
+            return super().delete_where(coll, field, values)
+        return self._write(coll, lambda conn: self._delete_where_rows(conn, coll, field, values))
+
+    def replace_all(self, coll: Collection, records: List[Record]) -> None:
+        conn = self._conn()
+        table = self._table(coll)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(f"DELETE FROM {table}")
+            for record in records:
+                self._insert(conn, coll, record)
+            # Views are rebuilt on their next read
+            self._bump(conn, coll)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def read_view(self, coll: Collection, name: str, fn: Callable[[View], Any]) -> Any:
+        conn = self._conn()
+        table = self._table(coll)
+        version = self._version(conn, coll)
+        with self._views_lock:
+            memo = self._views.get(coll.name)
+            if memo is not None and memo[0] == version:
+                return fn(memo[1][name])
+        # Rebuild from one read transaction so rows and version agree
+        conn.execute('BEGIN')
+        try:
+            version = self._version(conn, coll)
+            rows = conn.execute(f"SELECT doc FROM {table} ORDER BY seq").fetchall()
+        finally:
+            conn.execute('COMMIT')
+        views = _build_views(coll, (json.loads(doc) for (doc,) in rows))
+        with self._views_lock:
+            memo = self._views.get(coll.name)
+            # Keep whichever is newer if another thread rebuilt or advanced meanwhile
+            if memo is None or memo[0] < version:
+                memo = self._views[coll.name] = (version, views)
+            return fn(memo[1][name])
+
+    @contextmanager
+    def transaction(self, *collections: Collection):
+        conn = self._conn()
+        for coll in collections:
+            self._table(coll)
+        batch = _SqliteBatch(self, conn, collections)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield batch
+            versions = {coll.name: self._bump(conn, coll) for coll in collections if batch.changes.get(coll.name)}
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        for coll in collections:
+            if coll.name in versions:
+                self._advance(coll, versions[coll.name], batch.changes[coll.name])
+
+
+class _SqliteBatch:
+    """Statements of a SqliteEngine transaction.
+
+    Reads use the same per-thread connection, so they see the batch's own
+    uncommitted writes. Changes are collected per collection so views can
+    advance once the transaction commits.
+    """
+
+    def __init__(self, engine: SqliteEngine, conn: sqlite3.Connection, collections: Sequence[Collection]) -> None:
+        self._engine = engine
+        self._conn = conn
+        self._names = {coll.name for coll in collections}
+        self.changes: Dict[str, List[Change]] = {}
+
+    def _run(self, coll: Collection, result: Tuple[Any, List[Change]]) -> Any:
+        value, changes = result
+        self.changes.setdefault(coll.name, []).extend(changes)
+        return value
+
+    def _check(self, coll: Collection) -> None:
+        if coll.name not in self._names:
+            raise ValueError(f"{coll.name} is not part of this transaction")
+
+    def all(self, coll: Collection) -> List[Record]:
+        self._check(coll)
+        return self._engine.all(coll)
+
+    def get(self, coll: Collection, key: Key) -> Optional[Record]:
+        self._check(coll)
+        return self._engine.get(coll, key)
+
+    def get_many(self, coll: Collection, keys: Iterable[Key]) -> List[Optional[Record]]:
+        self._check(coll)
+        return self._engine.get_many(coll, keys)
+
+    def find(self, coll: Collection, field: str, value: Any) -> List[Record]:
+        self._check(coll)
+        return self._engine.find(coll, field, value)
+
+    def put(self, coll: Collection, record: Record) -> None:
+        self._check(coll)
+        self._run(coll, self._engine._put_rows(self._conn, coll, record))
+
+    def update(self, coll: Collection, key: Key, fn: Callable[[Record], Record]) -> Optional[Record]:
+        self._check(coll)
+        return self._run(coll, self._engine._update_rows(self._conn, coll, key, fn))
+
+    def delete(self, coll: Collection, key: Key) -> bool:
+        self._check(coll)
+        return self._run(coll, self._engine._delete_rows(self._conn, coll, key))
+
+    def delete_where(self, coll: Collection, field: str, values: Iterable[Any]) -> int:
+        self._check(coll)
+        values = list(dict.fromkeys(values))
+        if field not in self._engine._fields(coll):
+            keys = [coll.key_of(rec) for value in values for rec in self.find(coll, field, value)]
+            return sum(self.delete(coll, key) for key in keys)
+        return self._run(coll, self._engine._delete_where_rows(self._conn, coll, field, values))
+
+
+# ---------------------------------------------------------------------------
+# Request snapshots
+# ---------------------------------------------------------------------------
+
+
+_snapshot: contextvars.ContextVar[Optional['ReadSnapshot']] = contextvars.ContextVar('storage_snapshot', default=None)
+
+_snapshot_lock = threading.Lock()
+_snapshot_stats: Dict[str, int] = {'snapshots': 0, 'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+class ReadSnapshot:
+    """Memoized reads for one unit of work (an HTTP request).
+
+    While a snapshot is active (see `read_snapshot`), `get_engine()` returns
+    a view of the engine that remembers the results of all, get, get_many,
+    find and lookup, so a service that looks up the same meeting, member or
+    team several times fetches it from storage once. Writes and transactions
+    made through the view forget what was remembered about the collections
+    they touch; changes made by other requests are not seen until the next
+    snapshot. Records are shared between callers, as with JsonEngine, and
+    must not be mutated.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # coll.name -> (operation, arguments) -> result
+        self._memo: Dict[str, Dict[Any, Any]] = {}
+        self._views: Dict[int, '_SnapshotEngine'] = {}
+        self.stats: Dict[str, int] = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def over(self, engine: StorageEngine) -> '_SnapshotEngine':
+        view = self._views.get(id(engine))
+        if view is None or view._engine is not engine:
+            view = self._views[id(engine)] = _SnapshotEngine(engine, self)
+        return view
+
+    def recall(self, coll: Collection, op: Any) -> Tuple[bool, Any]:
+        """Return (True, result) if `op` on `coll` is remembered, else (False, None)."""
+        with self._lock:
+            memo = self._memo.get(coll.name)
+            if memo is not None and op in memo:
+                self.stats['hits'] += 1
+                return True, memo[op]
+            self.stats['misses'] += 1
+            return False, None
+
+    def store(self, coll: Collection, op: Any, result: Any) -> None:
+        with self._lock:
+            self._memo.setdefault(coll.name, {})[op] = result
+
+    def remember(self, coll: Collection, op: Any, load: Callable[[], Any]) -> Any:
+        found, result = self.recall(coll, op)
+        if not found:
+            result = load()
+            self.store(coll, op, result)
+        return result
+
+    def forget(self, *collections: Collection) -> None:
+        with self._lock:
+            for coll in collections:
+                if self._memo.pop(coll.name, None) is not None:
+                    self.stats['invalidations'] += 1
+
+
+class _SnapshotEngine:
+    """Engine view used while a ReadSnapshot is active; anything not
+    memoized here (page, version, read_view, ...) goes to the engine."""
+
+    def __init__(self, engine: StorageEngine, snapshot: ReadSnapshot) -> None:
+        self._engine = engine
+        self._snapshot = snapshot
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._engine, name)
+
+    # Reads
+
+    def all(self, coll: Collection) -> List[Record]:
+        return self._snapshot.remember(coll, ('all',), lambda: self._engine.all(coll))
+
+    def get(self, coll: Collection, key: Key) -> Optional[Record]:
+        return self._snapshot.remember(coll, ('get', key), lambda: self._engine.get(coll, key))
+
+    def get_many(self, coll: Collection, keys: Iterable[Key]) -> List[Optional[Record]]:
+        # Remembered per key, so later get() calls for these records are hits too
+        keys = list(keys)
+        found: Dict[Key, Optional[Record]] = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            hit, rec = self._snapshot.recall(coll, ('get', key))
+            if hit:
+                found[key] = rec
+            else:
+                missing.append(key)
+        if missing:
+            for key, rec in zip(missing, self._engine.get_many(coll, missing)):
+                found[key] = rec
+                self._snapshot.store(coll, ('get', key), rec)
+        return [found[key] for key in keys]
+
+    def find(self, coll: Collection, field: str, value: Any) -> List[Record]:
+        return self._snapshot.remember(
+            coll, ('find', field, _hashable(value)), lambda: self._engine.find(coll, field, value)
+        )
+
+    def lookup(self, coll: Collection, field: str, value: Any) -> Optional[Record]:
+        op = ('lookup', field, fold_value(value))
+        hit, rec = self._snapshot.recall(coll, op)
+        if not hit:
+            rec = self._engine.lookup(coll, field, value)
+            self._snapshot.store(coll, op, rec)
+            # e.g. login: lookup by email, then get by id for the password hash
+            if rec is not None:
+                self._snapshot.store(coll, ('get', coll.key_of(rec)), rec)
+        return rec
+
+    # Writes
+
+    def put(self, coll: Collection, record: Record) -> None:
+        try:
+            return self._engine.put(coll, record)
+        finally:
+            self._snapshot.forget(coll)
+
+    def update(self, coll: Collection, key: Key, fn: Callable[[Record], Record]) -> Optional[Record]:
+        try:
+            return self._engine.update(coll, key, fn)
+        finally:
+            self._snapshot.forget(coll)
+
+    def delete(self, coll: Collection, key: Key) -> bool:
+        try:
+            return self._engine.delete(coll, key)
+        finally:
+            self._snapshot.forget(coll)
+
+    def delete_where(self, coll: Collection, field: str, values: Iterable[Any]) -> int:
+        try:
+            return self._engine.delete_where(coll, field, values)
+        finally:
+            self._snapshot.forget(coll)
+
+    def replace_all(self, coll: Collection, records: List[Record]) -> None:
+        try:
+            return self._engine.replace_all(coll, records)
+        finally:
+            self._snapshot.forget(coll)
+
+    @contextmanager
+    def transaction(self, *collections: Collection):
+        try:
+            with self._engine.transaction(*collections) as batch:
+                yield batch
+        finally:
+            self._snapshot.forget(*collections)
+
+
+@contextmanager
+def read_snapshot():
+    """Memoize reads made through `get_engine()` in this context until the
+    block exits (see ReadSnapshot); yields the snapshot."""
+    snapshot = ReadSnapshot()
+    token = _snapshot.set(snapshot)
+    try:
+        yield snapshot
+    finally:
+        _snapshot.reset(token)
+        with _snapshot_lock:
+            _snapshot_stats['snapshots'] += 1
+            for name, count in snapshot.stats.items():
+                _snapshot_stats[name] += count
+
+
+def snapshot_stats() -> Dict[str, int]:
+    """Return totals over finished snapshots: snapshots, hits, misses, invalidations."""
+    with _snapshot_lock:
+        return dict(_snapshot_stats)
+
+
+# ---------------------------------------------------------------------------
+# Selection and import
+# ---------------------------------------------------------------------------
+
+
+_engine: Optional[StorageEngine] = None
+_engine_lock = threading.Lock()
+
+
+def sqlite_path() -> str:
+    """Resolve the SQLite database path from DATABASE_URL."""
+    url = os.environ.get('DATABASE_URL', '')
+    if url.startswith('sqlite:///'):
+        path = url[len('sqlite:///'):]
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(DATA_DIR), path)
+        return os.path.normpath(path)
+    return data_path('app.db')
+
+
+def create_engine(kind: Optional[str] = None) -> StorageEngine:
+    """Build the engine named by `kind` or the STORAGE_ENGINE env var."""
+    kind = (kind or os.environ.get('STORAGE_ENGINE') or 'json').strip().lower()
+    if kind == 'json':
+        return JsonEngine()
+    if kind == 'sqlite':
+        return SqliteEngine(sqlite_path())
+    raise ValueError(f"Unknown STORAGE_ENGINE: {kind}")
+
+
+def get_engine() -> StorageEngine:
+    """Return the process-wide storage engine, creating it on first use.
+
+    Inside a `read_snapshot` this is the snapshot's memoizing view of it.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine()
+    snapshot = _snapshot.get()
+    if snapshot is not None:
+        return snapshot.over(_engine)  # type: ignore[return-value]
+    return _engine
+
+
+def set_engine(engine: Optional[StorageEngine]) -> None:
+    """Replace the process-wide engine (None re-reads STORAGE_ENGINE on next use)."""
+    global _engine
+    with _engine_lock:
+        _engine = engine
+
+
+def transaction(*collections: Collection):
+    """Open a transaction over `collections` on the active engine (see
+    StorageEngine.transaction); models accept the batch as `tx`."""
+    return get_engine().transaction(*collections)
+
+
+def import_json_data(target: StorageEngine, collections: Iterable[Collection] | None = None) -> Dict[str, int]:
+    """Copy every record from the JSON files into `target`.
+
+    Existing records in `target` are replaced. Returns record counts per
+    collection.
+    """
+    source = JsonEngine()
+    counts: Dict[str, int] = {}
+    for coll in collections or list(COLLECTIONS.values()):
+        records = source.all(coll)
+        if coll.normalize is not None:
+            records = [coll.normalize(dict(rec), idx) for idx, rec in enumerate(records)]
+        target.replace_all(coll, records)
+        counts[coll.name] = len(records)
+    return counts
+
+
+def main(argv: List[str]) -> int:
+    """Command-line entry point: `python -m utils.engine <command>`.
+
+    import              copy the JSON files into the SQLite database
+    purge-orphan-votes  one-off: delete votes of meetings deleted before
+                        votes cascaded (runs on STORAGE_ENGINE)
+    """
+    if argv not in (['import'], ['purge-orphan-votes']):
+        print("usage: python -m utils.engine import|purge-orphan-votes")
+        return 2
+    # Collections register themselves when their model modules are imported
+    import models.meeting_model  # noqa: F401
+    import models.team_model  # noqa: F401
+    import models.user_model  # noqa: F401
+    import models.vote_model  # noqa: F401
+
+    if argv == ['purge-orphan-votes']:
+        from services.meetings_service import MeetingsService
+
+        print(f"Purged {MeetingsService().purge_orphan_votes()} orphaned votes")
+        return 0
+    path = sqlite_path()
+    for name, count in import_json_data(SqliteEngine(path)).items():
+        print(f"Imported {count} {name} into {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Run through the package module so collections register in the same namespace
+    from utils.engine import main as _main
+
+    sys.exit(_main(sys.argv[1:]))
@@ -30,6 +30,11 @@ class ConflictError(Exception):
     pass
 
 
+class OverloadedError(Exception):
+    """A bounded resource (e.g. the password hashing pool) is saturated; retry later."""
+    pass
+
+
 def handle_validation_error(exc: ValidationError) -> JSONResponse:
     return JSONResponse(status_code=400, content={"detail": str(exc) or "Validation error"})
 
@@ -0,0 +1,33 @@
+"""
+Sparse fieldsets.
+
+`?fields=id,name,timezone` limits a response to the named fields. The parsed
+set is passed down to the models' `_to_api`, which only builds the requested
+fields, so expensive ones (member availability) are never decoded or
+serialized. `id` is always included.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+
+Fields = Optional[FrozenSet[str]]
+
+
+def parse_fields(raw: Optional[str], allowed: Iterable[str]) -> Fields:
+    """Parse a comma-separated `fields` value (None for all fields); raises
+    ValueError on unknown names."""
+    if raw is None:
+        return None
+    requested = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return frozenset(requested | {'id'})
+
+
+def pick(record: Dict[str, Any], fields: Fields) -> Dict[str, Any]:
+    """Copy of `record` limited to `fields` (all fields when None)."""
+    if fields is None:
+        return dict(record)
+    return {key: value for key, value in record.items() if key in fields}
@@ -0,0 +1,362 @@
+"""
+Metrics registry.
+
+A small, dependency-free registry of counters, gauges and histograms,
+rendered in the Prometheus text exposition format (version 0.0.4) by
+`GET /metrics`.
+
+Recording is cheap and independent of scraping: a counter increment or a
+histogram observation is a bisect plus one locked list update, and all
+formatting (cumulative buckets, label escaping) happens at scrape time.
+Subsystems that already keep their own counters (storage cache, pools,
+response cache, ...) register a collector instead, which is only called
+when /metrics is scraped and costs nothing in between.
+
+Label values are passed positionally as a tuple matching `labelnames`.
+Keep them bounded (route templates, method names), never ids.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple
+
+Labels = Tuple[str, ...]
+
+# Seconds; spans a cache hit to a slow fsync or a PBKDF2 derivation
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Sample(NamedTuple):
+    """One exposition line: metric name suffix, label pairs and value."""
+
+    suffix: str
+    labels: Tuple[Tuple[str, str], ...]
+    value: float
+
+
+class Family(NamedTuple):
+    """What a collector returns for one metric."""
+
+    name: str
+    kind: str  # counter, gauge, histogram or untyped
+    help: str
+    samples: List[Sample]
+
+
+def _escape_help(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _escape(value: str) -> str:
+    return _escape_help(value).replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _pairs(self, labels: Labels) -> Tuple[Tuple[str, str], ...]:
+        return tuple(zip(self.labelnames, labels))
+
+    def collect(self) -> Family:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, labels: Labels = ()) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> Family:
+        with self._lock:
+            values = list(self._values.items())
+        # The text format expects counter metadata under the _total name
+        return Family(self.name + '_total', self.kind, self.help, [Sample('', self._pairs(labels), value) for labels, value in values])
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, amount: float = 1.0, labels: Labels = ()) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, labels: Labels = ()) -> None:
+        self.inc(-amount, labels)
+
+    def collect(self) -> Family:
+        with self._lock:
+            values = list(self._values.items())
+        return Family(self.name, self.kind, self.help, [Sample('', self._pairs(labels), value) for labels, value in values])
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> per-bucket counts (last slot is +Inf), then the sum
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[slot] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, labels: Labels = ()) -> Iterator[None]:
+        """Observe the duration of the block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, labels)
+
+    def collect(self) -> Family:
+        with self._lock:
+            series = [(labels, list(values)) for labels, values in self._series.items()]
+        samples: List[Sample] = []
+        for labels, values in series:
+            pairs = self._pairs(labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), values):
+                cumulative += count
+                samples.append(Sample('_bucket', pairs + (('le', _number(bound)),), cumulative))
+            samples.append(Sample('_sum', pairs, values[-1]))
+            samples.append(Sample('_count', pairs, cumulative))
+        return Family(self.name, self.kind, self.help, samples)
+
+
+Collector = Callable[[], Iterable[Family]]
+
+
+class Registry:
+    """Metrics and scrape-time collectors exposed together."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # Modules imported twice (e.g. as __main__) share the first instance
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))  # type: ignore[return-value]
+
+    def collector(self, fn: Collector) -> Collector:
+        """Register `fn` to be called at scrape time; usable as a decorator."""
+        with self._lock:
+            self._collectors.append(fn)
+        return fn
+
+    def collect(self) -> List[Family]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        families = [metric.collect() for metric in metrics]
+        for fn in collectors:
+            families.extend(fn())
+        return families
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text format."""
+        lines: List[str] = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {_escape_help(family.help)}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for sample in family.samples:
+                name = family.name + sample.suffix
+                if sample.labels:
+                    labels = ','.join(f'{key}="{_escape(str(value))}"' for key, value in sample.labels)
+                    name = f"{name}{{{labels}}}"
+                lines.append(f"{name} {_number(sample.value)}")
+        lines.append('')
+        return '\n'.join(lines)
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+registry = Registry()
+
+
+def stats_families(
+    prefix: str,
+    stats: Dict[str, float],
+    help: str,
+    counters: Iterable[str] = (),
+    gauges: Iterable[str] = (),
+    labels: Tuple[Tuple[str, str], ...] = (),
+) -> List[Family]:
+    """Families for the listed keys of a subsystem's stats() dict.
+
+    `counters` become `<prefix>_<key>_total` (a key already ending in
+    `_total` keeps a single suffix) and `gauges` become `<prefix>_<key>`.
+    """
+    families = []
+    for kind, keys in (('counter', counters), ('gauge', gauges)):
+        for key in keys:
+            if key not in stats:
+                continue
+            name = f"{prefix}_{key}"
+            if kind == 'counter' and not name.endswith('_total'):
+                name += '_total'
+            families.append(Family(name, kind, f"{help}: {key.replace('_', ' ')}", [Sample('', labels, float(stats[key]))]))
+    return families
+
+
+def merge_families(families: Iterable[Family]) -> List[Family]:
+    """Combine families with the same name (e.g. one per label set) into one."""
+    merged: Dict[str, Family] = {}
+    for family in families:
+        existing = merged.get(family.name)
+        if existing is None:
+            merged[family.name] = Family(family.name, family.kind, family.help, list(family.samples))
+        else:
+            existing.samples.extend(family.samples)
+    return list(merged.values())
+
+
+# ---------------------------------------------------------------------------
+# Layer instrumentation
+# ---------------------------------------------------------------------------
+
+HTTP_SECONDS = registry.histogram(
+    'http_request_duration_seconds', "Request latency by route template", ('method', 'route', 'status')
+)
+CONTROLLER_SECONDS = registry.histogram(
+    'controller_duration_seconds', "Controller method latency", ('controller', 'method')
+)
+
+
+def timed_methods(histogram: Histogram) -> Callable[[type], type]:
+    """Class decorator timing every public coroutine method into `histogram`,
+    labelled (class name, method name)."""
+    def decorate(cls: type) -> type:
+        for name, fn in list(vars(cls).items()):
+            if name.startswith('_') or not inspect.iscoroutinefunction(fn):
+                continue
+            setattr(cls, name, _timed(fn, histogram, (cls.__name__, name)))
+        return cls
+
+    return decorate
+
+
+def _timed(fn: Callable[..., Awaitable[Any]], histogram: Histogram, labels: Labels) -> Callable[..., Awaitable[Any]]:
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - started, labels)
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording HTTP_SECONDS for every HTTP request.
+
+    Requests are labelled with the matched route's path template (FastAPI
+    puts the route in the scope), so path parameters do not create series;
+    unmatched paths share the route label "unmatched". Streaming responses
+    are timed until the stream ends.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            HTTP_SECONDS.observe(
+                time.perf_counter() - started,
+                (scope['method'], getattr(route, 'path', 'unmatched'), str(status)),
+            )
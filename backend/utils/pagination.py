@@ -0,0 +1,53 @@
+"""
+Pagination utilities.
+
+List endpoints page by primary key: a cursor is the opaque (base64url JSON)
+key of the last record returned, so pages stay stable when records are
+added or removed elsewhere in the collection. The next cursor is returned
+in the `X-Next-Cursor` response header; it is absent on the last page.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any, Optional, Tuple
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def encode_cursor(key: Any) -> Optional[str]:
+    if key is None:
+        return None
+    raw = json.dumps(key, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor: Optional[str]) -> Any:
+    """Return the key encoded in `cursor` (None for no cursor); raises ValueError."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key = json.loads(raw.decode('utf-8'))
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid cursor")
+    if isinstance(key, list):
+        key = tuple(key)  # composite keys
+    # Keys are scalars or tuples of scalars; anything else would fail the comparison
+    if not all(isinstance(part, (str, int, float)) for part in (key if isinstance(key, tuple) else (key,))):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def resolve_page(limit: Optional[int], cursor: Optional[str]) -> Tuple[int, Any]:
+    """Return (page size, key to start after) for the request; raises ValueError."""
+    if limit is None:
+        limit = DEFAULT_LIMIT
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    return limit, decode_cursor(cursor)
@@ -0,0 +1,185 @@
+"""
+In-process publish/subscribe.
+
+A `Hub` fans messages for a topic (e.g. a meeting id) out to subscribers
+waiting on the event loop. Publishers may run on any thread (service calls
+run on the storage pools); delivery is handed to each subscriber's loop
+with one `call_soon_threadsafe` per loop and publish, however many
+subscribers there are.
+
+Every subscriber has a bounded queue, so a slow consumer cannot grow memory.
+Hubs created with a `merge` function coalesce instead: a message arriving
+while the previous one is still unsent is merged into it, so a slow client
+gets one combined update rather than a backlog. Without `merge` the oldest
+pending message is dropped.
+
+`Hub.close_topic` ends a topic (e.g. the meeting was deleted): once its
+subscribers have read what was published before, `get` raises `TopicClosed`.
+
+Only subscribers in this process are reached; with several workers each
+publishes the changes it makes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Set
+
+# Pending messages per subscriber for hubs without `merge`
+DEFAULT_MAX_PENDING = 64
+
+
+class TopicClosed(Exception):
+    """Raised by `Subscription.get` once its topic is closed and drained."""
+
+
+class Subscription:
+    """One consumer of a topic; create with `Hub.subscribe` on the event loop."""
+
+    def __init__(self, hub: 'Hub', topic: Hashable, loop: asyncio.AbstractEventLoop) -> None:
+        self.hub = hub
+        self.topic = topic
+        self.loop = loop
+        self.closed = False
+        self.ended = False
+        self._pending: Deque[Any] = deque()
+        self._ready = asyncio.Event()
+
+    def _offer(self, message: Any) -> None:
+        # On the subscriber's loop
+        if self.closed:
+            return
+        hub = self.hub
+        if hub.merge is not None and self._pending:
+            self._pending[-1] = hub.merge(self._pending[-1], message)
+            hub._count('coalesced')
+        else:
+            if len(self._pending) >= hub.max_pending:
+                self._pending.popleft()
+                hub._count('dropped')
+            self._pending.append(message)
+        self._ready.set()
+
+    def _end(self) -> None:
+        # On the subscriber's loop, after the messages published before
+        self.ended = True
+        self._ready.set()
+
+    async def get(self) -> Any:
+        """Wait for and return the next message; raises TopicClosed once the
+        topic is closed and every message before that has been returned."""
+        while not self._pending:
+            if self.ended:
+                raise TopicClosed(self.topic)
+            self._ready.clear()
+            await self._ready.wait()
+        self.hub._count('delivered')
+        return self._pending.popleft()
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.hub._remove(self)
+
+
+class Hub:
+    """Topic-based fan-out from any thread to asyncio subscribers."""
+
+    def __init__(
+        self,
+        name: str,
+        merge: Optional[Callable[[Any, Any], Any]] = None,
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ) -> None:
+        self.name = name
+        self.merge = merge
+        self.max_pending = max(1, max_pending)
+        self._lock = threading.Lock()
+        self._topics: Dict[Hashable, Set[Subscription]] = {}
+        self._stats: Dict[str, int] = {'published': 0, 'delivered': 0, 'coalesced': 0, 'dropped': 0}
+
+    def subscribe(self, topic: Hashable) -> Subscription:
+        """Subscribe the running loop to `topic`; close the subscription when done."""
+        subscription = Subscription(self, topic, asyncio.get_running_loop())
+        with self._lock:
+            self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def has_subscribers(self, topic: Hashable) -> bool:
+        with self._lock:
+            return bool(self._topics.get(topic))
+
+    def publish(self, topic: Hashable, message: Any) -> int:
+        """Queue `message` for every subscriber of `topic`; return how many.
+
+        Thread-safe. Messages published from one thread reach each
+        subscriber in publish order.
+        """
+        with self._lock:
+            subscriptions = list(self._topics.get(topic, ()))
+            if subscriptions:
+                self._stats['published'] += 1
+        self._schedule(subscriptions, self._deliver, message)
+        return len(subscriptions)
+
+    def close_topic(self, topic: Hashable) -> int:
+        """End `topic`: its subscribers get TopicClosed after the messages
+        published before. Return how many.
+
+        Thread-safe. Later subscribers to the topic start a new one.
+        """
+        with self._lock:
+            subscriptions = list(self._topics.pop(topic, ()))
+        self._schedule(subscriptions, self._finish, None)
+        return len(subscriptions)
+
+    @staticmethod
+    def _schedule(
+        subscriptions: List[Subscription],
+        callback: Callable[[List[Subscription], Any], None],
+        message: Any,
+    ) -> None:
+        # One callback per loop, however many of its subscribers there are
+        by_loop: Dict[asyncio.AbstractEventLoop, List[Subscription]] = {}
+        for subscription in subscriptions:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(callback, group, message)
+            except RuntimeError:
+                # Loop closed (shutdown): these subscribers are gone
+                for subscription in group:
+                    subscription.close()
+
+    @staticmethod
+    def _deliver(subscriptions: List[Subscription], message: Any) -> None:
+        for subscription in subscriptions:
+            subscription._offer(message)
+
+    @staticmethod
+    def _finish(subscriptions: List[Subscription], _: Any) -> None:
+        for subscription in subscriptions:
+            subscription._end()
+
+    def _remove(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._topics.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[subscription.topic]
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._stats[counter] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters: topics, subscribers, published, delivered, coalesced, dropped."""
+        with self._lock:
+            return {
+                'topics': len(self._topics),
+                'subscribers': sum(len(subs) for subs in self._topics.values()),
+                **self._stats,
+            }
@@ -0,0 +1,128 @@
+"""
+Response cache.
+
+Serialized bodies of read endpoints, keyed by representation (route and
+parameters, see utils.conditional.validators) and valid while the
+collections they were built from keep the same version: the first lookup
+after a dependency changes drops the entry. Entries are evicted least
+recently used first once their total size exceeds RESPONSE_CACHE_BYTES
+(default 32 MiB).
+
+A hit is a dictionary lookup and a Response around the stored bytes; the
+service layer and JSON encoding are skipped.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import Response
+
+from utils.conditional import Validators
+from utils.config import env_int
+
+# Fixed per-entry overhead counted against the memory bound
+_ENTRY_OVERHEAD = 256
+
+
+class _Entry(NamedTuple):
+    etag: str
+    generation: Tuple[int, ...]
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    size: int
+
+
+class ResponseCache:
+    """Memory-bounded LRU of serialized responses."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Tuple[Any, ...], _Entry]' = OrderedDict()
+        self._bytes = 0
+        self._stats: Dict[str, int] = {'hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0, 'skipped': 0}
+        # route (first element of the variant) -> [hits, misses]
+        self._routes: Dict[Any, list] = {}
+
+    def get(self, validators: Validators) -> Optional[Response]:
+        """Return the cached response for this representation and version, or None."""
+        key = validators.variant
+        if not key:
+            return None
+        with self._lock:
+            route = self._routes.setdefault(key[0] if key else None, [0, 0])
+            entry = self._entries.get(key)
+            if entry is not None and (entry.etag != validators.etag or entry.generation != validators.generation):
+                # A dependency changed since the entry was stored
+                self._drop(key)
+                self._stats['invalidations'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                route[1] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            route[0] += 1
+        return Response(content=entry.body, status_code=entry.status_code, headers=entry.headers)
+
+    def put(self, validators: Validators, response: Response) -> Response:
+        """Add the validators to `response`, cache its body and return it."""
+        validators.apply(response)
+        key = validators.variant
+        if not key or response.status_code != 200:
+            return response
+        body = bytes(response.body)
+        headers = {name: value for name, value in response.headers.items() if name != 'content-length'}
+        size = len(body) + sum(len(name) + len(value) for name, value in headers.items()) + _ENTRY_OVERHEAD
+        with self._lock:
+            if size > self.max_bytes // 4:
+                # One response must not flush most of the cache
+                self._stats['skipped'] += 1
+                return response
+            self._drop(key)
+            self._entries[key] = _Entry(validators.etag, validators.generation, response.status_code, headers, body, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats['evictions'] += 1
+        return response
+
+    def _drop(self, key: Tuple[Any, ...]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters (hits, misses, invalidations, evictions, skipped), size,
+        overall hit ratio and hits/misses/hit ratio per route."""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hit_ratio': round(self._stats['hits'] / lookups, 4) if lookups else 0.0,
+                'routes': {
+                    str(route): {
+                        'hits': hits,
+                        'misses': misses,
+                        'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                    }
+                    for route, (hits, misses) in self._routes.items()
+                },
+            }
+
+
+response_cache = ResponseCache(env_int('RESPONSE_CACHE_BYTES', 32 << 20))
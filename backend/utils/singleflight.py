@@ -0,0 +1,182 @@
+"""
+Request collapsing ("singleflight").
+
+When many clients ask for the same expensive result at once (a team
+heatmap everybody opens), only the first call - the leader - computes it;
+identical calls arriving while it runs - followers - wait for and share its
+result. Work is capped at one computation per burst instead of one per
+request. Nothing is cached: a call that starts after the
+leader finished computes again (HTTP-level reuse is utils.response_cache's
+job).
+
+Decorate a service method with `@singleflight()`. Calls are identical when
+their arguments (excluding `self`) are equal; calls with unhashable
+arguments are never collapsed. Followers get the leader's return value (the
+same object, so it must not be mutated) or its exception. A follower that
+waits longer than the timeout (SINGLEFLIGHT_TIMEOUT_SECONDS, default 30)
+gets OverloadedError (503) and leaves the computation running for the rest.
+
+Through utils.concurrency.AsyncFacade, followers wait on the event loop
+rather than in a pool thread, so a burst occupies a single worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import Future, wait
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from utils.config import env_int
+from utils.errors import OverloadedError
+
+
+DEFAULT_TIMEOUT = env_int('SINGLEFLIGHT_TIMEOUT_SECONDS', 30)
+
+# (group, key) of the flight the current context is leading; lets the leader's
+# worker thread run the function instead of joining its own flight
+_leading: contextvars.ContextVar[Optional[Tuple['SingleFlight', Hashable]]] = contextvars.ContextVar(
+    'singleflight_leading', default=None
+)
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution."""
+
+    def __init__(self, name: str, timeout: float = DEFAULT_TIMEOUT) -> None:
+        self.name = name
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        # Keeps asyncio leader tasks referenced until they finish
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats: Dict[str, int] = {'leaders': 0, 'followers': 0, 'errors': 0, 'timeouts': 0, 'uncollapsed': 0}
+
+    @staticmethod
+    def key(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[Hashable]:
+        """Key for a call, or None if its arguments are unhashable."""
+        key = (args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        # Return (flight, True if the caller leads it)
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._stats['followers'] += 1
+                return call, False
+            call = self._calls[key] = Future()
+            self._stats['leaders'] += 1
+            return call, True
+
+    def _finish(self, key: Hashable, call: Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+        # Unregister before settling: a call arriving afterwards starts a new flight
+        with self._lock:
+            del self._calls[key]
+            if error is not None:
+                self._stats['errors'] += 1
+        if error is not None:
+            call.set_exception(error)
+        else:
+            call.set_result(result)
+
+    def _timed_out(self) -> OverloadedError:
+        with self._lock:
+            self._stats['timeouts'] += 1
+        return OverloadedError("Still computing this result, please retry shortly")
+
+    def do(self, key: Optional[Hashable], fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run `fn(*args, **kwargs)`, or wait for the running call with the same key."""
+        if key is None:
+            with self._lock:
+                self._stats['uncollapsed'] += 1
+            return fn(*args, **kwargs)
+        if _leading.get() == (self, key):
+            # Started by do_async, which already registered the flight
+            return fn(*args, **kwargs)
+        call, leader = self._join(key)
+        if not leader:
+            done, _ = wait([call], timeout=self.timeout)
+            if not done:
+                raise self._timed_out()
+            return call.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result)
+        return result
+
+    async def do_async(self, key: Optional[Hashable], start: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `start()`, or the running call with the same key.
+
+        The leader's computation runs in its own task, so cancelling the
+        leading request does not fail its followers.
+        """
+        if key is None:
+            # Counted as uncollapsed by `do` in the worker thread
+            return await start()
+        call, leader = self._join(key)
+        if leader:
+            token = _leading.set((self, key))
+            try:
+                task = asyncio.ensure_future(start())
+            finally:
+                _leading.reset(token)
+            self._tasks.add(task)
+            task.add_done_callback(functools.partial(self._task_done, key, call))
+        waiter = asyncio.wrap_future(call)
+        # asyncio.wait neither cancels the flight on timeout nor when this request is cancelled
+        done, _ = await asyncio.wait({waiter}, timeout=None if leader else self.timeout)
+        if not done:
+            raise self._timed_out()
+        return waiter.result()
+
+    def _task_done(self, key: Hashable, call: Future, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if task.cancelled():
+            self._finish(key, call, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._finish(key, call, error=task.exception())
+        else:
+            self._finish(key, call, task.result())
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters: in_flight, leaders, followers, errors, timeouts, uncollapsed."""
+        with self._lock:
+            return {'in_flight': len(self._calls), **self._stats}
+
+
+_groups: List[SingleFlight] = []
+
+
+def singleflight(timeout: float = DEFAULT_TIMEOUT) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorate a method so concurrent identical calls share one execution.
+
+    The wrapper's `singleflight` attribute is its SingleFlight group, which
+    AsyncFacade uses to collapse calls before they reach a pool thread.
+    """
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        group = SingleFlight(fn.__qualname__, timeout)
+        _groups.append(group)
+
+        @functools.wraps(fn)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            return group.do(group.key(args, kwargs), fn, self, *args, **kwargs)
+
+        wrapper.singleflight = group  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorate
+
+
+def singleflight_stats() -> Dict[str, Dict[str, int]]:
+    """Return per-method counters (see SingleFlight.stats)."""
+    return {group.name: group.stats() for group in _groups}
@@ -2,17 +2,87 @@
 Storage utilities.
 
 File I/O helpers for JSON persistence with atomic writes and file locks.
+
+`file_lock` combines an in-process reader/writer lock with fcntl locks on a
+sidecar `<file>.lock`, so read-modify-write cycles are safe across threads
+and across uvicorn workers. Locks can be striped by key for layouts where
+writers to different keys do not conflict (append-only journals).
+
+Parsed documents are kept in an in-process cache keyed by absolute path and
+validated against the file's (inode, mtime_ns, size) on every read, so
+unchanged files are served without re-opening or re-parsing them. Documents
+returned by `read_json` are shared between callers and must be treated as
+read-only; use `mutate_json` (or `update_json`) for read-modify-write.
+
+Writes go through a per-file commit queue: concurrent `write_json` and
+`mutate_json` calls are applied in order to one document and flushed with a
+single atomic replace + fsync.
+
+Append-only journals (one JSON document per line) are supported through
+`append_jsonl`/`read_jsonl`; reads only parse the bytes appended since the
+previous read.
+
+Changes spanning several files go through `unit_of_work`: all files are
+locked up front (in path order), changes are staged in memory and, on exit,
+recorded in an `intent-*.json` file before being applied with one write per
+file. `recover_intents` finishes any commit interrupted by a crash.
+
+Every file has a generation (see `generation`): a counter bumped by each
+write made through this module, or when a stat shows the file was changed
+by another process, plus the file's stat stamp. Checking whether a file
+changed therefore costs one stat, not a read.
+
+Parse, write, fsync and lock-wait times and the bytes read and written are
+recorded in utils.metrics (see /metrics).
 """
 
 import json
 import os
 import tempfile
-from contextlib import contextmanager
-from typing import Any, Callable
+import threading
+import time
+import uuid
+import zlib
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    import fcntl  # POSIX only
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+from utils.metrics import registry
 
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
 
+# Sentinel cached for files that exist but are empty
+_EMPTY = object()
+
+StatKey = Tuple[int, int, int]
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, Tuple[StatKey, Any]] = {}
+_cache_stats: Dict[str, int] = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+# path -> (inode, bytes consumed, parsed entries) for append-only journals
+_journal_lock = threading.Lock()
+_journal_cache: Dict[str, Tuple[int, int, List[Any]]] = {}
+
+# path -> (generation counter, stat key last seen or _UNSEEN), guarded by _cache_lock
+_UNSEEN = object()
+_generations: Dict[str, Tuple[int, Any]] = {}
+
+# Cache hits are not timed; see cache_stats
+READ_SECONDS = registry.histogram('storage_read_seconds', "Time to read and parse a data file on a cache miss", ('op',))
+READ_BYTES = registry.counter('storage_read_bytes', "Bytes parsed from data files", ('op',))
+WRITE_SECONDS = registry.histogram(
+    'storage_write_seconds', "Write latency seen by callers, including group-commit waits", ('op',)
+)
+WRITE_BYTES = registry.counter('storage_write_bytes', "Bytes written to data files", ('op',))
+FSYNC_SECONDS = registry.histogram('storage_fsync_seconds', "Time spent in fsync", ('op',))
+LOCK_WAIT_SECONDS = registry.histogram('storage_lock_wait_seconds', "Time spent waiting for data file locks")
+
 
 def _ensure_dir(path: str) -> None:
     directory = os.path.dirname(path)
@@ -24,6 +94,87 @@ def _default_serializer(obj: Any) -> Any:
     raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
+def _stat_key(st: os.stat_result) -> StatKey:
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _parse_file(path: str) -> Tuple[Optional[StatKey], Any]:
+    """Parse `path` and return (stat key of the opened file, document).
+
+    The key is taken from the open descriptor so it always describes the
+    bytes that were parsed, even if the file is replaced concurrently.
+    Returns (None, _EMPTY) when the file does not exist.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            key = _stat_key(os.fstat(f.fileno()))
+            content = f.read().strip()
+    except FileNotFoundError:
+        return None, _EMPTY
+    if not content:
+        return key, _EMPTY
+    return key, json.loads(content)
+
+
+def invalidate_cache(filename: str | None = None) -> None:
+    """Drop the cached document for `filename`, or every entry if None."""
+    with _cache_lock:
+        if filename is None:
+            _cache_stats['invalidations'] += len(_cache) + len(_journal_cache)
+            _cache.clear()
+            _journal_cache.clear()
+            return
+        path = data_path(filename)
+        if _cache.pop(path, None) is not None:
+            _cache_stats['invalidations'] += 1
+        if _journal_cache.pop(path, None) is not None:
+            _cache_stats['invalidations'] += 1
+
+
+class Generation(NamedTuple):
+    """A file's change state.
+
+    counter: bumped on every change seen by this process; for in-process caches
+    stamp: (inode, mtime_ns, size), None if the file does not exist; the same
+        in every process, so it suits validators sent to clients (ETags)
+    """
+
+    counter: int
+    stamp: Optional[StatKey]
+
+
+def _bump_generation(path: str) -> None:
+    # After a write through this module; the next generation() records the new stamp
+    with _cache_lock:
+        counter, _ = _generations.get(path, (0, _UNSEEN))
+        _generations[path] = (counter + 1, _UNSEEN)
+
+
+def generation(filename: str) -> Generation:
+    """Return the current generation of `filename` at the cost of one stat.
+
+    Changes made by other processes are noticed through the stat stamp, so
+    the counter also moves for them (once, however many writes they made).
+    """
+    path = data_path(filename)
+    try:
+        stamp: Optional[StatKey] = _stat_key(os.stat(path))
+    except FileNotFoundError:
+        stamp = None
+    with _cache_lock:
+        counter, seen = _generations.get(path, (0, _UNSEEN))
+        if seen is not _UNSEEN and seen != stamp:
+            counter += 1
+        _generations[path] = (counter, stamp)
+    return Generation(counter, stamp)
+
+
+def cache_stats() -> Dict[str, int]:
+    """Return a snapshot of read cache counters (hits, misses, invalidations, entries)."""
+    with _cache_lock:
+        return {**_cache_stats, 'entries': len(_cache) + len(_journal_cache)}
+
+
 def data_path(filename: str) -> str:
     """Return absolute path within backend/data for a given filename."""
     if os.path.isabs(filename):
@@ -33,33 +184,216 @@ def data_path(filename: str) -> str:
 
 
 def read_json(filename: str, default_factory: Callable[[], Any] | None = None) -> Any:
-    """Read JSON from file. If not exists/empty, return default_factory() or {}."""
+    """Read JSON from file. If not exists/empty, return default_factory() or {}.
+
+    The parsed document is cached and shared; callers must not mutate it.
+    """
     path = data_path(filename)
-    if not os.path.exists(path):
-        return default_factory() if default_factory else {}
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read().strip()
-            if not content:
-                return default_factory() if default_factory else {}
-            return json.loads(content)
+        key: Optional[StatKey] = _stat_key(os.stat(path))
     except FileNotFoundError:
+        key = None
+    if key is not None:
+        with _cache_lock:
+            entry = _cache.get(path)
+            if entry is not None and entry[0] == key:
+                _cache_stats['hits'] += 1
+                data = entry[1]
+                return (default_factory() if default_factory else {}) if data is _EMPTY else data
+            _cache_stats['misses'] += 1
+    started = time.perf_counter()
+    key, data = _parse_file(path)
+    READ_SECONDS.observe(time.perf_counter() - started, ('read_json',))
+    if key is not None:
+        READ_BYTES.inc(key[2], ('read_json',))
+        with _cache_lock:
+            _cache[path] = (key, data)
+    if data is _EMPTY:
         return default_factory() if default_factory else {}
+    return data
 
 
-def write_json(filename: str, data: Any) -> None:
-    """Atomically write JSON to file."""
+# ---------------------------------------------------------------------------
+# File locks
+# ---------------------------------------------------------------------------
+
+# Number of byte-range stripes per lock file
+LOCK_STRIPES = 64
+
+_locks_lock = threading.Lock()
+_locks: Dict[str, '_FileLock'] = {}
+_lock_stats: Dict[str, float] = {'acquisitions': 0, 'contended': 0, 'wait_seconds_total': 0.0, 'wait_seconds_max': 0.0}
+
+
+class _FileLock:
+    """Exclusive/striped lock for one data file, across threads and processes.
+
+    Threads coordinate through a reader/writer condition (stripe holders are
+    readers, whole-file holders are writers) plus one mutex per stripe.
+    Processes coordinate through fcntl record locks on `<path>.lock`: the
+    whole-file lock covers every byte, a stripe lock covers its own byte.
+    The lock file descriptor stays open for the life of the process because
+    closing any descriptor would drop this process's POSIX locks.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.cond = threading.Condition()
+        self.exclusive = False
+        self.shared = 0
+        self.waiting_exclusive = 0
+        self.stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self.fd: Optional[int] = None
+        if fcntl is not None:
+            _ensure_dir(path)
+            self.fd = os.open(path + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+
+    def _os_lock(self, locked: bool, stripe: Optional[int]) -> None:
+        if self.fd is None:
+            return
+        # Whole file: every byte from offset 0; stripe: its own byte after offset 0
+        length, start = (0, 0) if stripe is None else (1, 1 + stripe)
+        fcntl.lockf(self.fd, fcntl.LOCK_EX if locked else fcntl.LOCK_UN, length, start)
+
+    def acquire(self, stripe: Optional[int]) -> None:
+        with self.cond:
+            if stripe is None:
+                self.waiting_exclusive += 1
+                while self.exclusive or self.shared:
+                    self.cond.wait()
+                self.waiting_exclusive -= 1
+                self.exclusive = True
+            else:
+                # Pending whole-file lockers go first so they are not starved
+                while self.exclusive or self.waiting_exclusive:
+                    self.cond.wait()
+                self.shared += 1
+        try:
+            if stripe is not None:
+                self.stripes[stripe].acquire()
+            try:
+                self._os_lock(True, stripe)
+            except BaseException:
+                if stripe is not None:
+                    self.stripes[stripe].release()
+                raise
+        except BaseException:
+            self._release_local(stripe)
+            raise
+
+    def release(self, stripe: Optional[int]) -> None:
+        try:
+            self._os_lock(False, stripe)
+            if stripe is not None:
+                self.stripes[stripe].release()
+        finally:
+            self._release_local(stripe)
+
+    def _release_local(self, stripe: Optional[int]) -> None:
+        with self.cond:
+            if stripe is None:
+                self.exclusive = False
+            else:
+                self.shared -= 1
+            self.cond.notify_all()
+
+
+def _stripe_of(key: Any) -> int:
+    return zlib.crc32(str(key).encode('utf-8')) % LOCK_STRIPES
+
+
+@contextmanager
+def file_lock(filename: str, stripe_key: Any = None):
+    """Hold the lock for `filename` across threads and processes.
+
+    Without `stripe_key` the whole file is locked exclusively. With one,
+    only the stripe that key hashes to is locked, so writers touching
+    different keys (e.g. different meetings) proceed in parallel while
+    still excluding whole-file lockers. Not reentrant.
+    """
     path = data_path(filename)
-    _ensure_dir(path)
+    with _locks_lock:
+        lock = _locks.get(path)
+        if lock is None:
+            lock = _locks[path] = _FileLock(path)
+    stripe = None if stripe_key is None else _stripe_of(stripe_key)
+    started = time.perf_counter()
+    lock.acquire(stripe)
+    waited = time.perf_counter() - started
+    LOCK_WAIT_SECONDS.observe(waited)
+    with _cache_lock:
+        _lock_stats['acquisitions'] += 1
+        _lock_stats['wait_seconds_total'] += waited
+        if waited > 0.001:
+            _lock_stats['contended'] += 1
+        if waited > _lock_stats['wait_seconds_max']:
+            _lock_stats['wait_seconds_max'] = waited
+    try:
+        yield
+    finally:
+        lock.release(stripe)
+
+
+def lock_stats() -> Dict[str, float]:
+    """Return lock counters: acquisitions, contended (>1ms waits) and wait times in seconds."""
+    with _cache_lock:
+        return dict(_lock_stats)
+
+
+# ---------------------------------------------------------------------------
+# Group commit
+# ---------------------------------------------------------------------------
+
+
+class _Ticket:
+    """One queued write: a whole-document replacement or an in-place mutation."""
+
+    __slots__ = ('op', 'payload', 'default_factory', 'done', 'promoted', 'result', 'error')
+
+    def __init__(self, op: str, payload: Any, default_factory: Callable[[], Any] | None = None) -> None:
+        self.op = op
+        self.payload = payload
+        self.default_factory = default_factory
+        self.done = threading.Event()
+        self.promoted = False
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _CommitQueue:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.pending: List[_Ticket] = []
+        self.active = False
+
+
+# Extra time a commit leader waits to gather followers; the flush itself
+# (fsync) is normally window enough
+GROUP_COMMIT_WINDOW = 0.0
+
+_queues_lock = threading.Lock()
+_queues: Dict[str, _CommitQueue] = {}
+_commit_stats: Dict[str, int] = {'writes': 0, 'flushes': 0}
+
+# Marks a batch document that has not been loaded yet
+_UNSET = object()
+
+
+def _write_file(path: str, data: Any) -> None:
+    """Serialize `data` to a temp file, fsync it and atomically replace `path`."""
     dir_name = os.path.dirname(path)
     fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=dir_name)
     try:
         with os.fdopen(fd, 'w', encoding='utf-8') as tmp_file:
             json.dump(data, tmp_file, ensure_ascii=False, separators=(',', ':'), default=_default_serializer)
             tmp_file.flush()
+            WRITE_BYTES.inc(os.fstat(tmp_file.fileno()).st_size, ('write_json',))
+            started = time.perf_counter()
             os.fsync(tmp_file.fileno())
+            FSYNC_SECONDS.observe(time.perf_counter() - started, ('write_json',))
         os.replace(tmp_path, path)
     finally:
+        invalidate_cache(path)
+        _bump_generation(path)
         try:
             if os.path.exists(tmp_path):
                 os.remove(tmp_path)
@@ -67,14 +401,435 @@ def write_json(filename: str, data: Any) -> None:
             pass
 
 
+def _apply_batch(path: str, batch: List[_Ticket]) -> None:
+    """Apply queued writes in order to one document and flush it once.
+
+    A mutation that raises gets the exception; the batch is then replayed
+    from disk without it, so its partial changes are discarded. The whole
+    read-apply-write runs under the file's exclusive lock. If it fails
+    outside a mutation (an unreadable document, a lock error), every ticket
+    in the batch gets that exception; no caller is left waiting.
+    """
+    try:
+        with file_lock(path):
+            _apply_locked(path, batch)
+    except BaseException as exc:
+        # Nothing was flushed; mutations that failed keep their own error
+        for ticket in batch:
+            if ticket.error is None:
+                ticket.error = exc
+    finally:
+        for ticket in batch:
+            ticket.done.set()
+
+
+def _apply_locked(path: str, batch: List[_Ticket]) -> None:
+    remaining = list(batch)
+    while True:
+        doc: Any = _UNSET
+        owned = False
+        failed: Optional[_Ticket] = None
+        for ticket in remaining:
+            if ticket.op == 'replace':
+                doc, owned = ticket.payload, False
+                continue
+            if doc is _UNSET:
+                _, doc = _parse_file(path)
+                if doc is _EMPTY:
+                    doc = ticket.default_factory() if ticket.default_factory else {}
+                owned = True
+            elif not owned:
+                # Never mutate an object handed to write_json by another caller
+                doc = json.loads(json.dumps(doc, default=_default_serializer))
+                owned = True
+            try:
+                ticket.result = ticket.payload(doc)
+            except Exception as exc:
+                ticket.error = exc
+                failed = ticket
+                break
+        if failed is None:
+            break
+        remaining.remove(failed)
+        failed.done.set()
+    if remaining:
+        try:
+            _write_file(path, doc)
+            with _cache_lock:
+                _commit_stats['flushes'] += 1
+                _commit_stats['writes'] += len(remaining)
+        except BaseException as exc:
+            for ticket in remaining:
+                ticket.error = exc
+    for ticket in remaining:
+        ticket.done.set()
+
+
+def _submit(path: str, ticket: _Ticket) -> Any:
+    """Queue `ticket` for `path` and return its result once flushed.
+
+    The first caller to find the queue idle becomes the leader: it takes
+    everything pending, applies it, writes once and wakes every caller in
+    that batch. Writes arriving meanwhile wait for the next batch, whose
+    leader is the oldest of them.
+    """
+    _ensure_dir(path)
+    submitted = time.perf_counter()
+    with _queues_lock:
+        queue = _queues.setdefault(path, _CommitQueue())
+    with queue.lock:
+        queue.pending.append(ticket)
+        lead = not queue.active
+        queue.active = True
+    if not lead:
+        ticket.done.wait()
+    if lead or ticket.promoted:
+        if GROUP_COMMIT_WINDOW:
+            time.sleep(GROUP_COMMIT_WINDOW)
+        with queue.lock:
+            batch, queue.pending = queue.pending, []
+        try:
+            _apply_batch(path, batch)
+        finally:
+            with queue.lock:
+                if queue.pending:
+                    successor = queue.pending[0]
+                    successor.promoted = True
+                    successor.done.set()
+                else:
+                    queue.active = False
+    WRITE_SECONDS.observe(
+        time.perf_counter() - submitted, ('write_json' if ticket.op == 'replace' else 'mutate_json',)
+    )
+    if ticket.error is not None:
+        raise ticket.error
+    return ticket.result
+
+
+def commit_stats() -> Dict[str, int]:
+    """Return group-commit counters: writes acknowledged and flushes (fsyncs) performed."""
+    with _cache_lock:
+        return dict(_commit_stats)
+
+
+def write_json(filename: str, data: Any) -> None:
+    """Atomically write JSON to file.
+
+    Concurrent writes to the same file are group-committed: returns once a
+    flush containing this write (or a later one in the same batch) is durable.
+    """
+    _submit(data_path(filename), _Ticket('replace', data))
+
+
+def mutate_json(filename: str, fn: Callable[[Any], Any], default_factory: Callable[[], Any] | None = None) -> Any:
+    """Apply `fn(document)` as an in-place mutation and persist it; return fn's result.
+
+    Mutations queued for the same file are applied in arrival order to a
+    single private document and flushed with one atomic replace + fsync.
+    `fn` may be re-run if a later mutation in its batch fails, so it must
+    not have side effects outside the document.
+    """
+    return _submit(data_path(filename), _Ticket('mutate', fn, default_factory))
+
+
 @contextmanager
 def update_json(filename: str, default_factory: Callable[[], Any] | None = None):
     """Context manager to read-modify-write JSON safely.
 
+    The yielded document is a private copy parsed from disk, never the
+    shared cached one, so it may be mutated freely. The file stays locked
+    (across threads and processes) until the block exits; do not write the
+    same file from inside the block.
+
     Usage:
         with update_json('members.json', list) as data:
             data.append({...})
     """
-    data = read_json(filename, default_factory)
-    yield data
-    write_json(filename, data)
+    path = data_path(filename)
+    with file_lock(path):
+        _, data = _parse_file(path)
+        if data is _EMPTY:
+            data = default_factory() if default_factory else {}
+        yield data
+        _write_file(path, data)
+
+
+def append_jsonl(filename: str, *records: Any) -> None:
+    """Append JSON documents as lines to `filename` with one write and fsync.
+
+    The cost is independent of the journal's size.
+    """
+    if not records:
+        return
+    path = data_path(filename)
+    _ensure_dir(path)
+    started = time.perf_counter()
+    _append_bytes(path, _dump_lines(records))
+    WRITE_SECONDS.observe(time.perf_counter() - started, ('append_jsonl',))
+
+
+def _dump_lines(records: Iterable[Any]) -> bytes:
+    return ''.join(
+        json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=_default_serializer) + '\n'
+        for record in records
+    ).encode('utf-8')
+
+
+def _append_bytes(path: str, raw: bytes) -> None:
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, raw)
+        WRITE_BYTES.inc(len(raw), ('append_jsonl',))
+        started = time.perf_counter()
+        os.fsync(fd)
+        FSYNC_SECONDS.observe(time.perf_counter() - started, ('append_jsonl',))
+    finally:
+        os.close(fd)
+        _bump_generation(path)
+
+
+def read_jsonl(filename: str) -> List[Any]:
+    """Return the parsed entries of an append-only JSON-lines journal.
+
+    Entries are cached per path; when the file has only grown since the last
+    read, just the new tail is parsed and appended to the same list, so its
+    identity is stable until the journal is replaced. A trailing partial
+    line (a concurrent append in progress) is left for the next read. The
+    returned list is shared and must be treated as read-only.
+    """
+    path = data_path(filename)
+    with _journal_lock:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            return []
+        try:
+            st = os.fstat(fd)
+            cached = _journal_cache.get(path)
+            if cached is not None and cached[0] == st.st_ino and cached[1] <= st.st_size:
+                inode, offset, entries = cached
+                if offset == st.st_size:
+                    with _cache_lock:
+                        _cache_stats['hits'] += 1
+                    return entries
+            else:
+                inode, offset, entries = st.st_ino, 0, []
+            with _cache_lock:
+                _cache_stats['misses'] += 1
+            started = time.perf_counter()
+            os.lseek(fd, offset, os.SEEK_SET)
+            chunks: List[bytes] = []
+            while True:
+                block = os.read(fd, 1 << 16)
+                if not block:
+                    break
+                chunks.append(block)
+        finally:
+            os.close(fd)
+        tail = b''.join(chunks)
+        end = tail.rfind(b'\n') + 1
+        for raw in tail[:end].splitlines():
+            if raw.strip():
+                entries.append(json.loads(raw))
+        READ_SECONDS.observe(time.perf_counter() - started, ('read_jsonl',))
+        READ_BYTES.inc(end, ('read_jsonl',))
+        with _cache_lock:
+            _journal_cache[path] = (inode, offset + end, entries)
+        return entries
+
+
+def reset_jsonl(filename: str) -> None:
+    """Atomically replace a journal with an empty file (used after compaction)."""
+    path = data_path(filename)
+    _ensure_dir(path)
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=os.path.dirname(path))
+    try:
+        os.fsync(fd)
+        os.close(fd)
+        os.replace(tmp_path, path)
+    finally:
+        invalidate_cache(path)
+        _bump_generation(path)
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Units of work
+# ---------------------------------------------------------------------------
+
+INTENT_PREFIX = 'intent-'
+
+
+def _read_raw(path: str) -> Optional[bytes]:
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _checksum(raw: Optional[bytes]) -> Optional[int]:
+    return None if raw is None else zlib.crc32(raw)
+
+
+class UnitOfWork:
+    """Changes to several locked files, staged in memory until commit.
+
+    Created by `unit_of_work`; documents returned by `load` are private
+    copies and must be handed back with `stage` once changed.
+    """
+
+    def __init__(self, paths: List[str]) -> None:
+        self._paths = set(paths)
+        self._docs: Dict[str, Any] = {}
+        self._before: Dict[str, Optional[int]] = {}
+        self._staged: Dict[str, Any] = {}
+        self._appends: Dict[str, List[Any]] = {}
+
+    def _path(self, filename: str) -> str:
+        path = data_path(filename)
+        if path not in self._paths:
+            raise ValueError(f"{filename} is not part of this unit of work")
+        return path
+
+    def load(self, filename: str, default_factory: Callable[[], Any] | None = None) -> Any:
+        """Return the private document for `filename` (the staged one if any)."""
+        path = self._path(filename)
+        if path not in self._docs:
+            raw = _read_raw(path)
+            self._before[path] = _checksum(raw)
+            content = raw.decode('utf-8').strip() if raw is not None else ''
+            if content:
+                self._docs[path] = json.loads(content)
+            else:
+                self._docs[path] = default_factory() if default_factory else {}
+        return self._docs[path]
+
+    def stage(self, filename: str, data: Any) -> None:
+        """Replace `filename` with `data` at commit."""
+        path = self._path(filename)
+        if path not in self._before:
+            self._before[path] = _checksum(_read_raw(path))
+        self._docs[path] = self._staged[path] = data
+
+    def append(self, filename: str, *records: Any) -> None:
+        """Append `records` to the journal `filename` at commit."""
+        self._appends.setdefault(self._path(filename), []).extend(records)
+
+    def commit(self) -> None:
+        """Record the intent durably, apply it with one write per file, then drop it."""
+        appends = {path: records for path, records in self._appends.items() if records}
+        if not self._staged and not appends:
+            return
+        intent = {
+            'files': [
+                {'name': os.path.relpath(path, DATA_DIR), 'before': self._before[path], 'data': data}
+                for path, data in self._staged.items()
+            ],
+            'appends': [
+                {'name': os.path.relpath(path, DATA_DIR), 'offset': _file_size(path), 'records': records}
+                for path, records in appends.items()
+            ],
+        }
+        intent_path = data_path(f"{INTENT_PREFIX}{uuid.uuid4().hex}.json")
+        _write_file(intent_path, intent)
+        _apply_intent(intent, recovering=False)
+        os.remove(intent_path)
+        with _cache_lock:
+            _commit_stats['flushes'] += len(intent['files']) + len(intent['appends'])
+            _commit_stats['writes'] += len(intent['files']) + len(intent['appends'])
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _apply_intent(intent: Dict[str, Any], recovering: bool) -> None:
+    # When recovering, a file is only rewritten if it still holds the bytes
+    # the intent was based on, and a journal is only appended to if it still
+    # ends where the intent expected (or with a torn prefix of the records);
+    # anything else was applied before the crash
+    for entry in intent['files']:
+        path = data_path(entry['name'])
+        if recovering and _checksum(_read_raw(path)) != entry['before']:
+            continue
+        _ensure_dir(path)
+        _write_file(path, entry['data'])
+    for entry in intent['appends']:
+        path = data_path(entry['name'])
+        raw = _dump_lines(entry['records'])
+        _ensure_dir(path)
+        if recovering:
+            size = _file_size(path)
+            if size < entry['offset']:
+                continue
+            with open(path, 'rb') as f:
+                f.seek(entry['offset'])
+                tail = f.read()
+            if tail == raw or not raw.startswith(tail):
+                continue
+            if tail:
+                os.truncate(path, entry['offset'])
+        _append_bytes(path, raw)
+
+
+@contextmanager
+def unit_of_work(*filenames: str):
+    """Lock `filenames` and yield a UnitOfWork committed when the block exits.
+
+    Files are locked exclusively in path order, so units of work over
+    overlapping files cannot deadlock. If the block raises nothing is
+    written. On exit the staged changes are fsync'd to an intent file first,
+    then every staged document is replaced once and every journal gets one
+    append; a crash in between is finished by `recover_intents`. Do not
+    write these files through other helpers from inside the block.
+
+    Usage:
+        with unit_of_work('teams.json', 'members.json') as uow:
+            teams = uow.load('teams.json', dict)
+            ...
+            uow.stage('teams.json', teams)
+    """
+    paths = sorted({data_path(f) for f in filenames})
+    with ExitStack() as stack:
+        for path in paths:
+            _ensure_dir(path)
+            stack.enter_context(file_lock(path))
+        uow = UnitOfWork(paths)
+        yield uow
+        uow.commit()
+
+
+def recover_intents() -> int:
+    """Finish units of work interrupted mid-commit; return how many were found.
+
+    Intended for startup, before requests are served.
+    """
+    if not os.path.isdir(DATA_DIR):
+        return 0
+    recovered = 0
+    for name in sorted(os.listdir(DATA_DIR)):
+        if not (name.startswith(INTENT_PREFIX) and name.endswith('.json')):
+            continue
+        intent_path = os.path.join(DATA_DIR, name)
+        try:
+            _, intent = _parse_file(intent_path)
+        except ValueError:
+            intent = None
+        if isinstance(intent, dict):
+            names = [e['name'] for e in intent.get('files', []) + intent.get('appends', [])]
+            with ExitStack() as stack:
+                for path in sorted({data_path(n) for n in names}):
+                    stack.enter_context(file_lock(path))
+                _apply_intent(intent, recovering=True)
+        # An unreadable intent was torn before it was durable: nothing was applied
+        os.remove(intent_path)
+        recovered += 1
+    return recovered
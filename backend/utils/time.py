@@ -8,7 +8,7 @@ time slots, and getting timezone offsets.
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import List, Optional
 import hashlib
 
 try:
@@ -79,14 +79,18 @@ def generate_time_slots(start: datetime, end: datetime, duration_minutes: int) -
     return slots
 
 
-def get_timezone_offset(timezone_name: str) -> timedelta:
-    """Return offset for timezone now relative to UTC as timedelta."""
+def get_timezone_offset(timezone_name: str, at: Optional[datetime] = None) -> timedelta:
+    """Return offset for timezone relative to UTC as timedelta.
+
+    The offset is taken at the aware datetime `at` (default now), so DST
+    is applied for that date.
+    """
 
     if ZoneInfo is None:
         raise ValueError("ZoneInfo is unavailable in this environment")
-    now_utc = datetime.now(timezone.utc)
-    local_now = now_utc.astimezone(ZoneInfo(timezone_name))  # type: ignore[arg-type]
-    return local_now.utcoffset() or timedelta(0)
+    moment = at if at is not None else datetime.now(timezone.utc)
+    local = moment.astimezone(ZoneInfo(timezone_name))  # type: ignore[arg-type]
+    return local.utcoffset() or timedelta(0)
 
 
 def get_current_timestamp() -> str: